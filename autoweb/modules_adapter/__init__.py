@@ -9,7 +9,13 @@ from autoweb.modules_adapter.open_page_block_adapter import OpenPageBlockAdapter
 from autoweb.modules_adapter.click_element_block_adapter import ClickElementBlockAdapter
 from autoweb.modules_adapter.extract_data_block_adapter import ExtractDataBlockAdapter
 from autoweb.modules_adapter.input_block_adapter import InputBlockAdapter
+from autoweb.modules_adapter.network_capture_block_adapter import NetworkCaptureBlockAdapter
+from autoweb.modules_adapter.rollback_block_adapter import RollbackBlockAdapter
+from autoweb.modules_adapter.if_block_adapter import IfBlockAdapter
+from autoweb.modules_adapter.collect_links_block_adapter import CollectLinksBlockAdapter
 from autoweb.modules_adapter.adapter_factory import AdapterFactory
+from autoweb.modules_adapter.flow_translator import FlowTranslator, FlowTranslateError
+from autoweb.modules_adapter.loop_hooks import CrawlStateLoopHook, PrefetchLoopHook
 
 # 导出所有模块
 __all__ = [
@@ -19,7 +25,15 @@ __all__ = [
     'ClickElementBlockAdapter',
     'ExtractDataBlockAdapter',
     'InputBlockAdapter',
+    'NetworkCaptureBlockAdapter',
+    'RollbackBlockAdapter',
+    'IfBlockAdapter',
+    'CollectLinksBlockAdapter',
     'AdapterFactory',
+    'FlowTranslator',
+    'FlowTranslateError',
+    'CrawlStateLoopHook',
+    'PrefetchLoopHook',
     'register_adapters_to_parser'
 ]
 
@@ -36,6 +50,10 @@ def register_adapters_to_parser():
     ModuleParser.register_module_type("ClickElementBlock", ClickElementBlockAdapter)
     ModuleParser.register_module_type("ExtractDataBlock", ExtractDataBlockAdapter)
     ModuleParser.register_module_type("InputBlock", InputBlockAdapter)
+    ModuleParser.register_module_type("NetworkCaptureBlock", NetworkCaptureBlockAdapter)
+    ModuleParser.register_module_type("RollbackBlock", RollbackBlockAdapter)
+    ModuleParser.register_module_type("IfBlock", IfBlockAdapter)
+    ModuleParser.register_module_type("CollectLinksBlock", CollectLinksBlockAdapter)
     
     # 可以根据需要继续注册其他适配器模块
     
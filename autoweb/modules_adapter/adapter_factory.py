@@ -6,6 +6,10 @@ from autoweb.modules_adapter.open_page_block_adapter import OpenPageBlockAdapter
 from autoweb.modules_adapter.click_element_block_adapter import ClickElementBlockAdapter
 from autoweb.modules_adapter.extract_data_block_adapter import ExtractDataBlockAdapter
 from autoweb.modules_adapter.input_block_adapter import InputBlockAdapter
+from autoweb.modules_adapter.network_capture_block_adapter import NetworkCaptureBlockAdapter
+from autoweb.modules_adapter.rollback_block_adapter import RollbackBlockAdapter
+from autoweb.modules_adapter.if_block_adapter import IfBlockAdapter
+from autoweb.modules_adapter.collect_links_block_adapter import CollectLinksBlockAdapter
 # 将来其他适配器导入
 
 
@@ -48,6 +52,10 @@ class AdapterFactory:
         cls.register_adapter("ClickElementBlock", ClickElementBlockAdapter)
         cls.register_adapter("ExtractDataBlock", ExtractDataBlockAdapter)
         cls.register_adapter("InputBlock", InputBlockAdapter)
+        cls.register_adapter("NetworkCaptureBlock", NetworkCaptureBlockAdapter)
+        cls.register_adapter("RollbackBlock", RollbackBlockAdapter)
+        cls.register_adapter("IfBlock", IfBlockAdapter)
+        cls.register_adapter("CollectLinksBlock", CollectLinksBlockAdapter)
         # 注册其他适配器...
         
 
@@ -1,4 +1,4 @@
-from typing import Dict, Any, Optional, List, Type
+from typing import Dict, Any, Optional, List, Type, Union
 import asyncio
 import inspect
 import logging
@@ -8,6 +8,7 @@ from workflow.module_port import ModuleInputs, ModuleOutputs, InputDefinition, O
 from workflow.module_types import Args
 from taskflow.task_blocks.block import Block, BlockContext, BlockExecuteParams
 from browser.browser_automation import BrowserAutomation
+from browser.politeness import configure_politeness
 
 
 class BlockModuleAdapter(AtomicModule):
@@ -19,6 +20,15 @@ class BlockModuleAdapter(AtomicModule):
     # 全局的浏览器实例，用于在适配器之间共享
     _browser_instance: Optional[BrowserAutomation] = None
     
+    # 创建浏览器实例时使用的启动配置，为空时使用环境变量AUTOWEB_BROWSER_PROFILE指定的配置
+    _launch_profile: Union[None, str, Dict[str, Any]] = None
+
+    # 适配器要求的启动选项，如有捕获网络响应的模块时开启性能日志，覆盖_launch_profile中的同名选项
+    _launch_options: Dict[str, Any] = {}
+
+    # 标签池最多同时加载的页面数量，大于1时详情页在同一个浏览器的多个标签页中并行加载
+    _tab_concurrency: int = 1
+
     # 存储所有已适配的Block类
     BLOCK_CLASS_MAP: Dict[str, Type[Block]] = {}
     
@@ -27,11 +37,46 @@ class BlockModuleAdapter(AtomicModule):
         """注册Block类到适配器映射表"""
         cls.BLOCK_CLASS_MAP[block_name] = block_class
     
+    @classmethod
+    def set_launch_profile(cls, launch_profile: Union[None, str, Dict[str, Any]]):
+        """设置浏览器启动配置，需要在浏览器实例创建之前调用"""
+        if cls._browser_instance is not None:
+            logging.warning("浏览器已启动，新的启动配置将在浏览器重新创建后生效")
+        cls._launch_profile = launch_profile
+
+    @classmethod
+    def require_launch_option(cls, name: str, value: Any = True):
+        """适配器在创建时声明需要的启动选项，如network_log，浏览器启动时生效"""
+        if cls._browser_instance is not None and getattr(cls._browser_instance.launch_profile, name) != value:
+            logging.warning(f"浏览器已启动，启动选项{name}在浏览器重新创建后生效")
+        BlockModuleAdapter._launch_options[name] = value
+
+    @classmethod
+    def set_tab_concurrency(cls, size: int):
+        """设置工作流的标签页并发数，浏览器已启动时立即生效"""
+        cls._tab_concurrency = max(1, int(size))
+        if cls._tab_concurrency > 1:
+            # 多个标签页并行加载需要驱动不等待页面加载
+            cls.require_launch_option("manual_page_load")
+        if cls._browser_instance is not None:
+            cls._browser_instance.set_tab_concurrency(cls._tab_concurrency)
+
+    @staticmethod
+    def set_politeness(config: Union[None, bool, Dict[str, Any]]):
+        """设置工作流的按站点限速，所有浏览器会话与静态下载共用，为空时关闭限速"""
+        configure_politeness(config)
+
     @classmethod
     def get_browser_instance(cls) -> BrowserAutomation:
         """获取或创建共享的浏览器实例"""
         if cls._browser_instance is None:
-            cls._browser_instance = BrowserAutomation()
+            launch_profile = cls._launch_profile
+            if BlockModuleAdapter._launch_options:
+                launch_profile = dict(launch_profile) if isinstance(launch_profile, dict) \
+                    else {"profile": launch_profile}
+                launch_profile.update(BlockModuleAdapter._launch_options)
+            cls._browser_instance = BrowserAutomation(launch_profile)
+            cls._browser_instance.set_tab_concurrency(cls._tab_concurrency)
         return cls._browser_instance
     
     @classmethod
@@ -39,7 +84,7 @@ class BlockModuleAdapter(AtomicModule):
         """关闭浏览器实例"""
         if cls._browser_instance:
             try:
-                cls._browser_instance.browser.quit()
+                cls._browser_instance.quit()
             except:
                 pass
             cls._browser_instance = None
@@ -100,6 +145,39 @@ class BlockModuleAdapter(AtomicModule):
             
         return params
     
+    @staticmethod
+    def wait_input_definitions() -> List[InputDefinition]:
+        """等待相关的通用输入定义"""
+        return [
+            InputDefinition(
+                name="wait_for",
+                type=ValueType.OBJECT,
+                description="执行前等待的条件，如 {\"type\": \"element_visible\", \"xpath\": \"...\", \"timeout\": 5}",
+                required=False
+            ),
+        ]
+
+    @staticmethod
+    def loop_item_input_definitions() -> List[InputDefinition]:
+        """循环体内使用相对XPath时的通用输入定义"""
+        return [
+            InputDefinition(
+                name="loop_item",
+                type=ValueType.STRING,
+                description="当前循环项的XPath，通常引用循环体插槽的item，相对XPath拼接在它后面",
+                required=False
+            ),
+        ]
+
+    def _set_loop_item(self, block: Block, params: BlockExecuteParams):
+        """把loop_item输入设置为Block的外层循环项，与taskflow中循环块内的执行参数一致"""
+        loop_item = params.get_variable("loop_item")
+        if loop_item is None:
+            return
+        block.depth = 1
+        params.in_loop = True
+        params.set_loop_item(0, loop_item)
+
     def get_block_instance_params(self, params: Dict[str, Any]) -> Dict[str, Any]:
         """获取Block实例的参数"""
         return {
@@ -152,6 +230,7 @@ class BlockModuleAdapter(AtomicModule):
             for output in self.outputs.outputDefs:
                 self.block_instance.add_output_variable(output.name)
 
+            self._set_loop_item(self.block_instance, params)
             self._before_execute(self.block_instance, params)
             
             # 执行Block
@@ -38,18 +38,38 @@ class ClickElementBlockAdapter(BlockModuleAdapter):
                 description="要点击元素的XPath",
                 required=True
             ),
+            InputDefinition(
+                name="use_relative_xpath",
+                type=ValueType.BOOLEAN,
+                description="xpath是否为相对循环项的XPath",
+                required=False
+            ),
+            InputDefinition(
+                name="coordinates",
+                type=ValueType.ARRAY,
+                description="点击的相对坐标 [x, y]，设置后按坐标点击",
+                required=False
+            ),
             InputDefinition(
                 name="need_track",
                 type=ValueType.BOOLEAN,
                 description="是否跟踪页面变化",
                 required=False
             ),
+            InputDefinition(
+                name="wait_navigation",
+                type=ValueType.BOOLEAN,
+                description="跟踪页面变化时是否等待导航发生，用于点击后由脚本延迟跳转的页面",
+                required=False
+            ),
             InputDefinition(
                 name="wait_time",
                 type=ValueType.INTEGER,
                 description="等待时间(秒)",
                 required=False
             ),
+            *self.loop_item_input_definitions(),
+            *self.wait_input_definitions(),
         ]
         
         # ClickElementBlock 的输出定义
@@ -0,0 +1,68 @@
+from workflow.module_port import InputDefinition, OutputDefinition, ValueType, ModuleInputs, ModuleOutputs
+from taskflow.task_blocks.collect_links_block import CollectLinksBlock
+
+from autoweb.modules_adapter.base_adapter import BlockModuleAdapter
+
+
+class CollectLinksBlockAdapter(BlockModuleAdapter):
+    """CollectLinksBlock 适配器 - 收集列表中所有循环项的链接"""
+
+    def __init__(self, module_id: str, block_name: str = None):
+        """
+        初始化 CollectLinksBlock 适配器
+
+        Args:
+            module_id: 模块ID
+            block_name: Block名称(可选)
+        """
+        # 在使用前，需要先注册 CollectLinksBlock 类
+        if "CollectLinksBlock" not in self.BLOCK_CLASS_MAP:
+            self.register_block_class("CollectLinksBlock", CollectLinksBlock)
+
+        super().__init__(module_id, "CollectLinksBlock", block_name)
+
+        # 初始化输入输出定义
+        self._initialize_io_definitions()
+
+    def _initialize_io_definitions(self):
+        """初始化输入输出定义"""
+        input_defs = [
+            InputDefinition(
+                name="item_xpath",
+                type=ValueType.STRING,
+                description="可匹配所有列表项的XPath",
+                required=True
+            ),
+            InputDefinition(
+                name="href_xpath",
+                type=ValueType.STRING,
+                description="链接相对列表项的XPath，如 .//a/@href，默认为列表项本身或其中第一个带href的元素",
+                required=False
+            ),
+            InputDefinition(
+                name="unique",
+                type=ValueType.BOOLEAN,
+                description="是否去除重复的链接",
+                required=False,
+                defaultValue=True
+            ),
+            *self.wait_input_definitions(),
+        ]
+
+        # links可以作为LoopModule的array，循环体中用OpenPageBlock(detail_tab)打开详情页
+        output_defs = [
+            OutputDefinition(
+                name="links",
+                type=ValueType.ARRAY,
+                description="按文档顺序排列的绝对网址"
+            )
+        ]
+
+        self.set_inputs(ModuleInputs(
+            inputDefs=input_defs,
+            inputParameters=[]
+        ))
+
+        self.set_outputs(ModuleOutputs(
+            outputDefs=output_defs
+        ))
@@ -3,8 +3,9 @@ from workflow.module_context import ModuleExecutionResult
 from workflow.module_port import InputDefinition, OutputDefinition, ValueType, ModuleInputs, ModuleOutputs
 from taskflow.task_blocks.extract_data_block import ExtractDataBlock, Field, TextFieldExtractor
 from taskflow.task_blocks.block import Block, BlockExecuteParams
-from taskflow.data_exporter import ExcelExporter
+from taskflow.data_exporter import ExcelExporter, create_exporter
 from taskflow.field_saver import FieldSaver
+import atexit
 import logging
 
 from autoweb.modules_adapter.base_adapter import BlockModuleAdapter
@@ -18,6 +19,8 @@ class ExtractDataBlockAdapter(BlockModuleAdapter):
     FORMAT_LIST = "list"     # 转换为值列表 ["value1", "value2"]
     FORMAT_ORIGINAL = "original"  # 保持原始格式 [{"name": "field1", "value": "value1"}, ...]
     FORMAT_CUSTOM = "custom"      # 自定义格式化器
+
+    EXPORT_EXTENSIONS = {"csv": "csv", "jsonl": "jsonl", "xlsx_stream": "xlsx"}
     
     def __init__(self, module_id: str, block_name: str = None):
         """
@@ -35,6 +38,10 @@ class ExtractDataBlockAdapter(BlockModuleAdapter):
         self.fields = []  # 提取的字段列表
         self.use_relative_xpath = False  # 是否使用相对XPath
         self.export_to_excel = False  # 是否导出到Excel
+        self.export_format = ""  # 流式导出格式：csv、jsonl、xlsx_stream，为空时按export_to_excel整体导出
+        self.export_options: Dict[str, Any] = {}  # 流式导出的其他参数，如flush_rows、max_file_size
+        self.use_snapshot = False  # 是否基于DOM快照在本地提取
+        self.snapshot_root_xpath = ""  # 快照容器XPath
         self.field_saver = None  # 数据保存器
         self.format_type = self.FORMAT_DICT  # 默认使用原始格式
         self.custom_formatter_code = None  # 自定义格式化代码
@@ -60,12 +67,36 @@ class ExtractDataBlockAdapter(BlockModuleAdapter):
                 description="是否使用相对XPath",
                 required=False
             ),
+            InputDefinition(
+                name="use_snapshot",
+                type=ValueType.BOOLEAN,
+                description="是否一次性获取页面快照并在本地求值字段XPath",
+                required=False
+            ),
+            InputDefinition(
+                name="snapshot_root_xpath",
+                type=ValueType.STRING,
+                description="快照容器的XPath，为空时对整个页面做快照",
+                required=False
+            ),
             InputDefinition(
                 name="export_to_excel",
                 type=ValueType.BOOLEAN,
                 description="是否导出到Excel",
                 required=True
             ),
+            InputDefinition(
+                name="export_format",
+                type=ValueType.STRING,
+                description="流式导出格式: csv, jsonl, xlsx_stream，每次执行后增量写入文件",
+                required=False
+            ),
+            InputDefinition(
+                name="export_options",
+                type=ValueType.OBJECT,
+                description="流式导出参数，如 {\"flush_rows\": 100, \"max_file_size\": 104857600}",
+                required=False
+            ),
             InputDefinition(
                 name="format_type",
                 type=ValueType.STRING,
@@ -77,7 +108,9 @@ class ExtractDataBlockAdapter(BlockModuleAdapter):
                 type=ValueType.STRING,
                 description="自定义格式化代码，需包含一个名为'format_result'的函数",
                 required=False
-            )
+            ),
+            *self.loop_item_input_definitions(),
+            *self.wait_input_definitions(),
         ]
         
         # ExtractDataBlock 的输出定义
@@ -117,6 +150,18 @@ class ExtractDataBlockAdapter(BlockModuleAdapter):
             
         if "export_to_excel" in args:
             self.export_to_excel = args["export_to_excel"]
+
+        if "export_format" in args:
+            self.export_format = args["export_format"] or ""
+
+        if "export_options" in args:
+            self.export_options = args["export_options"] or {}
+
+        if "use_snapshot" in args:
+            self.use_snapshot = args["use_snapshot"]
+
+        if "snapshot_root_xpath" in args:
+            self.snapshot_root_xpath = args["snapshot_root_xpath"] or ""
             
         # 设置格式化类型
         if "format_type" in args:
@@ -199,12 +244,24 @@ class ExtractDataBlockAdapter(BlockModuleAdapter):
         # 设置是否使用相对XPath
         if hasattr(self, "use_relative_xpath"):
             block.set_use_relative_xpath(self.use_relative_xpath)
+
+        # 设置是否使用DOM快照提取
+        block.set_use_snapshot(bool(self.use_snapshot), self.snapshot_root_xpath)
             
         # 设置字段
         self._add_fields_to_block(block)
         
         # 设置数据导出
-        if self.export_to_excel:
+        if self.export_format:
+            # 流式导出器在多次执行之间共用，数据逐条追加到同一个文件
+            if self.field_saver is None or not self.field_saver.streaming:
+                config = dict(self.export_options)
+                config.setdefault("name", "{}_data.{}".format(self.block_name, self.EXPORT_EXTENSIONS.get(self.export_format, self.export_format)))
+                self.field_saver = FieldSaver()
+                self.field_saver.set_data_exporter(create_exporter({**config, "type": self.export_format}))
+                atexit.register(self.field_saver.close)
+            block.set_field_observer(self.field_saver)
+        elif self.export_to_excel:
             data_exporter = ExcelExporter(name=f"{self.block_name}_data.xlsx")
             self.field_saver = FieldSaver()
             self.field_saver.set_data_exporter(data_exporter)
@@ -223,6 +280,7 @@ class ExtractDataBlockAdapter(BlockModuleAdapter):
             
             if field_name and field_xpath:
                 field = Field(field_name, field_xpath)
+                field.required = field_def.get("required", False)
                 
                 # 设置提取器
                 if field_extractor_type == "TextFieldExtractor":
@@ -241,6 +299,11 @@ class ExtractDataBlockAdapter(BlockModuleAdapter):
         """执行Block逻辑，并处理结果格式化"""
         # 调用父类方法执行Block
         result = await super()._execute_internal()
+
+        # 每次执行提取的是一条完整记录，立即写入流式导出文件
+        if self.field_saver and self.field_saver.streaming:
+            self.field_saver.end_row()
+            self.field_saver.flush()
         
         # 如果执行成功，处理结果格式化
         if result.success and result.outputs and "results" in result.outputs:
@@ -0,0 +1,190 @@
+import json
+from typing import Dict, Any, List, Optional
+
+from workflow.module import Module, CompositeModule, SlotModule, LoopModule, ModuleMeta, ModuleType
+from workflow.module_port import ModuleInputs, ModuleOutputs, InputParameter, InputHelper, ValueType, PortValue
+
+from autoweb.modules_adapter.adapter_factory import AdapterFactory
+from autoweb.modules_adapter.extract_data_block_adapter import ExtractDataBlockAdapter
+from autoweb.modules_adapter.if_block_adapter import IfBlockAdapter
+
+
+class FlowTranslateError(Exception):
+    """taskflow流程转换错误"""
+    pass
+
+
+class FlowTranslator:
+    """
+    把taskflow的JSON流程(JsonFlowParser的输入)转换为workflow模块树
+
+    块配置中的参数作为适配器的字面量输入；LoopBlock转换为LoopModule，内部块放在循环体插槽中，
+    循环体内的模块通过loop_item引用循环体插槽的item；IfBlock转换为IfBlockAdapter，每个条件一个插槽
+    """
+
+    # 不作为模块输入的块配置
+    RESERVED_KEYS = {"block", "name", "inners", "breakpoint", "input_variables", "output_variables"}
+
+    # taskflow中常用字符串 "True"/"False" 表示的布尔配置
+    BOOLEAN_KEYS = {"use_relative_xpath", "use_snapshot", "fullscreen", "need_track"}
+
+    def __init__(self):
+        self.module_count = 0
+        self.export_config: Dict[str, Any] = {}
+
+    def translate_file(self, json_file_path: str) -> CompositeModule:
+        with open(json_file_path, "r", encoding="utf-8") as f:
+            return self.translate(json.load(f))
+
+    def translate(self, json_data: Any) -> CompositeModule:
+        """
+        :param json_data: taskflow流程，{"flow": [...], "export": {...}} 或块配置列表
+        :return: 类型为workflow的组合模块
+        """
+        self.module_count = 0
+        self.export_config = json_data.get("export", {}) if isinstance(json_data, dict) else {}
+        json_flow = json_data.get("flow", json_data) if isinstance(json_data, dict) else json_data
+        if not isinstance(json_flow, list):
+            json_flow = [json_flow]
+
+        workflow = CompositeModule("workflow", ModuleType.WORKFLOW)
+        workflow.set_meta(ModuleMeta(title="workflow", description="由taskflow流程转换", category="workflow"))
+        workflow.set_inputs(ModuleInputs(inputDefs=[], inputParameters=[]))
+        workflow.set_outputs(ModuleOutputs(outputDefs=[]))
+        for module in self._translate_blocks(json_flow, None):
+            workflow.add_module(module)
+        return workflow
+
+    def _next_module_id(self, block_type: str) -> str:
+        self.module_count += 1
+        return f"{block_type}-{self.module_count}"
+
+    def _translate_blocks(self, json_flow: List[Dict[str, Any]], loop_body_id: Optional[str]) -> List[Module]:
+        modules = []
+        for config in json_flow:
+            module = self._translate_block(config, loop_body_id)
+            if module is not None:
+                modules.append(module)
+        return modules
+
+    def _translate_block(self, config: Dict[str, Any], loop_body_id: Optional[str]) -> Optional[Module]:
+        block_type = config.get("block")
+        if block_type == "EndBlock":
+            # 数据由提取模块的导出器逐条写入，不需要结束块统一保存
+            return None
+        if block_type == "LoopBlock":
+            return self._translate_loop(config, loop_body_id)
+        if block_type == "IfBlock":
+            return self._translate_if(config, loop_body_id)
+
+        module = AdapterFactory.create_adapter(block_type, self._next_module_id(block_type), config.get("name"))
+        if module is None:
+            raise FlowTranslateError(f"不支持转换的块类型: {block_type}")
+        if config.get("inners"):
+            raise FlowTranslateError(f"{block_type} 不支持内部块")
+
+        for key, value in config.items():
+            if key not in self.RESERVED_KEYS:
+                self._add_literal_input(module, key, self._normalize_value(key, value))
+        if block_type == "ExtractDataBlock":
+            self._set_export_inputs(module)
+        if loop_body_id and self._has_input(module, "loop_item"):
+            self._add_loop_item_input(module, loop_body_id)
+        return module
+
+    def _translate_loop(self, config: Dict[str, Any], loop_body_id: Optional[str]) -> LoopModule:
+        loop_type = config.get("loop_type") or {}
+        if loop_type.get("type") != "FixedLoopType":
+            raise FlowTranslateError(f"不支持转换的循环类型: {loop_type.get('type')}")
+
+        loop = LoopModule(self._next_module_id("LoopBlock"))
+        loop.meta.title = config.get("name") or loop.module_id
+        self._add_literal_input(loop, "array", list(loop_type.get("values", [])))
+        crawl_state = config.get("crawl_state")
+        if crawl_state:
+            self._add_literal_input(loop, "crawl_state_file", crawl_state["file"])
+            self._add_literal_input(loop, "crawl_state_hash", crawl_state.get("hash", False))
+            if crawl_state.get("ttl") is not None:
+                self._add_literal_input(loop, "crawl_state_ttl", crawl_state["ttl"])
+        prefetch = config.get("prefetch")
+        if isinstance(prefetch, dict):
+            prefetch = prefetch.get("count", 0)
+        if prefetch:
+            # LoopModule只能预取本身是网址的循环项
+            self._add_literal_input(loop, "prefetch_count", int(prefetch))
+
+        body = SlotModule(f"slot-{loop.loop_body_slot_name}-{loop.module_id}")
+        body.set_meta(ModuleMeta(title=loop.loop_body_slot_name, description="循环体"))
+        loop.set_loop_body(body)
+        # taskflow中内部块既是循环块的inners又用next_block串成链，这里每个内部块只执行一次
+        for module in self._translate_blocks(config.get("inners", []), body.module_id):
+            body.add_module(module)
+        return loop
+
+    def _translate_if(self, config: Dict[str, Any], loop_body_id: Optional[str]) -> IfBlockAdapter:
+        module = IfBlockAdapter(self._next_module_id("IfBlock"), config.get("name"))
+        conditions = []
+        for index, condition_config in enumerate(config.get("inners", [])):
+            condition_type = condition_config.get("block")
+            if condition_type == "ExecJavaScriptConditionBlock":
+                conditions.append({"type": IfBlockAdapter.CONDITION_JS,
+                                   "js_script": condition_config.get("js_script", "")})
+            elif condition_type == "PassConditionBlock":
+                conditions.append({"type": IfBlockAdapter.CONDITION_PASS})
+            else:
+                raise FlowTranslateError(f"不支持转换的条件块: {condition_type}")
+            for inner in self._translate_blocks(condition_config.get("inners", []), loop_body_id):
+                module.add_condition_module(index, inner)
+
+        self._add_literal_input(module, "conditions", conditions)
+        if config.get("mode"):
+            self._add_literal_input(module, "mode", config["mode"])
+        if loop_body_id:
+            self._add_loop_item_input(module, loop_body_id)
+        return module
+
+    def _set_export_inputs(self, module: Module):
+        """
+        taskflow中所有提取块共用一个导出文件；转换后每个提取模块使用自己的流式导出文件，
+        文件名由模块名生成，Excel格式改为流式写入的xlsx
+        """
+        export_type = self.export_config.get("type", "excel")
+        if export_type not in ExtractDataBlockAdapter.EXPORT_EXTENSIONS:
+            export_type = "xlsx_stream"
+        options = {key: value for key, value in self.export_config.items() if key not in ("type", "name")}
+        self._add_literal_input(module, "export_to_excel", False)
+        self._add_literal_input(module, "export_format", export_type)
+        self._add_literal_input(module, "export_options", options)
+
+    def _normalize_value(self, key: str, value: Any) -> Any:
+        if key in self.BOOLEAN_KEYS and isinstance(value, str):
+            return value.lower() == "true"
+        return value
+
+    @staticmethod
+    def _has_input(module: Module, name: str) -> bool:
+        return any(input_def.name == name for input_def in module.inputs.inputDefs)
+
+    @staticmethod
+    def _get_input_type(module: Module, name: str) -> ValueType:
+        for input_def in module.inputs.inputDefs:
+            if input_def.name == name:
+                return input_def.type
+        # 没有输入定义的配置同样作为Block参数传递
+        return ValueType.ANY
+
+    def _add_literal_input(self, module: Module, name: str, value: Any):
+        self._set_input(module, name, InputHelper.create_literal_value(self._get_input_type(module, name), value))
+
+    def _add_loop_item_input(self, module: Module, loop_body_id: str):
+        self._set_input(module, "loop_item",
+                        InputHelper.create_reference_value(ValueType.STRING, loop_body_id, "item"))
+
+    @staticmethod
+    def _set_input(module: Module, name: str, port_value: PortValue):
+        parameters = module.inputs.inputParameters
+        for i, param in enumerate(parameters):
+            if param.name == name:
+                parameters[i] = InputParameter(name=name, input=port_value)
+                return
+        parameters.append(InputParameter(name=name, input=port_value))
@@ -0,0 +1,156 @@
+from typing import Dict, Any, List, Optional
+import logging
+
+from workflow.module import CompositeModule, SlotModule, ModuleMeta, ModuleExecutionResult, Module
+from workflow.module_port import InputDefinition, OutputDefinition, ValueType, ModuleInputs, ModuleOutputs
+
+from autoweb.modules_adapter.base_adapter import BlockModuleAdapter
+
+
+class IfBlockAdapter(CompositeModule):
+    """
+    IfBlock 适配器 - 条件分支
+
+    每个条件对应一个插槽 condition_<序号>，与taskflow的IfBlock一致，满足条件的分支按顺序执行。
+    条件格式: {"type": "js", "js_script": "return arguments[0].innerText.includes('CSS')"}
+    或 {"type": "pass"}，js条件的arguments[0]是loop_item对应的元素
+    """
+
+    CONDITION_JS = "js"
+    CONDITION_PASS = "pass"
+
+    MATCH_ALL = "all_matching"  # 执行所有满足条件的分支
+    MATCH_FIRST = "first_match"  # 只执行第一个满足条件的分支
+
+    def __init__(self, module_id: str, block_name: str = None):
+        """
+        初始化 IfBlock 适配器
+
+        Args:
+            module_id: 模块ID
+            block_name: Block名称(可选)
+        """
+        super().__init__(module_id)
+        self.block_name = block_name or f"IfBlock_{module_id}"
+
+        self.set_meta(ModuleMeta(
+            title=self.block_name,
+            description="IfBlock 的适配器",
+            category="taskflow"
+        ))
+
+        # 初始化输入输出定义
+        self._initialize_io_definitions()
+
+    def _initialize_io_definitions(self):
+        """初始化输入输出定义"""
+        input_defs = [
+            InputDefinition(
+                name="conditions",
+                type=ValueType.ARRAY,
+                description="条件列表，如 [{\"type\": \"js\", \"js_script\": \"...\"}, {\"type\": \"pass\"}]",
+                required=True
+            ),
+            InputDefinition(
+                name="mode",
+                type=ValueType.STRING,
+                description=f"分支模式: {self.MATCH_ALL}(执行所有满足条件的分支), {self.MATCH_FIRST}(只执行第一个)",
+                required=False
+            ),
+            *BlockModuleAdapter.loop_item_input_definitions(),
+        ]
+
+        output_defs = [
+            OutputDefinition(
+                name="matched",
+                type=ValueType.ARRAY,
+                description="满足的条件序号"
+            )
+        ]
+
+        self.set_inputs(ModuleInputs(
+            inputDefs=input_defs,
+            inputParameters=[]
+        ))
+
+        self.set_outputs(ModuleOutputs(
+            outputDefs=output_defs
+        ))
+
+    @staticmethod
+    def condition_slot_name(index: int) -> str:
+        return f"condition_{index}"
+
+    def add_condition_module(self, index: int, module: Module) -> bool:
+        """向第index个条件的分支添加模块"""
+        slot_name = self.condition_slot_name(index)
+        if slot_name not in self.slots:
+            slot = SlotModule(f"slot-{slot_name}-{self.module_id}")
+            slot.set_meta(ModuleMeta(title=slot_name, description=f"条件{index}的分支"))
+            self.add_module_to_slot(slot_name, slot)
+        return self.add_module_to_slot(slot_name, module)
+
+    def _get_optional_variable(self, name: str) -> Any:
+        try:
+            return self.context.get_variable(self.module_id, name)
+        except Exception:
+            return None
+
+    def _match_conditions(self, conditions: List[Dict[str, Any]], loop_item: Optional[str],
+                          first_match: bool) -> List[int]:
+        """所有JS条件在一次脚本调用中求值，返回满足的条件序号"""
+        scripts = []
+        for condition in conditions:
+            condition_type = condition.get("type", self.CONDITION_PASS)
+            if condition_type == self.CONDITION_JS:
+                scripts.append(condition.get("js_script", ""))
+            elif condition_type == self.CONDITION_PASS:
+                scripts.append(None)
+            else:
+                raise ValueError(f"不支持的条件类型: {condition_type}")
+
+        results = [None] * len(conditions)
+        if any(script is not None for script in scripts):
+            browser = BlockModuleAdapter.get_browser_instance()
+            element = browser.get_elements_by_xpaths([loop_item])[0] if loop_item else None
+            evaluated = browser.evaluate_conditions(scripts, element, first_match)
+            results = evaluated + [False] * (len(conditions) - len(evaluated))
+
+        matched = []
+        for index, result in enumerate(results):
+            # 无条件分支在页面中不求值
+            if result is None or result:
+                matched.append(index)
+                if first_match:
+                    break
+        return matched
+
+    async def _execute_internal(self) -> ModuleExecutionResult:
+        """依次判断条件，执行满足条件的分支"""
+        conditions: List[Dict[str, Any]] = self._get_optional_variable("conditions") or []
+        loop_item = self._get_optional_variable("loop_item")
+        mode = self._get_optional_variable("mode") or self.MATCH_ALL
+
+        try:
+            matched = self._match_conditions(conditions, loop_item, mode == self.MATCH_FIRST)
+        except Exception as e:
+            logging.error(f"{self.block_name} 条件判断失败: {str(e)}")
+            return ModuleExecutionResult(success=False, outputs={}, error=str(e))
+
+        branch_results = []
+        success = True
+        for index in matched:
+            slot = self.get_slot(self.condition_slot_name(index))
+            if slot is None:
+                continue
+            slot.set_context(self._create_child_context(slot, self.context))
+            result = await slot.execute()
+            branch_results.append(result)
+            if not result.success:
+                success = False
+
+        return ModuleExecutionResult(
+            success=success,
+            outputs={"matched": matched},
+            child_results={"branches": branch_results}
+        )
@@ -54,7 +54,8 @@ class InputBlockAdapter(BlockModuleAdapter):
                 type=ValueType.BOOLEAN,
                 description="是否先清空输入框",
                 required=False
-            )
+            ),
+            *self.wait_input_definitions(),
         ]
         
         # 设置输入输出
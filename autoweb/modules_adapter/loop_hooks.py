@@ -0,0 +1,121 @@
+"""
+循环模块的扩展：增量采集与页面预取
+"""
+
+import logging
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional
+
+from browser.browser_automation import BrowserAutomation
+from browser.page_prefetcher import PagePrefetcher
+from taskflow.crawl_state import CrawlStateStore, get_crawl_state_store, make_item_key
+from taskflow.field_saver import FieldSaver, after_all_persisted
+from workflow.module import CompositeModule, LoopModule, Module, ModuleExecutionResult
+from workflow.modules.loop_module import LoopHook, register_loop_hook
+from autoweb.modules_adapter.base_adapter import BlockModuleAdapter
+
+
+class CrawlStateLoopHook(LoopHook):
+    """跳过之前已经成功处理过的元素，元素的数据落盘后才记录为已处理"""
+
+    def __init__(self, store: CrawlStateStore, scope: str, key_path: str = "", use_hash: bool = False,
+                 ttl: Optional[float] = None):
+        self.store = store
+        self.scope = scope
+        self.key_path = key_path
+        self.use_hash = use_hash
+        self.ttl = ttl
+
+    @classmethod
+    def create(cls, module: LoopModule) -> Optional["CrawlStateLoopHook"]:
+        crawl_state_file = module.get_optional_variable("crawl_state_file")
+        if not crawl_state_file:
+            return None
+        return cls(get_crawl_state_store(crawl_state_file), module.module_id,
+                   module.get_optional_variable("item_key", ""),
+                   module.get_optional_variable("crawl_state_hash", False),
+                   module.get_optional_variable("crawl_state_ttl"))
+
+    def get_item_key(self, module: LoopModule, item: Any) -> Optional[str]:
+        value = module.get_item_field(item, self.key_path)
+        if value is None or value == "":
+            return None
+        return make_item_key(value, self.use_hash)
+
+    def on_loop_start(self, module: LoopModule):
+        self.store.reset_stats(self.scope)
+
+    def will_skip(self, module: LoopModule, item: Any) -> bool:
+        item_key = self.get_item_key(module, item)
+        return item_key is not None and self.store.is_crawled(self.scope, item_key, self.ttl)
+
+    def should_skip(self, module: LoopModule, item: Any) -> bool:
+        item_key = self.get_item_key(module, item)
+        return item_key is not None and self.store.should_skip(self.scope, item_key, self.ttl)
+
+    @classmethod
+    def get_body_field_savers(cls, body: Module) -> List[FieldSaver]:
+        """循环体中各个提取模块的流式FieldSaver"""
+        savers = []
+        field_saver = getattr(body, "field_saver", None)
+        if isinstance(field_saver, FieldSaver) and field_saver.streaming:
+            savers.append(field_saver)
+        if isinstance(body, CompositeModule):
+            for child in [*body.modules, *body.slots.values()]:
+                savers.extend(cls.get_body_field_savers(child))
+        return savers
+
+    def after_item(self, module: LoopModule, item: Any, result: ModuleExecutionResult):
+        item_key = self.get_item_key(module, item)
+        if result.success and item_key is not None:
+            # 循环体流式导出的数据落盘后才记录为已采集，整体导出只在保存时写入文件，不等待，立即记录
+            after_all_persisted(self.get_body_field_savers(module.get_loop_body_slot()),
+                                partial(self.store.mark_done, self.scope, item_key))
+
+    def on_loop_end(self, module: LoopModule, outputs: Dict[str, Any]):
+        self.store.flush()
+        stats = self.store.get_stats(self.scope)
+        outputs["skipped"] = stats["skipped"]
+        outputs["new_items"] = stats["new"] + stats["revisited"]
+
+
+class PrefetchLoopHook(LoopHook):
+    """处理当前元素时在后台标签页中预取之后几个元素的网址"""
+
+    def __init__(self, browser: BrowserAutomation, prefetcher: PagePrefetcher, url_key: str = ""):
+        self.browser = browser
+        self.prefetcher = prefetcher
+        self.url_key = url_key
+        self.previous_prefetcher: Optional[PagePrefetcher] = None
+
+    @classmethod
+    def create(cls, module: LoopModule) -> Optional["PrefetchLoopHook"]:
+        prefetch_count = int(module.get_optional_variable("prefetch_count", 0))
+        if prefetch_count <= 0:
+            return None
+        browser = BlockModuleAdapter.get_browser_instance()
+        return cls(browser, PagePrefetcher(browser.tab_pool, prefetch_count),
+                   module.get_optional_variable("prefetch_url_key", ""))
+
+    def get_url(self, module: LoopModule, item: Any) -> Optional[str]:
+        url = module.get_item_field(item, self.url_key)
+        return url if isinstance(url, str) and url else None
+
+    def on_loop_start(self, module: LoopModule):
+        self.previous_prefetcher, self.browser.prefetcher = self.browser.prefetcher, self.prefetcher
+
+    def before_item(self, module: LoopModule, index: int, item: Any, upcoming: Callable[[int], List[Any]]):
+        # 之后会被跳过的元素不需要预取
+        urls = [self.get_url(module, upcoming_item) for upcoming_item in upcoming(self.prefetcher.window)]
+        self.prefetcher.prefetch([url for url in urls if url], self.get_url(module, item))
+
+    def on_loop_end(self, module: LoopModule, outputs: Dict[str, Any]):
+        # 循环结束或中断时取消尚未使用的预取
+        self.prefetcher.cancel()
+        self.browser.prefetcher = self.previous_prefetcher
+        outputs["prefetch_stats"] = self.prefetcher.summary()
+        logging.info(f"[{module.module_id}]预取: {outputs['prefetch_stats']}")
+
+
+register_loop_hook(CrawlStateLoopHook)
+register_loop_hook(PrefetchLoopHook)
@@ -0,0 +1,85 @@
+from workflow.module_port import InputDefinition, OutputDefinition, ValueType, ModuleInputs, ModuleOutputs
+from taskflow.task_blocks.network_capture_block import NetworkCaptureBlock
+
+from autoweb.modules_adapter.base_adapter import BlockModuleAdapter
+
+
+class NetworkCaptureBlockAdapter(BlockModuleAdapter):
+    """NetworkCaptureBlock 适配器 - 捕获页面请求的JSON响应"""
+
+    def __init__(self, module_id: str, block_name: str = None):
+        """
+        初始化 NetworkCaptureBlock 适配器
+
+        Args:
+            module_id: 模块ID
+            block_name: Block名称(可选)
+        """
+        # 在使用前，需要先注册 NetworkCaptureBlock 类
+        if "NetworkCaptureBlock" not in self.BLOCK_CLASS_MAP:
+            self.register_block_class("NetworkCaptureBlock", NetworkCaptureBlock)
+
+        super().__init__(module_id, "NetworkCaptureBlock", block_name)
+        # 捕获的响应来自性能日志
+        self.require_launch_option("network_log")
+
+        # 初始化输入输出定义
+        self._initialize_io_definitions()
+
+    def _initialize_io_definitions(self):
+        """初始化输入输出定义"""
+        input_defs = [
+            InputDefinition(
+                name="url_pattern",
+                type=ValueType.STRING,
+                description="响应URL的匹配模式，re:开头为正则表达式，包含*时为通配符，否则为子串匹配",
+                required=True
+            ),
+            InputDefinition(
+                name="min_responses",
+                type=ValueType.INTEGER,
+                description="至少等待到的响应数量，默认为1",
+                required=False
+            ),
+            InputDefinition(
+                name="capture_timeout",
+                type=ValueType.FLOAT,
+                description="等待响应的超时时间（秒），默认为10",
+                required=False
+            ),
+            InputDefinition(
+                name="items_path",
+                type=ValueType.STRING,
+                description="列表数据在响应JSON中的路径，如 data.items，为空时输出整个响应体",
+                required=False
+            ),
+            *self.wait_input_definitions(),
+        ]
+
+        # items可以直接连接到LoopModule的数组输入
+        output_defs = [
+            OutputDefinition(
+                name="responses",
+                type=ValueType.ARRAY,
+                description="捕获到的响应，[{\"url\": ..., \"status\": ..., \"body\": ...}]"
+            ),
+            OutputDefinition(
+                name="items",
+                type=ValueType.ARRAY,
+                description="从各个响应中按items_path取出并合并的数据列表"
+            ),
+            OutputDefinition(
+                name="item_count",
+                type=ValueType.INTEGER,
+                description="数据数量"
+            ),
+        ]
+
+        self.set_inputs(ModuleInputs(
+            inputDefs=input_defs,
+            inputParameters=[]
+        ))
+
+        self.set_outputs(ModuleOutputs(
+            outputDefs=output_defs
+        ))
@@ -27,6 +27,7 @@ class OpenPageBlockAdapter(BlockModuleAdapter):
         # OpenPageBlock 特定属性
         self.page_url = None
         self.fullscreen = False
+        self.block_resources = None
             
         super().__init__(module_id, "OpenPageBlock", block_name)
         
@@ -48,7 +49,41 @@ class OpenPageBlockAdapter(BlockModuleAdapter):
                 type=ValueType.BOOLEAN,
                 description="是否全屏显示",
                 required=False
-            )
+            ),
+            InputDefinition(
+                name="block_resources",
+                type=ValueType.ANY,
+                description="要拦截的资源类型(image/font/stylesheet/media/tracker)列表，"
+                            "或 {\"types\": [...], \"patterns\": [\"*ads*\"]}",
+                required=False
+            ),
+            InputDefinition(
+                name="fetch_mode",
+                type=ValueType.STRING,
+                description="页面获取方式: browser(浏览器打开), static(直接下载服务端渲染的页面，失败时回退到浏览器)",
+                required=False
+            ),
+            InputDefinition(
+                name="detail_tab",
+                type=ValueType.BOOLEAN,
+                description="是否在可复用的详情页标签页中打开，列表页所在的标签页保持不变",
+                required=False
+            ),
+            InputDefinition(
+                name="load_strategy",
+                type=ValueType.STRING,
+                description="页面加载策略: normal(等待load事件), eager(等待DOM解析完成), none(不等待加载)，"
+                            "需要启动配置开启manual_page_load",
+                required=False
+            ),
+            InputDefinition(
+                name="ready_when",
+                type=ValueType.ANY,
+                description="页面就绪条件，XPath字符串表示等待元素出现，或等待条件配置，"
+                            "如 {\"type\": \"item_count\", \"xpath\": \"//section\", \"count\": 10}",
+                required=False
+            ),
+            *self.wait_input_definitions(),
         ]
         
         # 设置输入输出
@@ -58,7 +93,13 @@ class OpenPageBlockAdapter(BlockModuleAdapter):
         ))
         
         self.set_outputs(ModuleOutputs(
-            outputDefs=[]
+            outputDefs=[
+                OutputDefinition(
+                    name="resource_stats",
+                    type=ValueType.OBJECT,
+                    description="加载与拦截的请求统计"
+                ),
+            ]
         ))
     
     def _prepare_execute_params(self, args: Dict[str, Any]) -> BlockExecuteParams:
@@ -71,6 +112,9 @@ class OpenPageBlockAdapter(BlockModuleAdapter):
             
         if "fullscreen" in args:
             self.fullscreen = args["fullscreen"]
+
+        if "block_resources" in args:
+            self.block_resources = args["block_resources"]
         
         return params
     
@@ -83,8 +127,11 @@ class OpenPageBlockAdapter(BlockModuleAdapter):
         if result.success:
             try:
                 browser = self.get_browser_instance()
-                current_url = browser.browser.current_url
+                # 静态模式下浏览器没有导航，使用下载页面的最终网址
+                current_url = browser.get_current_url()
                 result.outputs["current_url"] = current_url
+                if self.block_resources:
+                    result.outputs["resource_stats"] = browser.get_resource_stats()
             except Exception as e:
                 # 获取URL失败不影响执行结果
                 logging.warning(f"获取当前URL失败: {str(e)}")
@@ -0,0 +1,46 @@
+from workflow.module_port import InputDefinition, ValueType, ModuleInputs, ModuleOutputs
+from taskflow.task_blocks.rollback_block import RollbackBlock
+
+from autoweb.modules_adapter.base_adapter import BlockModuleAdapter
+
+
+class RollbackBlockAdapter(BlockModuleAdapter):
+    """RollbackBlock 适配器 - 回退到上一个页面"""
+
+    def __init__(self, module_id: str, block_name: str = None):
+        """
+        初始化 RollbackBlock 适配器
+
+        Args:
+            module_id: 模块ID
+            block_name: Block名称(可选)
+        """
+        # 在使用前，需要先注册 RollbackBlock 类
+        if "RollbackBlock" not in self.BLOCK_CLASS_MAP:
+            self.register_block_class("RollbackBlock", RollbackBlock)
+
+        super().__init__(module_id, "RollbackBlock", block_name)
+
+        # 初始化输入输出定义
+        self._initialize_io_definitions()
+
+    def _initialize_io_definitions(self):
+        """初始化输入输出定义"""
+        input_defs = [
+            InputDefinition(
+                name="wait_time",
+                type=ValueType.INTEGER,
+                description="等待时间(秒)",
+                required=False
+            ),
+            *self.wait_input_definitions(),
+        ]
+
+        self.set_inputs(ModuleInputs(
+            inputDefs=input_defs,
+            inputParameters=[]
+        ))
+
+        self.set_outputs(ModuleOutputs(
+            outputDefs=[]
+        ))
@@ -0,0 +1,117 @@
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+import asyncio
+import unittest
+from workflow.module import LoopModule, SlotModule
+from workflow.module_context import ModuleContext
+from workflow.module_port import ValueSourceType
+from autoweb.modules_adapter import (
+    BlockModuleAdapter, ClickElementBlockAdapter, RollbackBlockAdapter, IfBlockAdapter,
+    FlowTranslator, FlowTranslateError
+)
+
+
+class RecordingBrowser:
+    """记录点击和回退操作的浏览器替身"""
+
+    def __init__(self):
+        self.actions = []
+
+    def click_element_and_track(self, xpath, element=None, wait_navigation=False):
+        self.actions.append(("click", xpath))
+
+    def get_element_in_scope(self, scope, relative_xpath, timeout=None):
+        return scope.absolute_xpath(relative_xpath)
+
+    def rollback_page(self):
+        self.actions.append(("rollback",))
+
+    def get_elements_by_xpaths(self, xpaths):
+        return xpaths
+
+    def evaluate_conditions(self, scripts, element, first_match=False):
+        return [None if script is None else element.endswith("[2]") for script in scripts]
+
+
+LOOP_FLOW = {
+    "flow": [
+        {"block": "StartBlock", "name": "开始块"},
+        {
+            "block": "LoopBlock",
+            "name": "循环点击链接",
+            "loop_type": {"name": "固定循环", "type": "FixedLoopType", "values": ["//a[1]", "//a[2]"]},
+            "inners": [
+                {"block": "ClickElementBlock", "name": "点击按钮", "xpath": "/span", "use_relative_xpath": "True"},
+                {"block": "RollbackBlock", "name": "回退"},
+                {
+                    "block": "IfBlock",
+                    "name": "判断",
+                    "inners": [
+                        {
+                            "block": "ExecJavaScriptConditionBlock",
+                            "name": "第二项",
+                            "js_script": "return true",
+                            "inners": [
+                                {"block": "ClickElementBlock", "name": "再次点击", "xpath": "/b",
+                                 "use_relative_xpath": "True"}
+                            ]
+                        },
+                        {"block": "PassConditionBlock", "name": "无条件", "inners": []}
+                    ]
+                }
+            ]
+        },
+        {"block": "EndBlock", "name": "结束块", "inners": []}
+    ]
+}
+
+
+class FlowTranslatorTest(unittest.TestCase):
+
+    def setUp(self):
+        self.browser = RecordingBrowser()
+        BlockModuleAdapter._browser_instance = self.browser
+
+    def tearDown(self):
+        BlockModuleAdapter._browser_instance = None
+
+    def test_module_tree(self):
+        workflow = FlowTranslator().translate(LOOP_FLOW)
+        self.assertEqual(2, len(workflow.modules))  # 结束块不转换
+        loop = workflow.modules[1]
+        self.assertIsInstance(loop, LoopModule)
+        body = loop.get_loop_body_slot()
+        self.assertIsInstance(body, SlotModule)
+        click, rollback, if_module = body.modules
+        self.assertIsInstance(click, ClickElementBlockAdapter)
+        self.assertIsInstance(rollback, RollbackBlockAdapter)
+        self.assertIsInstance(if_module, IfBlockAdapter)
+
+        params = {param.name: param.input for param in click.inputs.inputParameters}
+        self.assertIs(True, params["use_relative_xpath"].value.content)
+        self.assertEqual(ValueSourceType.REF, params["loop_item"].value.type)
+        self.assertEqual(body.module_id, params["loop_item"].value.content.moduleID)
+        # 回退模块不需要循环项
+        self.assertNotIn("loop_item", [param.name for param in rollback.inputs.inputParameters])
+
+    def test_execute_translated_flow(self):
+        workflow = FlowTranslator().translate(LOOP_FLOW)
+        workflow.set_context(ModuleContext())
+        result = asyncio.run(workflow.execute())
+
+        self.assertTrue(result.success)
+        self.assertEqual([
+            ("click", "//a[1]/span"), ("rollback",),
+            ("click", "//a[2]/span"), ("rollback",), ("click", "//a[2]/b"),
+        ], self.browser.actions)
+
+    def test_unsupported_loop_type(self):
+        flow = [{"block": "LoopBlock", "loop_type": {"type": "XPathQueryLoopType", "xpath": "//a"}, "inners": []}]
+        with self.assertRaises(FlowTranslateError):
+            FlowTranslator().translate(flow)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import asyncio
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Union
+
+from browser.browser_automation import BrowserAutomation
+from browser.launch_profile import LaunchProfile
+from browser.wait_conditions import WaitCondition, async_wait_until, create_wait_condition
+
+
+class AsyncBrowserAutomation:
+    """
+    BrowserAutomation的异步包装
+
+    WebDriver不是线程安全的，每个浏览器使用一个单线程执行器串行执行所有浏览器调用，
+    事件循环只在等待浏览器时让出，因此多个浏览器(多个流程)可以在同一个事件循环中并发运行。
+    未单独包装的方法通过属性访问自动转为协程，如 await async_browser.open_page(url)
+    """
+
+    def __init__(self, browser: BrowserAutomation, executor: Optional[ThreadPoolExecutor] = None):
+        self.browser = browser
+        self.executor = executor or ThreadPoolExecutor(max_workers=1, thread_name_prefix="browser")
+
+    @classmethod
+    async def launch(cls, launch_profile: Union[None, str, Dict[str, Any], LaunchProfile] = None
+                     ) -> "AsyncBrowserAutomation":
+        """在浏览器线程中启动浏览器，启动期间不阻塞事件循环"""
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="browser")
+        browser = await asyncio.get_running_loop().run_in_executor(executor, BrowserAutomation, launch_profile)
+        return cls(browser, executor)
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        """在浏览器线程中执行同步函数"""
+        return await asyncio.get_running_loop().run_in_executor(self.executor,
+                                                                 functools.partial(func, *args, **kwargs))
+
+    def __getattr__(self, name: str):
+        attribute = getattr(self.browser, name)
+        if not callable(attribute):
+            return attribute
+
+        async def call(*args, **kwargs):
+            return await self.run(attribute, *args, **kwargs)
+
+        return call
+
+    async def wait_until(self, condition: Union[WaitCondition, Dict[str, Any]],
+                         timeout: Optional[float] = None, poll_interval: Optional[float] = None) -> Any:
+        """
+        异步轮询等待条件满足，每次检查在浏览器线程中执行，两次检查之间让出事件循环
+        :return: 条件满足时的结果，超时返回None
+        """
+        return await async_wait_until(self.browser.browser,
+                                      create_wait_condition(condition),
+                                      self.browser.default_timeout if timeout is None else timeout,
+                                      self.browser.poll_interval if poll_interval is None else poll_interval,
+                                      self.run,
+                                      self.browser.wait_stats)
+
+    async def quit(self):
+        await self.run(self.browser.quit)
+        self.executor.shutdown(wait=False)
+        logging.info("浏览器线程已退出")
@@ -1,104 +1,869 @@
 import logging
-from typing import Optional
+import time
+from urllib.parse import urldefrag
+from typing import Optional, Dict, List, Tuple, Any, Union, Callable
 
 from selenium import webdriver
-from selenium.webdriver.common.by import By
 from selenium.webdriver.common.action_chains import ActionChains
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException
 from selenium.webdriver.remote.webelement import WebElement
-from selenium.webdriver.edge.options import Options
 
+from browser.element_cache import ElementScope, to_scoped_xpath
+from browser.dom_snapshot import DomSnapshot, DomSnapshotCache, DOM_VERSION_SCRIPT, OUTER_HTML_SCRIPT
+from browser.launch_profile import LaunchProfile, get_launch_profile
+from browser.network_capture import ResponseRecorder, read_response_body
+from browser.static_fetcher import StaticPageFetcher
+from browser.session_state import SessionState, STORAGE_EXPORT_SCRIPT, check_session_state
+from browser.profile_manager import ProfileManager
+from browser.performance_log import PerformanceLog
+from browser.resource_blocker import ResourceBlocker, ResourceStatistics, resolve_block_config
 from browser.page_tracker import NewPageSWitcher, CurrentPageSWitcher, PageTracker
+from browser.page_prefetcher import PagePrefetcher
+from browser.politeness import PolitenessTicket, get_politeness_scheduler
+from browser.tab_pool import TabPool
+from browser.wait_conditions import WaitCondition, WaitStatistics, ElementPresentCondition, \
+    DocumentReadyCondition, NavigationCondition, create_wait_condition, create_wait_conditions, wait_until
+
+
+ELEMENTS_BY_XPATHS_SCRIPT = """
+return arguments[0].map(function (xpath) {
+    try {
+        return document.evaluate(xpath, document, null,
+                                 XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+    } catch (e) {
+        return null;
+    }
+});
+"""
+
+ELEMENTS_BY_XPATH_QUERY_SCRIPT = """
+var result = document.evaluate(arguments[0], document, null,
+                               XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+var elements = [];
+for (var i = 0; i < result.snapshotLength; i++) {
+    elements.push(result.snapshotItem(i));
+}
+return elements;
+"""
+
+# 在一次调用中求出多个循环项的标识，属性为href或src时转换为绝对网址
+# arguments: 循环项XPath列表, 标识XPath(相对循环项，为空时使用循环项的文本)
+ITEM_KEYS_SCRIPT = """
+var keyXpath = arguments[1];
+return arguments[0].map(function (xpath) {
+    try {
+        var item = document.evaluate(xpath, document, null,
+                                     XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+        var node = item && keyXpath
+            ? document.evaluate(keyXpath, item, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue
+            : item;
+        if (!node) return null;
+        if (node.nodeType === 2 && (node.name === 'href' || node.name === 'src')) {
+            return new URL(node.value, document.baseURI).href;
+        }
+        return (node.textContent || '').trim();
+    } catch (e) {
+        return null;
+    }
+});
+"""
+
+# 在一次调用中依次求值多个条件函数，conditions由build_conditions_script生成
+# arguments: 循环项元素, 是否在第一个满足的条件后停止
+CONDITIONS_SCRIPT = """
+var element = arguments[0];
+var firstMatch = arguments[1];
+var results = [];
+for (var i = 0; i < conditions.length; i++) {
+    if (conditions[i] === null) {
+        results.push(null);
+        continue;
+    }
+    var matched = !!conditions[i].call(null, element);
+    results.push(matched);
+    if (matched && firstMatch) break;
+}
+return results;
+"""
+
+
+def build_conditions_script(scripts: List[Optional[str]]) -> str:
+    """
+    把多个条件脚本合并为一个脚本，每个条件脚本包装为一个函数，arguments[0]仍然是循环项元素；
+    不使用eval/new Function，页面的CSP不影响求值
+    :param scripts: 条件脚本列表，为None的条件不在页面中求值，结果为null
+    """
+    functions = ",\n".join("null" if script is None else "function () {\n" + script + "\n}" for script in scripts)
+    return "var conditions = [\n" + functions + "\n];\n" + CONDITIONS_SCRIPT
+
+
+# 以循环项元素为上下文节点求值相对XPath，循环项元素已经从文档中移除时返回失效标记
+# arguments: 循环项元素, 以.开头的相对XPath
+SCOPED_ELEMENT_SCRIPT = """
+var scope = arguments[0];
+if (!scope || !scope.isConnected) return [true, null];
+try {
+    return [false, document.evaluate(arguments[1], scope, null,
+                                     XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue];
+} catch (e) {
+    return [false, null];
+}
+"""
+
+# 循环项的链接，相对循环项的XPath，循环项本身或者其中第一个带href的元素
+DEFAULT_HREF_XPATH = "descendant-or-self::*[@href][1]/@href"
+
+# 在一次调用中求出XPath匹配到的所有元素的链接(绝对网址)
+# arguments: 可匹配多个元素的XPath, 链接相对元素的XPath
+LINKS_BY_XPATH_QUERY_SCRIPT = """
+var result = document.evaluate(arguments[0], document, null,
+                               XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+var links = [];
+for (var i = 0; i < result.snapshotLength; i++) {
+    try {
+        var node = document.evaluate(arguments[1], result.snapshotItem(i), null,
+                                     XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+        var value = node && (node.nodeType === 2 ? node.value : node.getAttribute('href'));
+        links.push(value ? new URL(value, document.baseURI).href : null);
+    } catch (e) {
+        links.push(null);
+    }
+}
+return links;
+"""
+
+COUNT_XPATH_SCRIPT = """
+return document.evaluate('count(' + arguments[0] + ')', document, null,
+                         XPathResult.NUMBER_TYPE, null).numberValue;
+"""
+
+PAGE_STATE_SCRIPT = """
+return [location.href, window.innerWidth, window.innerHeight];
+"""
+
+VIEWPORT_SIZE_SCRIPT = """
+return [window.innerWidth, window.innerHeight];
+"""
+
+TRACKED_CLICK_STATE_SCRIPT = """
+var element = document.evaluate(arguments[0], document, null,
+                                XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+return [element, location.href];
+"""
+
+DOCUMENT_ORIGIN_SCRIPT = """
+return String(performance.timeOrigin);
+"""
+
+# 页面网址与标题，用于识别验证码页面
+PAGE_IDENTITY_SCRIPT = """
+return [location.href, document.title];
+"""
+
+# 停止当前文档的加载，用于取消预取
+STOP_LOADING_SCRIPT = """
+window.stop();
+"""
+
+# Network.setCookies接受的Cookie字段
+COOKIE_PARAM_KEYS = ("name", "value", "domain", "path", "secure", "httpOnly", "sameSite", "expires",
+                     "priority", "sourceScheme", "sourcePort", "partitionKey")
+
+# 页面加载策略对应的文档状态，none只等待新文档提交
+LOAD_STRATEGY_STATES: Dict[str, List[str]] = {
+    "normal": ["complete"],
+    "eager": ["interactive", "complete"],
+    "none": [],
+}
 
 
 class BrowserAutomation:
 
-    def __init__(self):
-        
-        options = Options()
-        options.add_argument("--remote-debugging-port=9222")
-        options.add_argument('--user-data-dir=./edge_user_data')
-        options.add_argument('--disable-gpu')  # 禁用GPU加速
-        options.add_argument('--no-sandbox')  # 禁用沙盒模式
-        options.add_argument('--disable-dev-shm-usage')  # 禁用/dev/shm使用
-        options.add_argument('--disable-extensions')  # 禁用扩展
-        options.add_argument('--disable-browser-side-navigation')  # 禁用浏览器侧边导航
-        options.add_argument('--disable-infobars')  # 禁用信息栏
-        # options.add_experimental_option('excludeSwitches', ['enable-automation'])  # 禁用自动化提示
+    def __init__(self, launch_profile: Union[None, str, Dict[str, Any], LaunchProfile] = None):
+        """
+        :param launch_profile: 启动配置名称或配置，为空时使用环境变量AUTOWEB_BROWSER_PROFILE指定的配置
+        """
+        self.launch_profile = get_launch_profile(launch_profile)
+        self.profile_manager: Optional[ProfileManager] = None
+        self.session_profile_dir: Optional[str] = None
+        if self.launch_profile.template_dir:
+            # 从模板克隆独立的用户目录，调试端口交给驱动分配，避免并行会话冲突
+            self.profile_manager = ProfileManager(self.launch_profile.template_dir)
+            self.profile_manager.gc()
+            self.session_profile_dir = self.profile_manager.clone()
+            self.launch_profile = self.launch_profile.copy(user_data_dir=self.session_profile_dir,
+                                                           debugging_port=None)
+        options = self.launch_profile.to_options()
+        launch_start = time.monotonic()
         self.browser = webdriver.Edge(options=options)
+        self.launch_time = time.monotonic() - launch_start  # 浏览器启动耗时（秒）
+        logging.info(f"浏览器已启动，配置: {self.launch_profile.name}，耗时{self.launch_time:.2f}秒")
         self.page_tracker = PageTracker()
+        self.snapshot_cache = DomSnapshotCache()
+        self.page_versions: Dict[str, int] = {}  # the key type is window_handle, 记录标签页内的导航次数
+        self.default_timeout = 10  # 等待条件的默认超时时间（秒）
+        self.optional_timeout = 1  # 可能不存在的元素(如提取的字段)的查找超时时间（秒）
+        self.poll_interval = 0.2  # 等待条件的默认轮询间隔（秒）
+        self.load_strategy = self.launch_profile.load_strategy  # 默认的页面加载策略：normal/eager/none
+        # 驱动不等待页面加载，由本类按load_strategy自行等待；否则驱动按默认的加载策略等待
+        self.manual_page_load = self.launch_profile.manual_page_load
+        self.page_load_timeout = 30  # 页面加载的超时时间（秒）
+        self.click_navigation_timeout = 2  # 跟踪点击后等待导航发生的时间（秒）
+        self.wait_stats = WaitStatistics()
+        self.scope_stats = {"scoped": 0, "stale": 0, "fallback": 0}  # 循环项元素内相对查找的统计
+        self._current_handle: Optional[str] = None  # 当前标签页句柄的本地缓存
+        self.detail_handle: Optional[str] = None  # 可复用的详情页标签页
+        self.tab_concurrency = 1  # 标签池最多同时加载的页面数量
+        self._tab_pool: Optional[TabPool] = None
+        self.prefetcher: Optional[PagePrefetcher] = None  # 正在运行的循环的预取器，详情页经由它打开
+        # 各标签页进行中的导航占用的限速名额，页面就绪后释放
+        self._navigation_tickets: Dict[str, PolitenessTicket] = {}
+        self._script_timeout: Optional[float] = None  # 已设置的异步脚本超时时间
+        # 在每个新文档执行前注入的脚本，新建的标签页需要重新注入
+        self.new_document_scripts: List[str] = []
+        self._static_fetcher: Optional[StaticPageFetcher] = None
+        self.static_page: Optional[DomSnapshot] = None  # 静态模式下打开的页面，浏览器并没有导航到该页面
+        self.performance_log = PerformanceLog(self.browser, self.launch_profile.network_log)
+        self.resource_blocker = ResourceBlocker(self.browser)
+        self.resource_stats = ResourceStatistics()
+        self.performance_log.add_listener(self.resource_stats.on_event)
+        self.response_recorder = ResponseRecorder()
+        self.performance_log.add_listener(self.response_recorder.on_event)
+
+    def open_page(self, url: str, load_strategy: Optional[str] = None,
+                  ready_when: Union[None, Dict, List] = None) -> bool:
+        """
+        打开网页
+        :param url: 网址
+        :param load_strategy: 加载策略，normal等待load事件，eager等待DOM解析完成，none只等待新文档提交，
+                              为空时使用默认策略；需要启动配置开启manual_page_load，否则由驱动按默认策略等待
+        :param ready_when: 页面就绪条件，如 {"type": "item_count", "xpath": "//li", "count": 10}，
+                           满足后才返回，用于数据在加载完成之前或之后才出现的页面
+        :return: 页面是否在超时时间内就绪
+        """
+        if load_strategy and load_strategy != self.load_strategy and not self.manual_page_load:
+            logging.debug(f"加载策略{load_strategy}需要在启动配置中开启manual_page_load，按默认策略{self.load_strategy}加载")
+        previous_origin = self.start_page_load(url)
+        ready = self.wait_for_page_load(previous_origin, load_strategy, ready_when)
+        self.performance_log.poll()
+        return ready
+
+    def start_page_load(self, url: str) -> Optional[str]:
+        """
+        在当前标签页中发起导航，开启manual_page_load时不等待加载，否则由驱动等待加载完成后返回
+        :return: 导航前文档的标识，传给wait_for_page_load等待新文档提交
+        """
+        self.static_page = None
+        self.resource_blocker.apply(self.current_handle)
+        previous_origin = self.browser.execute_script(DOCUMENT_ORIGIN_SCRIPT) if self.manual_page_load else None
+        self._reserve_navigation(url)
+        try:
+            self.browser.get(url)
+        except TimeoutException:
+            logging.warning(f"打开{url}时页面加载超时")
+        self.mark_navigation(self.current_handle)
+        return previous_origin
+
+    def stop_page_load(self):
+        """停止当前标签页中的页面加载"""
+        self.browser.execute_script(STOP_LOADING_SCRIPT)
+        self._finish_navigation(self.current_handle)
+
+    def _reserve_navigation(self, url: str):
+        """按站点限速等待，占用的名额在页面就绪后释放，没有设置限速时直接返回"""
+        scheduler = get_politeness_scheduler()
+        if scheduler is None:
+            return
+        # 同一标签页中上一次导航即将被新的导航取代
+        self._finish_navigation(self.current_handle)
+        self._navigation_tickets[self.current_handle] = scheduler.acquire(url)
+
+    def _finish_navigation(self, window_handle: str, ready: bool = True, check_page: bool = False):
+        """释放标签页的限速名额，check_page为True时检查页面是否为验证码页面"""
+        ticket = self._navigation_tickets.pop(window_handle, None)
+        if ticket is None:
+            return
+        blocked = False
+        if check_page:
+            try:
+                url, title = self.browser.execute_script(PAGE_IDENTITY_SCRIPT)
+                blocked = ticket.scheduler.is_blocked_page(url, title)
+            except Exception as e:
+                logging.debug(f"读取页面网址与标题失败: {e}")
+        ticket.release(error=not ready, blocked=blocked)
+
+    def open_detail_page(self, url: str, load_strategy: Optional[str] = None,
+                         ready_when: Union[None, Dict, List] = None) -> bool:
+        """
+        在可复用的详情页标签页中打开网址，列表页所在的标签页保持不变，
+        返回列表页只需要切换回原来的标签页，不需要回退和重新渲染
+        循环设置了预取时，在预取的标签页中打开
+        :return: 页面是否在超时时间内就绪
+        """
+        if self.prefetcher is not None:
+            return self.prefetcher.open(url, load_strategy, ready_when)
+        if self.detail_handle is None:
+            self.detail_handle = self.new_tab()
+            logging.info(f"创建详情页标签页{self.detail_handle}")
+        elif self.current_handle != self.detail_handle:
+            self.switch_to_window(self.detail_handle)
+        return self.open_page(url, load_strategy, ready_when)
+
+    def close_detail_page(self, return_handle: Optional[str] = None):
+        """关闭详情页标签页，切换到return_handle"""
+        if self.detail_handle is None:
+            return
+        self.close_tab(self.detail_handle)
+        self.detail_handle = None
+        if return_handle:
+            self.switch_to_window(return_handle)
+
+    def new_tab(self) -> str:
+        """新建标签页并切换过去，返回它的句柄"""
+        self.browser.switch_to.new_window("tab")
+        self._current_handle = self.browser.current_window_handle
+        for source in self.new_document_scripts:
+            self.browser.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": source})
+        return self._current_handle
+
+    def close_tab(self, window_handle: str):
+        """关闭标签页，之后需要调用switch_to_window切换到其他标签页"""
+        if self.current_handle != window_handle:
+            self.switch_to_window(window_handle)
+        self.browser.close()
+        self.resource_blocker.forget(window_handle)
+        self._current_handle = None
+
+    def set_tab_concurrency(self, size: int):
+        """设置标签池最多同时加载的页面数量，大于1时详情页在标签池中并行加载"""
+        self.tab_concurrency = max(1, int(size))
+        if self._tab_pool is not None:
+            self._tab_pool.size = self.tab_concurrency
+
+    @property
+    def tab_pool(self) -> TabPool:
+        if self._tab_pool is None:
+            self._tab_pool = TabPool(self, self.tab_concurrency)
+        return self._tab_pool
+
+    @property
+    def static_fetcher(self) -> StaticPageFetcher:
+        if self._static_fetcher is None:
+            self._static_fetcher = StaticPageFetcher()
+        return self._static_fetcher
+
+    def open_static_page(self, url: str) -> bool:
+        """
+        不经过浏览器直接下载页面，之后的快照提取都在下载的页面上进行，
+        需要与页面交互时再由ensure_live_page在浏览器中打开
+        :return: 是否下载成功
+        """
+        self.static_page = self.static_fetcher.fetch(url)
+        return self.static_page is not None
+
+    def get_current_url(self) -> str:
+        """当前页面的网址，静态模式下为下载页面重定向后的最终网址"""
+        if self.static_page is not None:
+            return self.static_page.url
+        return self.browser.current_url
+
+    def ensure_live_page(self):
+        """当前是静态模式打开的页面时，改为在浏览器中打开"""
+        if self.static_page is not None:
+            url = self.static_page.url
+            logging.info(f"静态页面{url}需要浏览器处理，改为在浏览器中打开")
+            self.open_page(url)
+
+    def wait_for_page_load(self, previous_origin: Optional[str] = None, load_strategy: Optional[str] = None,
+                           ready_when: Union[None, Dict, List] = None) -> bool:
+        """
+        等待导航后的页面按加载策略就绪
+        :param previous_origin: 导航前文档的标识，不为空时先等待新文档提交
+        :return: 是否在超时时间内就绪
+        """
+        load_strategy = load_strategy or self.load_strategy
+        states = LOAD_STRATEGY_STATES.get(load_strategy)
+        if states is None:
+            raise Exception("Unknown load strategy {}".format(load_strategy))
+
+        ready = True
+        # 没有开启manual_page_load时驱动已经按默认策略等待过，只需要等待就绪条件
+        if self.manual_page_load and (states or previous_origin is not None):
+            ready = self.wait_until(DocumentReadyCondition(states, previous_origin),
+                                    self.page_load_timeout) is not None
+            if not ready:
+                logging.warning(f"页面在{self.page_load_timeout}秒内没有达到{load_strategy}加载状态")
+        for condition in create_wait_conditions(ready_when):
+            if self.wait_until(condition, self.page_load_timeout) is None:
+                logging.warning(f"页面就绪条件{condition}在超时时间内没有满足")
+                ready = False
+        self._finish_navigation(self.current_handle, ready, check_page=True)
+        return ready
+
+    def set_blocked_resources(self, config: Union[None, List[str], Dict[str, Any]]):
+        """
+        设置要拦截的资源，对之后打开的页面生效
+        :param config: 资源类型列表，如 ["image", "font", "stylesheet", "media", "tracker"]；
+                       或 {"types": [...], "patterns": ["*ads*"]}，为空时取消拦截
+        """
+        self.resource_blocker.set_config(*resolve_block_config(config))
+        self.resource_blocker.apply(self.current_handle)
+
+    def export_session_state(self, path: str) -> SessionState:
+        """
+        导出会话状态到文件：所有Cookie，以及已打开标签页所在源的localStorage与sessionStorage
+        """
+        cookies = self.browser.execute_cdp_cmd("Network.getAllCookies", {}).get("cookies", [])
+        origins = {}
+        origin_handle = self.current_handle
+        for handle in self.browser.window_handles:
+            if handle != self.current_handle:
+                self.switch_to_window(handle)
+            origin, local_items, session_items = self.browser.execute_script(STORAGE_EXPORT_SCRIPT)
+            if origin and origin != "null":
+                state = origins.setdefault(origin, {"local": {}, "session": {}})
+                state["local"].update(local_items)
+                state["session"].update(session_items)
+        if self.current_handle != origin_handle:
+            self.switch_to_window(origin_handle)
+
+        state = SessionState(cookies, origins)
+        state.save(path)
+        logging.info(f"已导出会话状态到{path}: {len(cookies)}个Cookie，{len(origins)}个源的存储")
+        return state
+
+    def restore_session_state(self, path: str, ttl: Optional[float] = None,
+                              required_cookies: Optional[List[str]] = None) -> bool:
+        """
+        在打开页面之前恢复会话状态
+        :param path: 会话快照文件
+        :param ttl: 快照有效期（秒），为空时不过期
+        :param required_cookies: 必需的Cookie名称，任一缺失或过期时视为快照无效
+        :return: 是否恢复成功，失败时需要重新登录
+        """
+        state = SessionState.load(path)
+        if not check_session_state(state, ttl, required_cookies):
+            return False
+        cookies = []
+        for cookie in state.cookies:
+            cookie_param = {key: cookie[key] for key in COOKIE_PARAM_KEYS if key in cookie}
+            if cookie.get("session") or cookie_param.get("expires", -1) < 0:
+                # 会话Cookie不能带expires，否则会被当作已过期
+                cookie_param.pop("expires", None)
+            cookies.append(cookie_param)
+        self.browser.execute_cdp_cmd("Network.enable", {})
+        self.browser.execute_cdp_cmd("Network.setCookies", {"cookies": cookies})
+        if state.origins:
+            # 存储只能在对应源的页面中写入，因此注入到之后每个新文档中执行
+            self.add_new_document_script(state.storage_restore_script())
+        logging.info(f"已从{path}恢复会话状态: {len(cookies)}个Cookie，{len(state.origins)}个源的存储")
+        return True
+
+    def add_new_document_script(self, source: str):
+        """在当前标签页以及之后新建的标签页中，每个新文档执行前注入脚本"""
+        self.browser.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": source})
+        self.new_document_scripts.append(source)
+
+    def quit(self):
+        """关闭浏览器，并删除本会话的用户目录副本"""
+        for ticket in self._navigation_tickets.values():
+            ticket.release()
+        self._navigation_tickets.clear()
+        self.resource_blocker.close()
+        try:
+            self.browser.quit()
+        finally:
+            if self.profile_manager and self.session_profile_dir:
+                self.profile_manager.release(self.session_profile_dir)
+                self.session_profile_dir = None
+
+    def capture_responses(self, url_pattern: str, min_count: int = 1, timeout: Optional[float] = None,
+                          consume: bool = True) -> List[Dict[str, Any]]:
+        """
+        获取页面自己发出的XHR/Fetch请求的JSON响应
+        :param url_pattern: URL匹配模式，re:开头为正则表达式，包含*时为通配符，否则为子串
+        :param min_count: 至少等待到的响应数量
+        :param timeout: 等待超时时间（秒），超时后返回已经捕获到的响应
+        :param consume: 是否标记为已读取，已读取的响应不会被再次返回
+        :return: [{"url": ..., "status": ..., "body": 解析后的JSON}]
+        """
+        if not self.performance_log.available:
+            logging.warning("没有开启性能日志，无法捕获响应，需要在启动配置中设置network_log")
+            return []
+        timeout = self.default_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        while True:
+            self.performance_log.poll()
+            records = self.response_recorder.find(url_pattern)
+            if len(records) >= min_count or time.monotonic() >= deadline:
+                break
+            time.sleep(self.poll_interval)
 
-    def open_page(self, url: str):
-        self.browser.get(url)
+        responses = []
+        for record in records:
+            body = read_response_body(self.browser, record)
+            if body is not None:
+                responses.append({"url": record["url"], "status": record["status"], "body": body})
+        if consume:
+            self.response_recorder.consume(records)
+        if len(records) < min_count:
+            logging.warning(f"{timeout}秒内只捕获到{len(records)}个匹配{url_pattern}的响应")
+        return responses
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """浏览器运行指标：启动配置与耗时、等待统计、网络请求统计"""
+        metrics = {
+            "launch_profile": self.launch_profile.name,
+            "launch_time": self.launch_time,
+            "wait": self.wait_stats.summary(),
+            "resources": self.get_resource_stats(),
+            "scoped_lookup": dict(self.scope_stats),
+        }
+        if self._tab_pool is not None:
+            metrics["tab_pool"] = self._tab_pool.summary()
+        scheduler = get_politeness_scheduler()
+        if scheduler is not None:
+            metrics["politeness"] = scheduler.summary()
+        if self._static_fetcher is not None:
+            metrics["static_fetch"] = dict(self._static_fetcher.stats)
+        return metrics
+
+    def get_resource_stats(self) -> Dict[str, Any]:
+        """读取最新的网络事件，返回加载与拦截的请求统计"""
+        self.performance_log.poll()
+        return self.resource_stats.summary()
+
+    @property
+    def current_handle(self) -> str:
+        """当前标签页句柄，切换标签页都经过本类，因此可以在本地缓存"""
+        if self._current_handle is None:
+            self._current_handle = self.browser.current_window_handle
+        return self._current_handle
+
+    def switch_to_window(self, window_handle: str):
+        self.browser.switch_to.window(window_handle)
+        self._current_handle = window_handle
+        if self.resource_blocker.enabled:
+            self.resource_blocker.apply(window_handle)
 
     def track_page_switch(self):
         ...
 
+    def mark_navigation(self, window_handle: str):
+        """记录标签页内发生了导航，之前获取的元素句柄随之失效"""
+        self.page_versions[window_handle] = self.page_versions.get(window_handle, 0) + 1
+
+    def invalidate_elements(self):
+        """当前标签页的页面被未跟踪的点击或脚本改变，之前获取的元素句柄随之失效"""
+        self.mark_navigation(self.current_handle)
+
+    def get_page_version(self) -> Tuple[str, int]:
+        """当前页面的版本，(window_handle, 导航次数)，用于判断缓存的元素句柄是否仍然有效"""
+        window_handle = self.current_handle
+        return window_handle, self.page_versions.get(window_handle, 0)
+
     def rollback_page(self):
-        self.page_tracker.back(self.browser)
+        previous_origin = None
+        switcher = self.page_tracker.peek(self.current_handle)
+        if self.manual_page_load and isinstance(switcher, CurrentPageSWitcher) and not switcher.same_document:
+            # 当前标签页回退，需要确认回到了上一个文档；同一文档内的导航回退时文档不变，不需要等待
+            previous_origin = self.browser.execute_script(DOCUMENT_ORIGIN_SCRIPT)
+        switcher = self.page_tracker.back(self.browser, self.current_handle)
+        if isinstance(switcher, NewPageSWitcher):
+            self.resource_blocker.forget(self._current_handle)
+            self._current_handle = switcher.last_handle
+        elif isinstance(switcher, CurrentPageSWitcher):
+            self.mark_navigation(self.current_handle)
+            if not switcher.same_document:
+                self.wait_for_page_load(previous_origin)
+
+    def wait_until(self, condition: Union[WaitCondition, Dict[str, Any]],
+                   timeout: Optional[float] = None, poll_interval: Optional[float] = None) -> Any:
+        """
+        轮询等待条件满足
+        :param condition: 等待条件或其配置，如 {"type": "element_visible", "xpath": "..."}
+        :param timeout: 超时时间（秒），条件自身配置的超时时间优先
+        :param poll_interval: 轮询间隔（秒）
+        :return: 条件满足时的结果，超时返回None
+        """
+        return wait_until(self.browser,
+                          create_wait_condition(condition),
+                          self.default_timeout if timeout is None else timeout,
+                          self.poll_interval if poll_interval is None else poll_interval,
+                          self.wait_stats)
 
-    def click_element(self, xpath: str) -> bool:
+    def click_element(self, xpath: str, element: Optional[WebElement] = None) -> bool:
+        """
+        :param element: 已经查找到的目标元素，为空时按xpath查找
+        """
         try:
-            element = self.browser.find_element(By.XPATH, xpath)
+            element = element or self.get_element_by_xpath(xpath)
+            if element is None:
+                return False
             ActionChains(self.browser).click(element).perform()
             return True
+        except StaleElementReferenceException:
+            # 缓存的元素已失效，按XPath重新查找后再点击一次
+            self.invalidate_elements()
+            try:
+                element = self.get_element_by_xpath(xpath)
+                if element is None:
+                    return False
+                ActionChains(self.browser).click(element).perform()
+                return True
+            except Exception as e:
+                logging.log(logging.DEBUG, f"元素{xpath}不存在 Exception: {e}")
+                return False
         except Exception as e:
             logging.log(logging.DEBUG, f"元素{xpath}不存在 Exception: {e}")
             return False
 
-    def click_element_and_track(self, xpath: str):
-        self.browser.implicitly_wait(10)
+    def click_element_and_track(self, xpath: str, element: Optional[WebElement] = None,
+                                wait_navigation: bool = False) -> bool:
+        """
+        :param element: 已经查找到的目标元素，为空时按xpath查找
+        :param wait_navigation: 点击后是否等待导航发生，用于点击后由脚本延迟跳转的页面
+        :return: 是否点击成功
+        """
+        self.ensure_live_page()
+        if element is not None:
+            origin_url = self.browser.current_url
+        else:
+            # 一次脚本调用同时拿到目标元素和点击前的网址
+            element, origin_url = self.browser.execute_script(TRACKED_CLICK_STATE_SCRIPT, xpath)
 
-        origin_handle = self.browser.current_window_handle
-        origin_url = self.browser.current_url
-        origin_handles_len = len(self.browser.window_handles)
+        def click() -> bool:
+            target = element or self.get_element_by_xpath(xpath)
+            if target is None:
+                return False
+            try:
+                ActionChains(self.browser).click(target).perform()
+                return True
+            except Exception as e:
+                logging.log(logging.DEBUG, f"元素{xpath}点击失败 Exception: {e}")
+                return False
 
-        if not self.click_element(xpath):
-            return
+        return self._click_and_track(click, origin_url, wait_navigation)
 
-        current_handle = self.browser.current_window_handle
-        current_url = self.browser.current_url
-        current_handles_len = len(self.browser.window_handles)
+    def _click_and_track(self, click: Callable[[], bool], origin_url: str, wait_navigation: bool = False) -> bool:
+        """
+        执行点击并跟踪页面变化，尽量减少WebDriver请求：
+        当前标签页句柄由本地缓存，点击后读取一次window_handles与current_url判断是否发生了导航；
+        wait_navigation为True时轮询直到发生导航或超时。发生导航时再按默认加载策略等待页面就绪
+        :param click: 执行点击的函数，返回是否点击成功
+        :param origin_url: 点击前的页面网址
+        :param wait_navigation: 是否等待导航发生，不等待时没有导航的点击不需要额外的等待
+        :return: 是否点击成功
+        """
+        origin_handle = self.current_handle
+        origin_handles = self.browser.window_handles
+
+        # 跟踪的点击通常会导航到同一站点，按点击前页面的站点限速
+        self._reserve_navigation(origin_url)
+        if not click():
+            self._refund_navigation(origin_handle)
+            return False
 
-        if origin_handles_len != current_handles_len:
-            # 标签页数量不一样，说明在页面在新标签页打开
-            new_handle = self.browser.window_handles[1]
-            self.browser.switch_to.window(new_handle)
-            current_handle = self.browser.current_window_handle
+        navigation = self.wait_until(NavigationCondition(origin_url, origin_handles),
+                                     self.click_navigation_timeout if wait_navigation else 0)
+        if navigation is None:
+            # 没有发生导航，请求没有发出
+            self._refund_navigation(origin_handle)
+            return True
+        new_handle, current_url = navigation
+        if new_handle is not None:
+            # 出现了新的标签页，说明在页面在新标签页打开
+            ticket = self._navigation_tickets.pop(origin_handle, None)
+            if ticket is not None:
+                self._navigation_tickets[new_handle] = ticket
+            self.switch_to_window(new_handle)
+            self.wait_for_page_load()
             current_url = self.browser.current_url
             self.page_tracker.track_page_switch(new_handle, NewPageSWitcher(origin_handle))
             logging.info(f"[PageTracking]新标签页打开，网址转变[{origin_url}]->[{current_url}]")
-        elif current_url != origin_url:
-            # 标签页数量一样，并且网址发生了变化，说明在页面在当前标签页打开
-            self.page_tracker.track_page_switch(origin_handle, CurrentPageSWitcher())
-            logging.info(f"[PageTracking]当前标签页打开页面，网址转变[{origin_url}]->[{current_url}]")
-        if current_handle != origin_handle:
-            self.browser.switch_to.window(current_handle)
-
-    def get_element_by_xpath(self, xpath: str) -> Optional[WebElement]:
-        self.browser.implicitly_wait(10)
-        try:
-            return self.browser.find_element(By.XPATH, xpath)
-        except Exception as e:
-            logging.log(logging.DEBUG, f"元素{xpath}不存在 Exception: {e}")
-            return None
+            return True
+
+        # 标签页数量一样，并且网址发生了变化，说明在页面在当前标签页打开
+        same_document = urldefrag(current_url)[0] == urldefrag(origin_url)[0]
+        self.page_tracker.track_page_switch(origin_handle, CurrentPageSWitcher(same_document))
+        self.mark_navigation(origin_handle)
+        if same_document:
+            # 只改变了#之后的部分，没有加载新文档，也没有发出请求
+            self._refund_navigation(origin_handle)
+        else:
+            self.wait_for_page_load()
+        logging.info(f"[PageTracking]当前标签页打开页面，网址转变[{origin_url}]->[{current_url}]")
+        return True
+
+    def _refund_navigation(self, window_handle: str):
+        ticket = self._navigation_tickets.pop(window_handle, None)
+        if ticket is not None:
+            ticket.release(refund=True)
+
+    def get_element_by_xpath(self, xpath: str, timeout: Optional[float] = None) -> Optional[WebElement]:
+        self.ensure_live_page()
+        element = self.wait_until(ElementPresentCondition(xpath), timeout)
+        if element is None:
+            logging.log(logging.DEBUG, f"元素{xpath}不存在")
+        return element
+
+    def get_element_in_scope(self, scope: ElementScope, relative_xpath: str,
+                             timeout: Optional[float] = None) -> Optional[WebElement]:
+        """
+        在循环项元素内查找相对XPath对应的元素
+        循环项元素失效(页面重新渲染)时按scope.xpath重新解析一次并写回scope；
+        相对XPath无法在元素内求值或者没有找到元素时，退回拼接后的绝对XPath查询，并等待元素出现
+        """
+        scoped_xpath = to_scoped_xpath(relative_xpath)
+        if scoped_xpath is not None and scope.xpath:
+            self.ensure_live_page()
+            for _ in range(2):
+                if scope.element is None:
+                    scope.element = self.get_elements_by_xpaths([scope.xpath])[0]
+                    if scope.element is None:
+                        break
+                try:
+                    stale, element = self.browser.execute_script(SCOPED_ELEMENT_SCRIPT, scope.element, scoped_xpath)
+                except StaleElementReferenceException:
+                    stale, element = True, None
+                if not stale:
+                    if element is not None:
+                        self.scope_stats["scoped"] += 1
+                        return element
+                    break
+                self.scope_stats["stale"] += 1
+                logging.debug(f"循环项元素{scope.xpath}已失效，重新解析")
+                scope.element = None
+                # 页面被未跟踪的操作重新渲染，批量解析缓存中的其他元素同样失效
+                self.invalidate_elements()
+        self.scope_stats["fallback"] += 1
+        return self.get_element_by_xpath(scope.absolute_xpath(relative_xpath), timeout)
+
+    def get_elements_by_xpaths(self, xpaths: List[str]) -> List[Optional[WebElement]]:
+        """
+        在一次脚本调用中解析多个XPath对应的元素
+        :param xpaths: XPath列表
+        :return: 与xpaths一一对应的元素列表，不存在的元素为None
+        """
+        if not xpaths:
+            return []
+        self.ensure_live_page()
+        return self.browser.execute_script(ELEMENTS_BY_XPATHS_SCRIPT, xpaths)
 
-    def get_element_text(self, xpath: str) -> str:
-        element = self.get_element_by_xpath(xpath)
-        return element.text
+    def get_elements_by_xpath_query(self, xpath: str) -> List[WebElement]:
+        """
+        在一次脚本调用中获取XPath匹配到的所有元素
+        :param xpath: 可匹配多个元素的XPath
+        :return: 按文档顺序排列的元素列表
+        """
+        self.ensure_live_page()
+        return self.browser.execute_script(ELEMENTS_BY_XPATH_QUERY_SCRIPT, xpath) or []
+
+    def get_item_keys(self, xpaths: List[str], key_xpath: str = "") -> List[Optional[str]]:
+        """
+        在一次脚本调用中求出多个循环项的标识
+        :param xpaths: 循环项XPath列表
+        :param key_xpath: 标识相对循环项的XPath，如 .//a/@href，为空时使用循环项的文本
+        :return: 与xpaths一一对应的标识，不存在的循环项为None
+        """
+        if not xpaths:
+            return []
+        self.ensure_live_page()
+        return self.browser.execute_script(ITEM_KEYS_SCRIPT, xpaths, key_xpath)
+
+    def evaluate_conditions(self, scripts: List[Optional[str]], element: Optional[WebElement] = None,
+                            first_match: bool = False) -> List[Optional[bool]]:
+        """
+        在一次脚本调用中依次求值多个条件脚本
+        :param scripts: 条件脚本列表，脚本中arguments[0]为element，为None的条件跳过
+        :param first_match: 是否在第一个满足的条件后停止，此时返回的列表可能比scripts短
+        :return: 每个条件是否满足，跳过的条件为None
+        """
+        if not scripts:
+            return []
+        self.ensure_live_page()
+        return self.browser.execute_script(build_conditions_script(scripts), element, first_match)
+
+    def collect_links(self, xpath: str, href_xpath: str = DEFAULT_HREF_XPATH) -> List[Optional[str]]:
+        """
+        在一次脚本调用中求出XPath匹配到的所有元素的链接
+        :param xpath: 可匹配多个元素(如列表项)的XPath
+        :param href_xpath: 链接相对元素的XPath，默认为元素本身或其中第一个带href的元素
+        :return: 按文档顺序排列的绝对网址，没有链接的元素为None
+        """
+        self.ensure_live_page()
+        return self.browser.execute_script(LINKS_BY_XPATH_QUERY_SCRIPT, xpath, href_xpath) or []
+
+    def count_xpath_matches(self, xpath: str) -> int:
+        """在一次脚本调用中统计XPath匹配到的元素数量"""
+        self.ensure_live_page()
+        return int(self.browser.execute_script(COUNT_XPATH_SCRIPT, xpath) or 0)
+
+    def get_element_text(self, xpath: str, timeout: Optional[float] = None) -> Optional[str]:
+        """
+        :param timeout: 等待元素出现的时间（秒），默认为optional_timeout
+        :return: 元素不存在时返回None
+        """
+        element = self.get_element_by_xpath(xpath, self.optional_timeout if timeout is None else timeout)
+        return element.text if element is not None else None
 
     def execute_script(self, js_script: str, *args) -> any:
+        self.ensure_live_page()
         return self.browser.execute_script(js_script, *args)
 
-    def click_by_coordinates(self, coordinates: list) -> bool:
+    def execute_async_script(self, js_script: str, *args, timeout: Optional[float] = None) -> any:
+        """
+        执行异步脚本，脚本通过最后一个参数(回调函数)返回结果，适合在页面内等待事件发生
+        :param timeout: 脚本超时时间（秒），默认为default_timeout
+        """
+        self.ensure_live_page()
+        timeout = self.default_timeout if timeout is None else timeout
+        if self._script_timeout != timeout:
+            self.browser.set_script_timeout(timeout)
+            self._script_timeout = timeout
+        return self.browser.execute_async_script(js_script, *args)
+
+    def get_dom_snapshot(self, root_xpath: str = "") -> Optional[DomSnapshot]:
+        """
+        获取当前页面的DOM快照，DOM未发生变化时复用缓存中已解析的文档
+        :param root_xpath: 容器元素的XPath，为空时对整个页面做快照
+        :return: DOM快照，容器元素不存在时返回None
+        """
+        if self.static_page is not None:
+            # 静态页面本身就是完整文档，绝对XPath可以直接求值
+            return self.static_page
+        url, document_id, dom_version = self.browser.execute_script(DOM_VERSION_SCRIPT)
+        key = (url, document_id, dom_version, root_xpath)
+        snapshot = self.snapshot_cache.get(key)
+        if snapshot is not None:
+            return snapshot
+
+        if root_xpath:
+            source = self.browser.execute_script(OUTER_HTML_SCRIPT, root_xpath)
+            if source is None:
+                logging.log(logging.DEBUG, f"快照容器{root_xpath}不存在")
+                return None
+        else:
+            source = self.browser.page_source
+        snapshot = DomSnapshot(source, url, root_xpath)
+        self.snapshot_cache.put(key, snapshot)
+        return snapshot
+
+    def get_viewport_size(self) -> Tuple[int, int]:
+        """视口大小，窗口可能被用户或页面改变，每次都重新读取"""
+        return tuple(self.browser.execute_script(VIEWPORT_SIZE_SCRIPT))
+
+    def click_by_coordinates(self, coordinates: list, viewport_size: Optional[Tuple[int, int]] = None) -> bool:
         """
         根据相对坐标点击元素。坐标是相对于浏览器视口的百分比，如[0.9, 0.06]。
         :param coordinates: 相对坐标，[x, y]，值范围为0-1
+        :param viewport_size: 已经读取的视口大小，为空时重新读取
         :return: 是否点击成功
         """
+        self.ensure_live_page()
         try:
             # 获取窗口大小
-            window_width = self.browser.execute_script("return window.innerWidth")
-            window_height = self.browser.execute_script("return window.innerHeight")
+            window_width, window_height = viewport_size or self.get_viewport_size()
             
             # 计算实际坐标
             x_position = int(window_width * coordinates[0])
@@ -115,38 +880,18 @@ class BrowserAutomation:
             logging.error(f"点击坐标[{coordinates}]失败: {e}")
             return False
             
-    def click_by_coordinates_and_track(self, coordinates: list):
+    def click_by_coordinates_and_track(self, coordinates: list, wait_navigation: bool = False) -> bool:
         """
         根据相对坐标点击元素并跟踪页面变化
         :param coordinates: 相对坐标，[x, y]，值范围为0-1
+        :param wait_navigation: 点击后是否等待导航发生
+        :return: 是否点击成功
         """
-        self.browser.implicitly_wait(10)
-
-        origin_handle = self.browser.current_window_handle
-        origin_url = self.browser.current_url
-        origin_handles_len = len(self.browser.window_handles)
-
-        if not self.click_by_coordinates(coordinates):
-            return
-
-        current_handle = self.browser.current_window_handle
-        current_url = self.browser.current_url
-        current_handles_len = len(self.browser.window_handles)
-
-        if origin_handles_len != current_handles_len:
-            # 标签页数量不一样，说明在页面在新标签页打开
-            new_handle = self.browser.window_handles[1]
-            self.browser.switch_to.window(new_handle)
-            current_handle = self.browser.current_window_handle
-            current_url = self.browser.current_url
-            self.page_tracker.track_page_switch(new_handle, NewPageSWitcher(origin_handle))
-            logging.info(f"[PageTracking]新标签页打开，网址转变[{origin_url}]->[{current_url}]")
-        elif current_url != origin_url:
-            # 标签页数量一样，并且网址发生了变化，说明在页面在当前标签页打开
-            self.page_tracker.track_page_switch(origin_handle, CurrentPageSWitcher())
-            logging.info(f"[PageTracking]当前标签页打开页面，网址转变[{origin_url}]->[{current_url}]")
-        if current_handle != origin_handle:
-            self.browser.switch_to.window(current_handle)
+        self.ensure_live_page()
+        # 一次脚本调用同时拿到点击前的网址和视口大小
+        origin_url, width, height = self.browser.execute_script(PAGE_STATE_SCRIPT)
+        return self._click_and_track(lambda: self.click_by_coordinates(coordinates, (width, height)), origin_url,
+                                     wait_navigation)
 
     def maximize_window(self):
         """
@@ -157,3 +902,9 @@ class BrowserAutomation:
             logging.info("浏览器窗口已最大化")
         except Exception as e:
             logging.error(f"浏览器窗口最大化失败: {e}")
+
+    def set_window_size(self, width: int, height: int):
+        """
+        设置浏览器窗口大小
+        """
+        self.browser.set_window_size(width, height)
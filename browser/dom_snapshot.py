@@ -0,0 +1,127 @@
+import logging
+from collections import OrderedDict
+from typing import Optional, List, Tuple, Any, Union
+
+from lxml import html
+
+
+# 安装DOM变更计数器，并返回当前文档的缓存键 [url, 文档标识, 变更次数]
+DOM_VERSION_SCRIPT = """
+if (window.__autowebDomVersion === undefined) {
+    window.__autowebDomVersion = 0;
+    new MutationObserver(function () { window.__autowebDomVersion++; })
+        .observe(document, {subtree: true, childList: true, attributes: true, characterData: true});
+}
+return [location.href, String(performance.timeOrigin), window.__autowebDomVersion];
+"""
+
+# 获取容器元素的outerHTML
+OUTER_HTML_SCRIPT = """
+var node = document.evaluate(arguments[0], document, null,
+                             XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+return node ? node.outerHTML : null;
+"""
+
+
+def normalize_text(text: str) -> str:
+    """按行去除多余空白，尽量与WebElement.text的结果保持一致"""
+    lines = [" ".join(line.split()) for line in text.splitlines()]
+    return "\n".join(line for line in lines if line)
+
+
+class DomSnapshot:
+    """
+    页面DOM快照
+
+    一次性获取page_source(或容器元素的outerHTML)后用lxml解析，
+    之后所有字段XPath都在本地求值，不再产生WebDriver请求
+    """
+
+    def __init__(self, source: Union[str, bytes], url: str = "", root_xpath: str = ""):
+        self.url = url
+        self.root_xpath = root_xpath
+        if root_xpath:
+            self.root = html.fragment_fromstring(source)
+        else:
+            self.root = html.document_fromstring(source)
+
+    def _to_local_xpath(self, xpath: str) -> Optional[str]:
+        """
+        容器快照中只有容器子树，需要把绝对路径转换为相对容器的路径
+        :return: 容器之外的XPath返回None
+        """
+        if not self.root_xpath or xpath.startswith("."):
+            return xpath
+        if xpath == self.root_xpath:
+            return "."
+        # 只在步骤边界匹配，/html/body/div[2] 不属于容器 /html/body/div
+        if xpath.startswith(self.root_xpath) and xpath[len(self.root_xpath)] == "/":
+            return "." + xpath[len(self.root_xpath):]
+        return None
+
+    def covers(self, xpath: str) -> bool:
+        """XPath是否可以在快照中求值，容器之外的XPath需要在浏览器中查询"""
+        return self._to_local_xpath(xpath) is not None
+
+    def find_all(self, xpath: str) -> List[Any]:
+        local_xpath = self._to_local_xpath(xpath)
+        if local_xpath is None:
+            logging.debug(f"XPath{xpath}不在快照容器{self.root_xpath}之内")
+            return []
+        try:
+            result = self.root.xpath(local_xpath)
+        except Exception as e:
+            logging.debug(f"快照中XPath{xpath}求值失败 Exception: {e}")
+            return []
+        # count()、string()等函数返回数字、字符串或布尔值
+        return result if isinstance(result, list) else [result]
+
+    def find(self, xpath: str) -> Optional[Any]:
+        nodes = self.find_all(xpath)
+        return nodes[0] if nodes else None
+
+    def get_text(self, xpath: str) -> Optional[str]:
+        node = self.find(xpath)
+        if node is None:
+            logging.debug(f"快照中元素{xpath}不存在")
+            return None
+        if isinstance(node, str):
+            # XPath直接选中了文本或属性
+            return normalize_text(node)
+        if isinstance(node, bool):
+            return "true" if node else "false"
+        if isinstance(node, float):
+            return str(int(node)) if node.is_integer() else str(node)
+        return normalize_text(node.text_content())
+
+
+class DomSnapshotCache:
+    """
+    已解析文档的缓存，键为(url, 文档标识, DOM变更次数, 容器XPath)
+
+    同一页面在DOM没有变化时重复提取，直接复用已解析的文档树
+    """
+
+    def __init__(self, max_size: int = 8):
+        self.max_size = max_size
+        self.snapshots: "OrderedDict[Tuple, DomSnapshot]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Tuple) -> Optional[DomSnapshot]:
+        snapshot = self.snapshots.get(key)
+        if snapshot is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.snapshots.move_to_end(key)
+        return snapshot
+
+    def put(self, key: Tuple, snapshot: DomSnapshot):
+        self.snapshots[key] = snapshot
+        self.snapshots.move_to_end(key)
+        while len(self.snapshots) > self.max_size:
+            self.snapshots.popitem(last=False)
+
+    def clear(self):
+        self.snapshots.clear()
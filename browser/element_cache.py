@@ -0,0 +1,116 @@
+import logging
+from typing import Any, Callable, Dict, Optional, Set, Tuple
+
+from selenium.webdriver.remote.webelement import WebElement
+
+
+class ElementBatchCache:
+    """
+    批量解析得到的元素句柄缓存
+
+    元素句柄按XPath保存，只有在当前标签页发生导航(页面版本变化)
+    或者请求的XPath不在缓存中时，才会调用loader重新批量解析；
+    批量解析中不存在的元素(可能尚未渲染)不缓存，每次都通过单独查询等待元素出现
+    """
+
+    def __init__(self, browser):
+        self.browser = browser
+        self.elements: Dict[str, WebElement] = {}
+        self.missing: Set[str] = set()  # 最近一次批量解析中不存在的XPath，之后直接单独查询
+        self.page_version: Optional[Tuple[str, int]] = None
+        self.resolve_count = 0  # 批量解析的次数
+
+    def invalidate(self):
+        self.elements.clear()
+        self.missing.clear()
+        self.page_version = None
+
+    def get(self, xpath: str,
+            loader: Callable[[], Dict[str, Optional[WebElement]]],
+            fallback: Optional[Callable[[str], Any]] = None) -> Optional[WebElement]:
+        """
+        :param fallback: 批量解析没有得到该XPath时的单独查询，默认按XPath查找元素并等待其出现
+        """
+        page_version = self.browser.get_page_version()
+        if page_version != self.page_version:
+            self.invalidate()
+            self.page_version = page_version
+        if xpath not in self.elements and xpath not in self.missing:
+            self.resolve_count += 1
+            for key, value in loader().items():
+                if value is None:
+                    self.missing.add(key)
+                else:
+                    self.elements[key] = value
+            logging.debug(f"批量解析循环项元素，共{len(self.elements)}个")
+        if xpath in self.elements:
+            return self.elements[xpath]
+        value = fallback(xpath) if fallback else self.browser.get_element_by_xpath(xpath)
+        if value is not None:
+            self.elements[xpath] = value
+            self.missing.discard(xpath)
+        return value
+
+
+class PageValueCache:
+    """
+    批量求出的循环项取值(标识、链接等)缓存
+
+    取值按XPath保存，当前标签页发生导航(页面版本变化)或者请求的XPath不在缓存中时，
+    调用loader重新批量求值；None表示循环项没有该值，同样缓存
+    """
+
+    def __init__(self, browser):
+        self.browser = browser
+        self.values: Dict[str, Any] = {}
+        self.page_version: Optional[Tuple[str, int]] = None
+        self.resolve_count = 0  # 批量求值的次数
+
+    def invalidate(self):
+        self.values.clear()
+        self.page_version = None
+
+    def get(self, xpath: str, loader: Callable[[], Dict[str, Any]], fallback: Callable[[str], Any]) -> Any:
+        """
+        :param fallback: 批量求值没有得到该XPath时的单独求值
+        """
+        page_version = self.browser.get_page_version()
+        if page_version != self.page_version:
+            self.invalidate()
+            self.page_version = page_version
+        if xpath not in self.values:
+            self.resolve_count += 1
+            self.values.update(loader())
+        if xpath not in self.values:
+            self.values[xpath] = fallback(xpath)
+        return self.values[xpath]
+
+
+def to_scoped_xpath(relative_xpath: str) -> Optional[str]:
+    """
+    把拼接在循环项XPath后面的相对XPath转换为以循环项为上下文节点的XPath，如 /h4 -> ./h4，//a -> .//a，
+    空字符串表示循环项本身；无法转换(如以谓词[开头)时返回None
+    """
+    if not relative_xpath:
+        return "."
+    if relative_xpath.startswith("/"):
+        return "." + relative_xpath
+    if relative_xpath == "." or relative_xpath.startswith("./") or relative_xpath.startswith(".//"):
+        return relative_xpath
+    return None
+
+
+class ElementScope:
+    """
+    循环项元素作用域
+
+    相对XPath在缓存的循环项元素内求值，不再从文档根节点求值拼接后的整个XPath；
+    元素失效后由浏览器按xpath重新解析，新的元素保存在element中供后续查找复用
+    """
+
+    def __init__(self, xpath: str, element: Optional[WebElement] = None):
+        self.xpath = xpath
+        self.element = element
+
+    def absolute_xpath(self, relative_xpath: str) -> str:
+        return "{}{}".format(self.xpath, relative_xpath)
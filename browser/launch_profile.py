@@ -0,0 +1,176 @@
+import copy
+import logging
+import os
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from selenium.webdriver.edge.options import Options
+
+from browser.performance_log import PERFORMANCE_LOGGING_PREFS
+
+
+# 运行时选择启动配置的环境变量
+LAUNCH_PROFILE_ENV = "AUTOWEB_BROWSER_PROFILE"
+
+
+class LaunchProfile:
+    """
+    浏览器启动配置
+
+    控制是否无头、窗口大小、页面加载策略、图片与JS开关、进程模型以及是否开启性能日志等启动参数
+    """
+
+    def __init__(self,
+                 name: str,
+                 headless: bool = False,
+                 window_size: Optional[Tuple[int, int]] = None,
+                 load_strategy: str = "normal",
+                 disable_images: bool = False,
+                 disable_javascript: bool = False,
+                 process_per_site: bool = False,
+                 user_data_dir: Optional[str] = None,
+                 debugging_port: Optional[int] = None,
+                 template_dir: Optional[str] = None,
+                 network_log: bool = False,
+                 manual_page_load: bool = False,
+                 arguments: Optional[List[str]] = None,
+                 prefs: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.headless = headless
+        self.window_size = tuple(window_size) if window_size else None
+        self.load_strategy = load_strategy
+        self.disable_images = disable_images
+        self.disable_javascript = disable_javascript
+        self.process_per_site = process_per_site
+        self.user_data_dir = user_data_dir  # 为空时使用临时用户目录，启动更快
+        self.debugging_port = debugging_port
+        self.template_dir = template_dir  # 模板用户目录，不为空时每个会话使用模板的独立副本
+        self.network_log = network_log  # 开启性能日志，资源统计与响应捕获需要读取其中的网络事件
+        # 驱动不等待页面加载(pageLoadStrategy=none)，由浏览器按每个页面的加载策略自行等待，
+        # 页面单独的加载策略与多个标签页并行加载需要开启
+        self.manual_page_load = manual_page_load
+        self.arguments = list(arguments or [])
+        self.prefs = dict(prefs or {})
+
+    def copy(self, **overrides) -> "LaunchProfile":
+        profile = copy.deepcopy(self)
+        for key, value in overrides.items():
+            if not hasattr(profile, key):
+                raise Exception("Unknown launch profile option {}".format(key))
+            setattr(profile, key, tuple(value) if key == "window_size" and value else value)
+        return profile
+
+    def to_options(self) -> Options:
+        options = Options()
+        options.page_load_strategy = "none" if self.manual_page_load else self.load_strategy
+        if self.debugging_port:
+            options.add_argument(f"--remote-debugging-port={self.debugging_port}")
+        if self.user_data_dir:
+            options.add_argument(f"--user-data-dir={self.user_data_dir}")
+        if self.headless:
+            options.add_argument("--headless=new")
+        if self.window_size:
+            options.add_argument("--window-size={},{}".format(*self.window_size))
+        if self.process_per_site:
+            options.add_argument("--process-per-site")
+
+        prefs = dict(self.prefs)
+        if self.disable_images:
+            options.add_argument("--blink-settings=imagesEnabled=false")
+            prefs["profile.managed_default_content_settings.images"] = 2
+        if self.disable_javascript:
+            prefs["profile.managed_default_content_settings.javascript"] = 2
+        if prefs:
+            options.add_experimental_option("prefs", prefs)
+
+        if self.network_log:
+            options.set_capability("ms:loggingPrefs", PERFORMANCE_LOGGING_PREFS)
+        for argument in self.arguments:
+            options.add_argument(argument)
+        return options
+
+    def __str__(self):
+        return "LaunchProfile({})".format(self.name)
+
+    __repr__ = __str__
+
+
+# 各启动配置共用的参数
+COMMON_ARGUMENTS = [
+    '--disable-gpu',  # 禁用GPU加速
+    '--no-sandbox',  # 禁用沙盒模式
+    '--disable-dev-shm-usage',  # 禁用/dev/shm使用
+    '--disable-extensions',  # 禁用扩展
+    '--disable-browser-side-navigation',  # 禁用浏览器侧边导航
+    '--disable-infobars',  # 禁用信息栏
+]
+
+LAUNCH_PROFILE_MAP: Dict[str, LaunchProfile] = {}
+
+
+def register_launch_profile(profile: LaunchProfile):
+    LAUNCH_PROFILE_MAP[profile.name] = profile
+
+
+def get_launch_profile(config: Union[None, str, Dict[str, Any], LaunchProfile] = None) -> LaunchProfile:
+    """
+    获取启动配置
+    :param config: 配置名称；或 {"profile": "headless-fast", "window_size": [1280, 800], ...}
+                   在命名配置的基础上覆盖部分选项；为空时使用环境变量AUTOWEB_BROWSER_PROFILE指定的配置
+    """
+    if isinstance(config, LaunchProfile):
+        return config
+    overrides = {}
+    if isinstance(config, dict):
+        overrides = dict(config)
+        config = overrides.pop("profile", None)
+    name = config or os.environ.get(LAUNCH_PROFILE_ENV) or "default"
+    profile = LAUNCH_PROFILE_MAP.get(name)
+    if profile is None:
+        logging.warning(f"浏览器启动配置{name}不存在，使用默认配置")
+        profile = LAUNCH_PROFILE_MAP["default"]
+    return profile.copy(**overrides)
+
+
+# 默认配置与原先固定在代码中的启动参数一致
+register_launch_profile(LaunchProfile(
+    "default",
+    user_data_dir="./edge_user_data",
+    debugging_port=9222,
+    arguments=COMMON_ARGUMENTS,
+))
+register_launch_profile(LaunchProfile(
+    "headed-debug",
+    window_size=(1600, 1000),
+    user_data_dir="./edge_user_data",
+    debugging_port=9222,
+    arguments=COMMON_ARGUMENTS + ["--auto-open-devtools-for-tabs"],
+))
+register_launch_profile(LaunchProfile(
+    "headless-fast",
+    headless=True,
+    window_size=(1366, 768),
+    load_strategy="eager",
+    disable_images=True,
+    arguments=COMMON_ARGUMENTS + [
+        "--no-first-run",
+        "--no-default-browser-check",
+        "--disable-background-networking",
+        "--disable-sync",
+        "--disable-default-apps",
+        "--mute-audio",
+    ],
+))
+register_launch_profile(LaunchProfile(
+    "low-memory",
+    headless=True,
+    window_size=(1280, 720),
+    load_strategy="eager",
+    disable_images=True,
+    process_per_site=True,
+    arguments=COMMON_ARGUMENTS + [
+        "--renderer-process-limit=2",
+        "--disable-background-networking",
+        "--disable-renderer-backgrounding",
+        "--js-flags=--max-old-space-size=256",
+    ],
+))
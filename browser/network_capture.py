@@ -0,0 +1,121 @@
+import base64
+import fnmatch
+import json
+import logging
+import re
+from collections import deque
+from typing import Any, Deque, Dict, List, Set
+
+
+def match_url(url: str, pattern: str) -> bool:
+    """
+    URL匹配：re:开头为正则表达式，包含*或?时为通配符，否则为子串匹配
+    """
+    if not pattern:
+        return True
+    if pattern.startswith("re:"):
+        return re.search(pattern[3:], url) is not None
+    if "*" in pattern or "?" in pattern:
+        return fnmatch.fnmatchcase(url, pattern)
+    return pattern in url
+
+
+def get_by_path(data: Any, path: str) -> Any:
+    """按点分路径取值，如 data.items 或 data.list.0"""
+    if not path:
+        return data
+    for key in path.split("."):
+        if isinstance(data, list) and key.isdigit():
+            index = int(key)
+            data = data[index] if index < len(data) else None
+        elif isinstance(data, dict):
+            data = data.get(key)
+        else:
+            return None
+        if data is None:
+            return None
+    return data
+
+
+class ResponseRecorder:
+    """
+    记录性能日志中的JSON类响应
+
+    只保存响应的元信息，响应体在需要时通过Network.getResponseBody读取，
+    因此常驻开启的开销很小
+    """
+
+    JSON_MIME_TYPES = ("json", "javascript", "text/plain")
+
+    def __init__(self, max_records: int = 1000):
+        self.records: Deque[Dict[str, Any]] = deque(maxlen=max_records)
+        self.pending: Dict[str, Dict[str, Any]] = {}  # the key type is requestId，还没有加载完成的响应
+        self.consumed: Set[str] = set()
+        self.sequence = 0
+
+    def on_event(self, method: str, params: Dict[str, Any]):
+        if method == "Network.responseReceived":
+            if params.get("type") not in ("XHR", "Fetch", None):
+                return
+            response = params.get("response", {})
+            mime_type = response.get("mimeType", "")
+            if not any(part in mime_type for part in self.JSON_MIME_TYPES):
+                return
+            self.sequence += 1
+            self.pending[params.get("requestId")] = {
+                "request_id": params.get("requestId"),
+                "url": response.get("url", ""),
+                "status": response.get("status"),
+                "mime_type": mime_type,
+                "sequence": self.sequence,
+            }
+        elif method == "Network.loadingFinished":
+            record = self.pending.pop(params.get("requestId"), None)
+            if record is not None:
+                self.records.append(record)
+        elif method == "Network.loadingFailed":
+            self.pending.pop(params.get("requestId"), None)
+
+    def find(self, url_pattern: str, include_consumed: bool = False) -> List[Dict[str, Any]]:
+        return [record for record in self.records
+                if match_url(record["url"], url_pattern)
+                and (include_consumed or record["request_id"] not in self.consumed)]
+
+    def consume(self, records: List[Dict[str, Any]]):
+        for record in records:
+            self.consumed.add(record["request_id"])
+        # 只保留仍在记录中的请求，避免长时间运行时无限增长
+        self.consumed &= {record["request_id"] for record in self.records}
+
+    def clear(self):
+        self.records.clear()
+        self.pending.clear()
+        self.consumed.clear()
+
+
+def read_response_body(driver, record: Dict[str, Any]) -> Any:
+    """
+    读取并解析响应体
+    :return: 解析后的JSON，无法读取或者不是JSON时返回None
+    """
+    try:
+        result = driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": record["request_id"]})
+    except Exception as e:
+        # 页面已经跳转或者响应体已经被浏览器释放
+        logging.debug(f"读取响应体{record['url']}失败: {e}")
+        return None
+    body = result.get("body", "")
+    if result.get("base64Encoded"):
+        body = base64.b64decode(body).decode("utf-8", errors="replace")
+    try:
+        return json.loads(body)
+    except ValueError:
+        # 兼容JSONP之类包了一层的响应
+        start, end = body.find("{"), body.rfind("}")
+        if 0 <= start < end:
+            try:
+                return json.loads(body[start:end + 1])
+            except ValueError:
+                pass
+    logging.debug(f"响应{record['url']}不是JSON")
+    return None
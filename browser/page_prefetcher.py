@@ -0,0 +1,104 @@
+import logging
+from typing import Any, Dict, List, Optional, Union
+
+from browser.tab_pool import TabPool, TabSession
+
+
+class PagePrefetcher:
+    """
+    循环的页面预取
+
+    处理当前循环项时，在标签池的后台标签页中为之后window个循环项发起导航，
+    轮到这些循环项时页面已经加载好，直接切换过去即可。
+    循环运行期间设置为浏览器的prefetcher，open_detail_page经由它打开详情页
+    """
+
+    def __init__(self, pool: TabPool, window: int = 1, load_strategy: Optional[str] = None,
+                 ready_when: Union[None, Dict, List] = None):
+        """
+        :param window: 最多同时预取的页面数量
+        """
+        self.pool = pool
+        self.window = max(1, int(window))
+        self.load_strategy = load_strategy
+        self.ready_when = ready_when
+        # 当前页面与预取窗口各占一个标签页
+        self.pool.size = max(self.pool.size, self.window + 1)
+        self.pending: Dict[str, TabSession] = {}  # 已经发起预取、尚未使用的网址
+        self.current: Optional[TabSession] = None  # 当前循环项的页面
+        self.stats = {"prefetched": 0, "hits": 0, "misses": 0, "cancelled": 0}
+
+    def prefetch(self, urls: List[str], current_url: Optional[str] = None):
+        """
+        在每次迭代开始时调用，为之后的循环项发起预取，只保留窗口内的网址，窗口外的预取被取消；
+        上一个循环项的页面不再使用，它的标签页可以用于预取。调用前后所在的标签页不变
+        :param urls: 当前循环项之后的循环项网址
+        :param current_url: 当前循环项的网址，它的预取即将被使用，不会被取消
+        """
+        urls = [url for url in urls if url][:self.window]
+        browser = self.pool.browser
+        handle, page_tracker = browser.current_handle, browser.page_tracker
+        for url in list(self.pending):
+            if url not in urls and url != current_url:
+                self._cancel(url)
+        self._release_current()
+        for url in urls:
+            if url in self.pending or url == current_url:
+                continue
+            session = self.pool.acquire(exclude_urls=list(self.pending) + urls + [current_url])
+            if session is None:
+                break
+            self.pool.start_load(session, url, self.load_strategy, self.ready_when)
+            self.pending[url] = session
+            self.stats["prefetched"] += 1
+        if browser.current_handle != handle:
+            browser.switch_to_window(handle)
+        browser.page_tracker = page_tracker
+
+    def open(self, url: str, load_strategy: Optional[str] = None,
+             ready_when: Union[None, Dict, List] = None) -> bool:
+        """
+        打开当前循环项的页面，已经预取的页面直接切换过去，否则在空闲的标签页中打开
+        :return: 页面是否在超时时间内就绪
+        """
+        self._release_current()
+        session = self.pending.pop(url, None)
+        if session is not None and session.url == url:
+            self.stats["hits"] += 1
+        else:
+            self.stats["misses"] += 1
+            session = self.pool.acquire(exclude_urls=list(self.pending))
+            if session is None:
+                logging.warning(f"预取的标签页都在使用中，在当前标签页中打开 {url}")
+                return self.pool.browser.open_page(url, load_strategy, ready_when)
+            self.pool.start_load(session, url, load_strategy or self.load_strategy,
+                                 ready_when or self.ready_when)
+        self.current = session
+        return self.pool.activate(session)
+
+    def release(self):
+        """当前循环项的页面使用完毕，回到标签池之外的原始标签页"""
+        self._release_current()
+        self.pool.restore()
+
+    def _release_current(self):
+        if self.current is not None:
+            self.pool.release(self.current)
+            self.current = None
+
+    def _cancel(self, url: str):
+        session = self.pending.pop(url)
+        if session.url == url and not session.in_use:
+            self.pool.cancel_load(session)
+            self.stats["cancelled"] += 1
+
+    def cancel(self):
+        """循环结束或中断时取消所有尚未使用的预取"""
+        for url in list(self.pending):
+            self._cancel(url)
+        self.release()
+
+    def summary(self) -> Dict[str, Any]:
+        used = self.stats["hits"] + self.stats["misses"]
+        return {"window": self.window, **self.stats,
+                "hit_rate": self.stats["hits"] / used if used else 0.0}
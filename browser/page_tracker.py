@@ -29,6 +29,12 @@ class NewPageSWitcher(PageSWitcher):
 
 
 class CurrentPageSWitcher(PageSWitcher):
+    def __init__(self, same_document: bool = False):
+        """
+        :param same_document: 是否为同一文档内的导航(如只改变了#之后的部分)，回退时不会加载新文档
+        """
+        super().__init__()
+        self.same_document = same_document
 
     def switch_back(self, browser: WebDriver):
         origin_url = browser.current_url
@@ -50,9 +56,17 @@ class PageTracker:
             self.histories[window_handle] = []
         self.histories[window_handle].append(switcher)
 
-    def back(self, browser: WebDriver):
-        window_handle = browser.current_window_handle
+    def peek(self, window_handle: str) -> Optional[PageSWitcher]:
+        history = self.histories.get(window_handle)
+        return history[-1] if history else None
+
+    def back(self, browser: WebDriver, window_handle: Optional[str] = None) -> Optional[PageSWitcher]:
+        if window_handle is None:
+            window_handle = browser.current_window_handle
         if window_handle in self.histories:
             history = self.histories[window_handle]
             if len(history) > 0:
-                history.pop().switch_back(browser)
+                switcher = history.pop()
+                switcher.switch_back(browser)
+                return switcher
+        return None
@@ -0,0 +1,64 @@
+import json
+import logging
+from typing import Any, Callable, Dict, List
+
+
+# 浏览器启动时需要开启的日志能力，开启后可以通过driver.get_log("performance")读取DevTools事件，
+# 日志会在驱动端持续缓冲所有网络事件，因此只在启动配置设置了network_log时开启
+PERFORMANCE_LOGGING_PREFS = {"performance": "ALL"}
+
+PerformanceListener = Callable[[str, Dict[str, Any]], None]
+
+
+class PerformanceLog:
+    """
+    DevTools性能日志的读取与分发
+
+    driver.get_log("performance")每次调用都会清空驱动端的缓冲区，
+    因此所有关心网络事件的功能都注册为监听器，由这里统一读取后按事件名分发
+    """
+
+    def __init__(self, driver, available: bool = True):
+        """
+        :param available: 浏览器启动时是否开启了性能日志，没有开启时poll不读取日志
+        """
+        self.driver = driver
+        self.listeners: List[PerformanceListener] = []
+        self.available = available
+
+    def add_listener(self, listener: PerformanceListener):
+        if listener not in self.listeners:
+            self.listeners.append(listener)
+
+    def remove_listener(self, listener: PerformanceListener):
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+
+    def poll(self) -> int:
+        """
+        读取缓冲区中的所有事件并分发给监听器
+        :return: 读取到的事件数量
+        """
+        if not self.available:
+            return 0
+        try:
+            entries = self.driver.get_log("performance")
+        except Exception as e:
+            # 浏览器启动时没有开启性能日志
+            logging.warning(f"读取性能日志失败，网络统计不可用 Exception: {e}")
+            self.available = False
+            return 0
+
+        for entry in entries:
+            try:
+                message = json.loads(entry["message"])["message"]
+            except (KeyError, TypeError, ValueError):
+                continue
+            method = message.get("method", "")
+            event_params = message.get("params", {})
+            for listener in self.listeners:
+                try:
+                    listener(method, event_params)
+                except Exception as e:
+                    logging.debug(f"性能日志监听器处理{method}失败 Exception: {e}")
+        return len(entries)
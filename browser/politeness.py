@@ -0,0 +1,240 @@
+import logging
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Union
+from urllib.parse import urlparse
+
+
+class HostPolicy:
+    """单个站点的访问策略"""
+
+    def __init__(self, rate: float = 1.0, burst: int = 1, max_concurrency: int = 2, min_interval: float = 0.0,
+                 jitter: float = 0.5, backoff: float = 2.0, max_penalty: float = 16.0, recovery: float = 0.8):
+        """
+        :param rate: 每秒补充的令牌数，即平均每秒最多发出的请求数
+        :param burst: 令牌桶容量，允许短时间内连续发出的请求数
+        :param max_concurrency: 同时进行中的请求数上限，同一线程自己持有的名额不会阻塞自己
+        :param min_interval: 相邻两个请求之间的最小间隔（秒）
+        :param jitter: 在间隔上随机增加0到jitter秒，避免请求呈现固定节奏
+        :param backoff: 遇到错误或验证码时的减速倍数
+        :param max_penalty: 减速倍数的上限
+        :param recovery: 请求正常时减速倍数的恢复系数，逐步回到1
+        """
+        self.rate = max(float(rate), 1e-6)
+        self.burst = max(1, int(burst))
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.min_interval = max(0.0, float(min_interval))
+        self.jitter = max(0.0, float(jitter))
+        self.backoff = max(1.0, float(backoff))
+        self.max_penalty = max(1.0, float(max_penalty))
+        self.recovery = min(1.0, max(0.0, float(recovery)))
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]], base: Optional["HostPolicy"] = None) -> "HostPolicy":
+        """未配置的项沿用base"""
+        values = dict(vars(base)) if base is not None else {}
+        values.update(config or {})
+        return cls(**values)
+
+
+class _HostState:
+
+    def __init__(self, policy: HostPolicy, now: float):
+        self.policy = policy
+        self.tokens = float(policy.burst)
+        self.updated = now
+        self.next_time = now  # 下一个请求最早的发出时间
+        self.penalty = 1.0  # 当前的减速倍数
+        self.active: Dict[int, int] = {}  # 各线程进行中的请求数
+        self.waiting = 0  # 排队等待的请求数
+        self.stats = {"requests": 0, "errors": 0, "blocked": 0, "wait_time": 0.0}
+
+    def refill(self, now: float):
+        rate = self.policy.rate / self.penalty
+        self.tokens = min(float(self.policy.burst), self.tokens + (now - self.updated) * rate)
+        self.updated = now
+
+    @property
+    def active_count(self) -> int:
+        return sum(self.active.values())
+
+
+class PolitenessTicket:
+    """一次请求占用的名额，请求完成后调用release"""
+
+    def __init__(self, scheduler: "PolitenessScheduler", host: str, owner: int,
+                 previous_next_time: float = 0.0, next_time: float = 0.0):
+        self.scheduler = scheduler
+        self.host = host
+        self.owner = owner
+        # 发出请求前后站点的下一个请求最早发出时间，归还名额时用于撤销本次请求增加的间隔
+        self.previous_next_time = previous_next_time
+        self.next_time = next_time
+        self.released = False
+
+    def release(self, error: bool = False, blocked: bool = False, refund: bool = False):
+        """
+        :param error: 请求失败或页面没有就绪
+        :param blocked: 遇到了验证码或访问限制
+        :param refund: 请求实际上没有发出，归还令牌并撤销本次请求增加的间隔
+        """
+        if not self.released:
+            self.released = True
+            self.scheduler.release(self, error, blocked, refund)
+
+
+class PolitenessScheduler:
+    """
+    按站点限制访问频率的调度器，所有浏览器会话与静态下载共用
+
+    每个站点一个令牌桶，并限制同时进行中的请求数；相邻请求之间加入随机间隔；
+    遇到错误或验证码时按backoff倍数减速，之后请求正常时逐步恢复
+    """
+
+    CAPTCHA_PATTERNS = ["captcha", "验证码", "are you a robot", "unusual traffic", "访问过于频繁"]
+
+    def __init__(self, default: Optional[HostPolicy] = None, hosts: Optional[Dict[str, HostPolicy]] = None,
+                 captcha_patterns: Optional[List[str]] = None,
+                 clock: Callable[[], float] = time.monotonic, random_func: Callable[[], float] = random.random):
+        """
+        :param hosts: 站点的单独策略，键为域名，同时适用于它的子域名
+        :param captcha_patterns: 页面网址或标题中出现时判断为验证码页面，不区分大小写
+        """
+        self.default = default or HostPolicy()
+        self.hosts = hosts or {}
+        self.captcha_patterns = [pattern.lower() for pattern in
+                                 (captcha_patterns if captcha_patterns is not None else self.CAPTCHA_PATTERNS)]
+        self.clock = clock
+        self.random_func = random_func
+        self.states: Dict[str, _HostState] = {}
+        self.condition = threading.Condition()
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "PolitenessScheduler":
+        """
+        如 {"rate": 1, "max_concurrency": 2, "jitter": 0.5,
+            "hosts": {"example.com": {"rate": 0.2, "burst": 1}}, "captcha_patterns": ["captcha"]}
+        hosts以外的配置为默认策略
+        """
+        config = dict(config)
+        hosts = config.pop("hosts", {}) or {}
+        captcha_patterns = config.pop("captcha_patterns", None)
+        default = HostPolicy.from_config(config)
+        return cls(default, {host: HostPolicy.from_config(policy, default) for host, policy in hosts.items()},
+                   captcha_patterns)
+
+    @staticmethod
+    def get_host(url: str) -> str:
+        return (urlparse(url).hostname or "").lower()
+
+    def policy_for(self, host: str) -> HostPolicy:
+        # 优先使用最长的匹配域名
+        for name in sorted(self.hosts, key=len, reverse=True):
+            if host == name or host.endswith("." + name):
+                return self.hosts[name]
+        return self.default
+
+    def _get_state(self, host: str) -> _HostState:
+        state = self.states.get(host)
+        if state is None:
+            state = self.states[host] = _HostState(self.policy_for(host), self.clock())
+        return state
+
+    def _wait_time(self, state: _HostState, owner: int, now: float) -> Optional[float]:
+        """距离可以发出请求的秒数，为None时需要等待其他请求完成"""
+        others = state.active_count - state.active.get(owner, 0)
+        if others > 0 and state.active_count >= state.policy.max_concurrency:
+            return None
+        state.refill(now)
+        token_wait = (1 - state.tokens) * state.penalty / state.policy.rate if state.tokens < 1 else 0.0
+        return max(token_wait, state.next_time - now, 0.0)
+
+    def acquire(self, url: str) -> PolitenessTicket:
+        """等待轮到该站点的请求，返回占用的名额"""
+        host = self.get_host(url)
+        owner = threading.get_ident()
+        start = self.clock()
+        with self.condition:
+            state = self._get_state(host)
+            state.waiting += 1
+            try:
+                while True:
+                    now = self.clock()
+                    wait = self._wait_time(state, owner, now)
+                    if wait is not None and wait <= 0:
+                        break
+                    self.condition.wait(wait)
+            finally:
+                state.waiting -= 1
+            now = self.clock()
+            state.tokens -= 1
+            policy = state.policy
+            spacing = (policy.min_interval + self.random_func() * policy.jitter) * state.penalty
+            previous_next_time = state.next_time
+            state.next_time = now + spacing
+            state.active[owner] = state.active.get(owner, 0) + 1
+            state.stats["requests"] += 1
+            state.stats["wait_time"] += now - start
+        if now - start > 0.5:
+            logging.debug(f"[Politeness]{host} 请求等待了{now - start:.2f}秒")
+        return PolitenessTicket(self, host, owner, previous_next_time, state.next_time)
+
+    def release(self, ticket: PolitenessTicket, error: bool = False, blocked: bool = False, refund: bool = False):
+        with self.condition:
+            state = self._get_state(ticket.host)
+            state.active[ticket.owner] = state.active.get(ticket.owner, 1) - 1
+            if state.active[ticket.owner] <= 0:
+                del state.active[ticket.owner]
+            policy = state.policy
+            if refund:
+                state.tokens = min(float(policy.burst), state.tokens + 1)
+                state.stats["requests"] -= 1
+                # 之后没有其他请求占用名额时，下一个请求不需要等待本次请求的间隔
+                if state.next_time == ticket.next_time:
+                    state.next_time = ticket.previous_next_time
+            elif error or blocked:
+                state.stats["blocked" if blocked else "errors"] += 1
+                state.penalty = min(policy.max_penalty, state.penalty * policy.backoff)
+                logging.warning(f"[Politeness]{ticket.host} {'出现验证码或访问限制' if blocked else '请求失败'}，"
+                                f"减速倍数调整为{state.penalty:.1f}")
+            else:
+                state.penalty = max(1.0, state.penalty * policy.recovery)
+            self.condition.notify_all()
+
+    def is_blocked_page(self, url: Optional[str], title: Optional[str] = None) -> bool:
+        """页面网址或标题中是否出现了验证码特征"""
+        text = " ".join(part for part in (url, title) if part).lower()
+        return any(pattern in text for pattern in self.captcha_patterns)
+
+    def queue_depth(self) -> Dict[str, int]:
+        """各站点排队等待的请求数"""
+        with self.condition:
+            return {host: state.waiting for host, state in self.states.items()}
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        with self.condition:
+            return {host: {"active": state.active_count, "waiting": state.waiting, "penalty": state.penalty,
+                           **state.stats}
+                    for host, state in self.states.items()}
+
+
+_shared_scheduler: Optional[PolitenessScheduler] = None
+
+
+def configure_politeness(config: Union[None, bool, Dict[str, Any], PolitenessScheduler]) -> Optional[PolitenessScheduler]:
+    """
+    设置所有浏览器会话与静态下载共用的调度器，config为空或False时关闭限速
+    """
+    global _shared_scheduler
+    if isinstance(config, PolitenessScheduler):
+        _shared_scheduler = config
+    elif not config:
+        _shared_scheduler = None
+    else:
+        _shared_scheduler = PolitenessScheduler.from_config({} if config is True else config)
+    return _shared_scheduler
+
+
+def get_politeness_scheduler() -> Optional[PolitenessScheduler]:
+    return _shared_scheduler
@@ -0,0 +1,205 @@
+import atexit
+import logging
+import os
+import shutil
+import sys
+import time
+import uuid
+from typing import List, Optional, Set
+
+
+# 浏览器运行时创建的锁文件，复制后会让新会话误以为配置目录正在被使用
+LOCK_FILES = {"SingletonLock", "SingletonSocket", "SingletonCookie", "lockfile", "LOCK", "parent.lock"}
+
+# 体积大且浏览器不会原地修改的目录，使用硬链接或写时复制共享
+IMMUTABLE_DIRS = {
+    "Extensions", "Dictionaries", "WidevineCdm", "Safe Browsing", "hyphen-data", "ZxcvbnData",
+    "OnDeviceHeadSuggestModel", "OptimizationGuidePredictionModels", "Subresource Filter",
+    "FileTypePolicies", "CertificateRevocation", "MEIPreload", "SSLErrorAssistant",
+}
+
+# 缓存目录，不影响登录状态，默认不复制
+CACHE_DIRS = {
+    "Cache", "Code Cache", "GPUCache", "ShaderCache", "GrShaderCache", "GraphiteDawnCache",
+    "DawnCache", "DawnGraphiteCache", "DawnWebGPUCache", "component_crx_cache", "Crashpad", "BrowserMetrics",
+}
+
+SESSION_PREFIX = "session-"
+SESSION_MARKER = ".autoweb_session"
+
+FICLONE = 0x40049409  # Linux下的写时复制克隆ioctl
+
+
+def _reflink(src: str, dst: str) -> bool:
+    """尝试写时复制克隆文件，文件系统不支持时返回False"""
+    if not sys.platform.startswith("linux"):
+        return False
+    try:
+        import fcntl
+        with open(src, "rb") as src_file, open(dst, "wb") as dst_file:
+            fcntl.ioctl(dst_file.fileno(), FICLONE, src_file.fileno())
+        shutil.copystat(src, dst)
+        return True
+    except OSError:
+        if os.path.exists(dst):
+            os.remove(dst)
+        return False
+
+
+def _process_alive(pid: int) -> bool:
+    """进程是否仍在运行，无法确定时按仍在运行处理"""
+    if pid <= 0:
+        return False
+    if sys.platform == "win32":
+        # Windows下os.kill会结束目标进程，只能通过进程句柄查询
+        import ctypes
+        process = ctypes.windll.kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+        if not process:
+            # ERROR_ACCESS_DENIED：进程存在但没有权限查询
+            return ctypes.windll.kernel32.GetLastError() == 5
+        try:
+            exit_code = ctypes.c_ulong()
+            ctypes.windll.kernel32.GetExitCodeProcess(process, ctypes.byref(exit_code))
+            return exit_code.value == 259  # STILL_ACTIVE
+        finally:
+            ctypes.windll.kernel32.CloseHandle(process)
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # 进程存在但属于其他用户
+        return True
+    return True
+
+
+def _read_session_pid(session_dir: str) -> Optional[int]:
+    """读取副本所属会话的进程号，标记文件不存在或无法解析时返回None"""
+    try:
+        with open(os.path.join(session_dir, SESSION_MARKER)) as f:
+            return int(f.read().strip())
+    except (OSError, ValueError):
+        return None
+
+
+class ProfileManager:
+    """
+    浏览器用户目录管理
+
+    维护一个已经登录的模板用户目录，为每个浏览器会话快速克隆出独立的副本：
+    大体积且不会被原地修改的文件优先写时复制，否则使用硬链接；
+    Cookie、Local Storage等可变状态复制真实文件；锁文件与缓存不复制。
+    会话结束后副本被删除，异常退出遗留的副本由gc清理
+    """
+
+    def __init__(self, template_dir: str, sessions_dir: Optional[str] = None, keep_cache: bool = False):
+        """
+        :param template_dir: 模板用户目录
+        :param sessions_dir: 会话副本的存放目录，默认与模板目录同级
+        :param keep_cache: 是否保留缓存目录（以硬链接方式）
+        """
+        self.template_dir = os.path.abspath(template_dir)
+        self.sessions_dir = os.path.abspath(sessions_dir or self.template_dir + "_sessions")
+        self.keep_cache = keep_cache
+        self.active_sessions: Set[str] = set()
+        self.stats = {"reflinked": 0, "linked": 0, "copied": 0, "skipped": 0}
+        atexit.register(self.release_all)
+
+    def _classify(self, relative_path: str) -> str:
+        """返回文件的处理方式: skip/link/copy"""
+        parts = relative_path.split(os.sep)
+        if parts[-1] in LOCK_FILES:
+            return "skip"
+        if any(part in CACHE_DIRS for part in parts[:-1]):
+            return "link" if self.keep_cache else "skip"
+        if any(part in IMMUTABLE_DIRS for part in parts[:-1]):
+            return "link"
+        return "copy"
+
+    def _clone_file(self, src: str, dst: str, mode: str):
+        if _reflink(src, dst):
+            self.stats["reflinked"] += 1
+            return
+        if mode == "link":
+            try:
+                os.link(src, dst)
+                self.stats["linked"] += 1
+                return
+            except OSError:
+                pass
+        shutil.copy2(src, dst)
+        self.stats["copied"] += 1
+
+    def clone(self, session_id: Optional[str] = None) -> str:
+        """
+        为新会话克隆模板用户目录
+        :return: 副本目录
+        """
+        if not os.path.isdir(self.template_dir):
+            raise Exception("Template profile {} not found".format(self.template_dir))
+        session_id = session_id or "{}-{}".format(os.getpid(), uuid.uuid4().hex[:8])
+        session_dir = os.path.join(self.sessions_dir, SESSION_PREFIX + session_id)
+        start = time.monotonic()
+
+        os.makedirs(session_dir)
+        for root, dirs, files in os.walk(self.template_dir):
+            relative_root = os.path.relpath(root, self.template_dir)
+            target_root = session_dir if relative_root == "." else os.path.join(session_dir, relative_root)
+            if not self.keep_cache:
+                # 不进入缓存目录，避免无谓的遍历
+                dirs[:] = [name for name in dirs if name not in CACHE_DIRS]
+            for name in dirs:
+                os.makedirs(os.path.join(target_root, name), exist_ok=True)
+            for name in files:
+                relative_path = name if relative_root == "." else os.path.join(relative_root, name)
+                mode = self._classify(relative_path)
+                if mode == "skip":
+                    self.stats["skipped"] += 1
+                    continue
+                try:
+                    self._clone_file(os.path.join(root, name), os.path.join(target_root, name), mode)
+                except OSError as e:
+                    # 模板目录正在被浏览器使用时，个别文件可能无法读取
+                    logging.warning(f"复制用户目录文件{relative_path}失败: {e}")
+
+        with open(os.path.join(session_dir, SESSION_MARKER), "w") as f:
+            f.write(str(os.getpid()))
+        self.active_sessions.add(session_dir)
+        logging.info(f"已克隆用户目录到{session_dir}，耗时{time.monotonic() - start:.2f}秒，统计: {self.stats}")
+        return session_dir
+
+    def release(self, session_dir: str):
+        """会话结束，删除用户目录副本"""
+        self.active_sessions.discard(session_dir)
+        shutil.rmtree(session_dir, ignore_errors=True)
+
+    def release_all(self):
+        for session_dir in list(self.active_sessions):
+            self.release(session_dir)
+
+    def gc(self, max_age: float = 12 * 3600) -> List[str]:
+        """
+        清理异常退出遗留的副本：标记文件中记录的进程已经不存在时删除；
+        没有标记文件(克隆过程中退出)的副本在创建后超过max_age时删除
+        :param max_age: 没有标记文件的副本的保留时间（秒）
+        :return: 被删除的副本目录
+        """
+        removed = []
+        if not os.path.isdir(self.sessions_dir):
+            return removed
+        now = time.time()
+        for name in os.listdir(self.sessions_dir):
+            session_dir = os.path.join(self.sessions_dir, name)
+            if not name.startswith(SESSION_PREFIX) or session_dir in self.active_sessions:
+                continue
+            pid = _read_session_pid(session_dir)
+            if pid is not None:
+                stale = not _process_alive(pid)
+            else:
+                stale = now - os.path.getmtime(session_dir) >= max_age
+            if stale:
+                shutil.rmtree(session_dir, ignore_errors=True)
+                removed.append(session_dir)
+        if removed:
+            logging.info(f"已清理{len(removed)}个遗留的用户目录副本")
+        return removed
@@ -0,0 +1,151 @@
+import json
+import logging
+import math
+import threading
+import urllib.request
+from typing import Any, Dict, List, Optional, Tuple
+
+import trio
+from selenium.webdriver.common.bidi import cdp
+
+
+class RequestInterceptor:
+    """
+    通过DevTools的Fetch域按资源类型拦截请求
+
+    Fetch.enable按资源类型暂停请求，暂停的请求必须由客户端答复，execute_cdp_cmd收不到事件，
+    因此在后台线程中维持一个到浏览器的DevTools连接，每个标签页一个会话，
+    把暂停的请求以BlockedByClient失败。WebDriver的窗口句柄就是标签页的target id
+    """
+
+    def __init__(self, driver, connect_timeout: float = 10):
+        self.driver = driver
+        self.connect_timeout = connect_timeout
+        self.available = True  # 连接失败后不再尝试
+        self.applied_handles: Dict[str, List[str]] = {}  # the key type is window_handle
+        self._sessions: Dict[str, Any] = {}  # window_handle -> CdpSession
+        self._scopes: Dict[str, Any] = {}  # window_handle -> 处理暂停请求的任务的CancelScope
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+        self._token = None
+        self._nursery = None
+        self._connection = None
+        self._devtools = None
+
+    def _cdp_details(self) -> Tuple[str, str]:
+        """(浏览器主版本号, DevTools连接地址)"""
+        capabilities = self.driver.capabilities
+        options = capabilities.get("ms:edgeOptions") or capabilities.get("goog:chromeOptions") or {}
+        debugger_address = options.get("debuggerAddress")
+        if not debugger_address:
+            raise Exception("浏览器没有提供DevTools调试地址")
+        with urllib.request.urlopen(f"http://{debugger_address}/json/version", timeout=self.connect_timeout) as f:
+            data = json.loads(f.read())
+        # 如 Edg/123.0.2420.65 或 Chrome/123.0.6312.86
+        version = data.get("Browser", "").split("/")[-1].split(".")[0]
+        return version, data["webSocketDebuggerUrl"]
+
+    def start(self) -> bool:
+        """在后台线程中建立DevTools连接，返回连接是否可用"""
+        if self._nursery is not None:
+            return True
+        if not self.available:
+            return False
+        self._ready.clear()
+        self._thread = threading.Thread(target=self._run, name="request-interceptor", daemon=True)
+        self._thread.start()
+        self._ready.wait(self.connect_timeout)
+        if self._nursery is None:
+            logging.warning("连接DevTools失败，按资源类型拦截不可用")
+            self.available = False
+        return self._nursery is not None
+
+    def _run(self):
+        try:
+            trio.run(self._main)
+        except Exception as e:
+            logging.warning(f"请求拦截连接中断 Exception: {e}")
+        finally:
+            self._nursery = None
+            self._ready.set()
+
+    async def _main(self):
+        version, url = self._cdp_details()
+        self._devtools = cdp.import_devtools(version)
+        async with cdp.open_cdp(url) as connection:
+            self._connection = connection
+            async with trio.open_nursery() as nursery:
+                self._token = trio.lowlevel.current_trio_token()
+                self._nursery = nursery
+                self._ready.set()
+                await trio.sleep_forever()
+
+    def apply(self, window_handle: str, resource_types: List[str]):
+        """在标签页中按资源类型拦截请求，资源类型为空时取消拦截，已经应用过相同设置时直接返回"""
+        if self.applied_handles.get(window_handle, []) == resource_types:
+            return
+        if not self.start():
+            return
+        try:
+            trio.from_thread.run(self._apply, window_handle, list(resource_types), trio_token=self._token)
+            self.applied_handles[window_handle] = list(resource_types)
+        except Exception as e:
+            logging.warning(f"标签页{window_handle}设置请求拦截失败 Exception: {e}")
+
+    async def _apply(self, window_handle: str, resource_types: List[str]):
+        devtools = self._devtools
+        session = self._sessions.get(window_handle)
+        if session is None:
+            session = await self._connection.connect_session(devtools.target.TargetID(window_handle))
+            # 暂停的请求不能丢弃，否则会一直挂起，因此不限制缓冲区大小
+            receiver = session.listen(devtools.fetch.RequestPaused, buffer_size=math.inf)
+            self._sessions[window_handle] = session
+            self._nursery.start_soon(self._serve, window_handle, session, receiver)
+        if resource_types:
+            patterns = [devtools.fetch.RequestPattern(resource_type=devtools.network.ResourceType(resource_type),
+                                                      request_stage=devtools.fetch.RequestStage.REQUEST)
+                        for resource_type in resource_types]
+            await session.execute(devtools.fetch.enable(patterns=patterns))
+        else:
+            await session.execute(devtools.fetch.disable())
+
+    async def _serve(self, window_handle: str, session, receiver):
+        devtools = self._devtools
+        with trio.CancelScope() as scope:
+            self._scopes[window_handle] = scope
+            async for event in receiver:
+                try:
+                    await session.execute(devtools.fetch.fail_request(
+                        event.request_id, devtools.network.ErrorReason.BLOCKED_BY_CLIENT))
+                except Exception as e:
+                    # 请求所在的页面可能已经关闭
+                    logging.debug(f"拦截请求{event.request.url}失败 Exception: {e}")
+
+    def forget(self, window_handle: Optional[str] = None):
+        """标签页关闭后结束它的会话，为空时结束全部"""
+        handles = list(self._scopes) if window_handle is None else [window_handle]
+        for handle in handles:
+            self.applied_handles.pop(handle, None)
+            self._sessions.pop(handle, None)
+            scope = self._scopes.pop(handle, None)
+            if scope is not None and self._token is not None:
+                try:
+                    trio.from_thread.run_sync(scope.cancel, trio_token=self._token)
+                except Exception as e:
+                    logging.debug(f"结束标签页{handle}的拦截会话失败 Exception: {e}")
+        if window_handle is None:
+            self.applied_handles.clear()
+
+    def close(self):
+        """断开DevTools连接"""
+        if self._nursery is not None and self._token is not None:
+            try:
+                trio.from_thread.run_sync(self._nursery.cancel_scope.cancel, trio_token=self._token)
+            except Exception as e:
+                logging.debug(f"断开DevTools连接失败 Exception: {e}")
+        if self._thread is not None:
+            self._thread.join(self.connect_timeout)
+        self._thread = None
+        self._sessions.clear()
+        self._scopes.clear()
+        self.applied_handles.clear()
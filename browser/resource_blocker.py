@@ -0,0 +1,182 @@
+import logging
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from browser.request_interceptor import RequestInterceptor
+
+
+# 资源类型到DevTools资源类型(Network.ResourceType)的映射，按请求的实际类型拦截，与网址的扩展名无关
+RESOURCE_TYPES: Dict[str, str] = {
+    "image": "Image",
+    "font": "Font",
+    "stylesheet": "Stylesheet",
+    "media": "Media",
+    "script": "Script",
+    "texttrack": "TextTrack",
+    "xhr": "XHR",
+    "fetch": "Fetch",
+    "websocket": "WebSocket",
+    "manifest": "Manifest",
+    "ping": "Ping",
+}
+
+# 无法按资源类型区分的请求，按URL通配符拦截(Network.setBlockedURLs)
+URL_PATTERN_GROUPS: Dict[str, List[str]] = {
+    "tracker": [
+        "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+        "*hm.baidu.com*", "*cnzz.com*", "*51.la*", "*facebook.net*",
+    ],
+}
+
+# 没有同类型已加载请求可供参考时，用于估算节省流量的单个请求大小（字节）
+DEFAULT_RESOURCE_SIZE: Dict[str, int] = {
+    "Image": 30 * 1024,
+    "Font": 40 * 1024,
+    "Stylesheet": 20 * 1024,
+    "Media": 500 * 1024,
+    "Script": 20 * 1024,
+    "Other": 5 * 1024,
+}
+
+
+class ResourceStatistics:
+    """
+    根据性能日志中的网络事件统计加载与被拦截的请求
+
+    被拦截的请求没有实际传输，节省的流量按同类型已加载请求的平均大小估算
+    """
+
+    def __init__(self):
+        self.request_types: Dict[str, str] = {}  # the key type is requestId
+        self.loaded_requests = 0
+        self.loaded_bytes = 0
+        self.loaded_by_type: Dict[str, List[int]] = {}  # 类型 -> [请求数, 字节数]
+        self.blocked_by_type: Dict[str, int] = {}
+
+    def on_event(self, method: str, params: Dict[str, Any]):
+        if method == "Network.requestWillBeSent":
+            self.request_types[params.get("requestId")] = params.get("type", "Other")
+        elif method == "Network.loadingFinished":
+            resource_type = self.request_types.pop(params.get("requestId"), "Other")
+            size = int(params.get("encodedDataLength", 0))
+            self.loaded_requests += 1
+            self.loaded_bytes += size
+            record = self.loaded_by_type.setdefault(resource_type, [0, 0])
+            record[0] += 1
+            record[1] += size
+        elif method == "Network.loadingFailed":
+            resource_type = params.get("type") or self.request_types.get(params.get("requestId"), "Other")
+            self.request_types.pop(params.get("requestId"), None)
+            # setBlockedURLs拦截的请求带有blockedReason，Fetch拦截的请求以ERR_BLOCKED_BY_CLIENT失败
+            if params.get("blockedReason") or "ERR_BLOCKED_BY_CLIENT" in params.get("errorText", ""):
+                self.blocked_by_type[resource_type] = self.blocked_by_type.get(resource_type, 0) + 1
+
+    @property
+    def blocked_requests(self) -> int:
+        return sum(self.blocked_by_type.values())
+
+    def estimated_saved_bytes(self) -> int:
+        saved = 0
+        for resource_type, count in self.blocked_by_type.items():
+            record = self.loaded_by_type.get(resource_type)
+            if record and record[0]:
+                average = record[1] / record[0]
+            else:
+                average = DEFAULT_RESOURCE_SIZE.get(resource_type, DEFAULT_RESOURCE_SIZE["Other"])
+            saved += int(average * count)
+        return saved
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "loaded_requests": self.loaded_requests,
+            "loaded_bytes": self.loaded_bytes,
+            "blocked_requests": self.blocked_requests,
+            "blocked_by_type": dict(self.blocked_by_type),
+            "estimated_saved_bytes": self.estimated_saved_bytes(),
+        }
+
+    def clear(self):
+        self.request_types.clear()
+        self.loaded_requests = 0
+        self.loaded_bytes = 0
+        self.loaded_by_type.clear()
+        self.blocked_by_type.clear()
+
+
+def resolve_block_config(config: Union[None, List[str], Dict[str, Any]]) -> Tuple[List[str], List[str]]:
+    """
+    将拦截配置转换为要拦截的资源类型与URL匹配模式
+    :param config: 资源类型列表，如 ["image", "font", "tracker"]；
+                   或 {"types": ["image"], "patterns": ["*ads*"]}
+    :return: (DevTools资源类型列表, URL匹配模式列表)
+    """
+    if not config:
+        return [], []
+    if isinstance(config, dict):
+        names = config.get("types", [])
+        patterns = list(config.get("patterns", []))
+    else:
+        names = config
+        patterns = []
+    resource_types = []
+    for name in names:
+        resource_type = RESOURCE_TYPES.get(name.lower())
+        if resource_type is not None:
+            resource_types.append(resource_type)
+        elif name in URL_PATTERN_GROUPS:
+            patterns.extend(URL_PATTERN_GROUPS[name])
+        else:
+            # 不是预设的资源类型时，当作URL匹配模式
+            patterns.append(name)
+    # 去重并保持顺序
+    return list(dict.fromkeys(resource_types)), list(dict.fromkeys(patterns))
+
+
+class ResourceBlocker:
+    """
+    通过DevTools协议拦截页面资源：资源类型由RequestInterceptor按Fetch请求拦截，
+    URL匹配模式由Network.setBlockedURLs拦截
+
+    拦截设置只对当前标签页生效，因此记录已经应用过的标签页，切换到新标签页时再次应用
+    """
+
+    def __init__(self, driver, interceptor: Optional[RequestInterceptor] = None):
+        self.driver = driver
+        self.interceptor = interceptor or RequestInterceptor(driver)
+        self.resource_types: List[str] = []
+        self.patterns: List[str] = []
+        self.applied_handles: Dict[str, List[str]] = {}  # the key type is window_handle
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.resource_types or self.patterns)
+
+    def set_config(self, resource_types: List[str], patterns: List[str]):
+        self.resource_types = list(resource_types)
+        self.patterns = list(patterns)
+
+    def apply(self, window_handle: str):
+        """在当前标签页应用拦截设置，已经应用过相同设置时不再发送命令"""
+        if self.resource_types or window_handle in self.interceptor.applied_handles:
+            self.interceptor.apply(window_handle, self.resource_types)
+        if self.applied_handles.get(window_handle, []) == self.patterns:
+            return
+        try:
+            self.driver.execute_cdp_cmd("Network.enable", {})
+            self.driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": self.patterns})
+            self.applied_handles[window_handle] = list(self.patterns)
+        except Exception as e:
+            logging.warning(f"设置资源拦截失败 Exception: {e}")
+        if self.enabled:
+            logging.info(f"标签页{window_handle}已拦截资源: {self.resource_types + self.patterns}")
+
+    def forget(self, window_handle: Optional[str] = None):
+        """标签页关闭后清除记录，为空时清除全部"""
+        self.interceptor.forget(window_handle)
+        if window_handle is None:
+            self.applied_handles.clear()
+        else:
+            self.applied_handles.pop(window_handle, None)
+
+    def close(self):
+        self.interceptor.close()
+        self.applied_handles.clear()
@@ -0,0 +1,113 @@
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+
+# 返回当前页面的 [origin, localStorage, sessionStorage]
+STORAGE_EXPORT_SCRIPT = """
+function dump(storage) {
+    var items = {};
+    try {
+        for (var i = 0; i < storage.length; i++) {
+            var key = storage.key(i);
+            items[key] = storage.getItem(key);
+        }
+    } catch (e) {}
+    return items;
+}
+return [location.origin, dump(window.localStorage), dump(window.sessionStorage)];
+"""
+
+# 在每个新文档执行前注入，只写入页面中还不存在的键，避免覆盖页面自己的改动
+STORAGE_RESTORE_TEMPLATE = """
+(function () {
+    var origins = %s;
+    var state = origins[location.origin];
+    if (!state) return;
+    function restore(storage, items) {
+        try {
+            for (var key in items) {
+                if (storage.getItem(key) === null) storage.setItem(key, items[key]);
+            }
+        } catch (e) {}
+    }
+    restore(window.localStorage, state.local || {});
+    restore(window.sessionStorage, state.session || {});
+})();
+"""
+
+
+class SessionState:
+    """
+    浏览器会话状态快照：Cookie以及各个源的localStorage与sessionStorage
+    """
+
+    def __init__(self,
+                 cookies: Optional[List[Dict[str, Any]]] = None,
+                 origins: Optional[Dict[str, Dict[str, Dict[str, str]]]] = None,
+                 created_at: Optional[float] = None):
+        self.cookies = cookies or []
+        self.origins = origins or {}  # origin -> {"local": {...}, "session": {...}}
+        self.created_at = created_at if created_at is not None else time.time()
+
+    def is_expired(self, ttl: Optional[float]) -> bool:
+        return ttl is not None and time.time() - self.created_at > ttl
+
+    def missing_cookies(self, required_cookies: List[str]) -> List[str]:
+        """返回缺失或已过期的必需Cookie名称"""
+        now = time.time()
+        valid = set()
+        for cookie in self.cookies:
+            expires = cookie.get("expires", -1)
+            # expires为-1表示会话Cookie
+            if expires is None or expires < 0 or expires > now:
+                valid.add(cookie.get("name"))
+        return [name for name in required_cookies if name not in valid]
+
+    def storage_restore_script(self) -> str:
+        return STORAGE_RESTORE_TEMPLATE % json.dumps(self.origins, ensure_ascii=False)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"created_at": self.created_at, "cookies": self.cookies, "origins": self.origins}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SessionState":
+        return cls(data.get("cookies"), data.get("origins"), data.get("created_at"))
+
+    def save(self, path: str):
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        temp_path = path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> Optional["SessionState"]:
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return cls.from_dict(json.load(f))
+        except (OSError, ValueError) as e:
+            logging.warning(f"读取会话快照{path}失败: {e}")
+            return None
+
+
+def check_session_state(state: Optional[SessionState], ttl: Optional[float] = None,
+                        required_cookies: Optional[List[str]] = None) -> bool:
+    """
+    不启动页面的快速校验：快照存在、没有超过TTL、必需的Cookie都存在且未过期
+    """
+    if state is None:
+        return False
+    if state.is_expired(ttl):
+        logging.info("会话快照已超过有效期")
+        return False
+    missing = state.missing_cookies(required_cookies or [])
+    if missing:
+        logging.info(f"会话快照缺少有效的Cookie: {missing}")
+        return False
+    return True
@@ -0,0 +1,91 @@
+import logging
+import time
+from typing import Dict, Optional
+from urllib.parse import urljoin
+
+import urllib3
+
+from browser.dom_snapshot import DomSnapshot
+from browser.politeness import get_politeness_scheduler
+
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) "
+                  "Chrome/124.0.0.0 Safari/537.36 Edg/124.0.0.0",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
+}
+
+
+class StaticPageFetcher:
+    """
+    不经过浏览器直接下载服务端渲染的页面
+
+    使用带连接池的keep-alive HTTP客户端，下载后用lxml解析为DomSnapshot，
+    字段XPath与浏览器快照模式下的求值方式相同；设置了站点限速时请求按站点排队
+    """
+
+    # 表示访问受到限制的状态码，调度器随之减速
+    BLOCKED_STATUSES = (403, 429)
+
+    def __init__(self, pool_size: int = 10, timeout: float = 10, retries: int = 2,
+                 headers: Optional[Dict[str, str]] = None):
+        self.pool = urllib3.PoolManager(
+            num_pools=pool_size,
+            maxsize=pool_size,
+            headers={**DEFAULT_HEADERS, **(headers or {})},
+            timeout=urllib3.Timeout(total=timeout),
+            # 重定向不计入重试次数，否则retries为0时无法跟随重定向
+            retries=urllib3.Retry(total=None, connect=retries, read=retries, status=retries, redirect=5,
+                                  backoff_factor=0.2, status_forcelist=(502, 503, 504)),
+        )
+        self.stats = {"requests": 0, "failures": 0, "bytes": 0, "total_time": 0.0}
+
+    def fetch(self, url: str, headers: Optional[Dict[str, str]] = None) -> Optional[DomSnapshot]:
+        """
+        下载并解析页面
+        :return: 页面快照，请求失败、状态码不是2xx或者不是HTML时返回None
+        """
+        self.stats["requests"] += 1
+        scheduler = get_politeness_scheduler()
+        ticket = scheduler.acquire(url) if scheduler is not None else None
+        start = time.monotonic()
+        try:
+            response = self.pool.request("GET", url, headers=headers)
+        except Exception as e:
+            self.stats["failures"] += 1
+            logging.warning(f"静态下载{url}失败: {e}")
+            if ticket is not None:
+                ticket.release(error=True)
+            return None
+        finally:
+            self.stats["total_time"] += time.monotonic() - start
+
+        # 发生重定向时geturl可能只返回路径，需要以请求网址为基准补全
+        final_url = urljoin(url, response.geturl() or url)
+        if ticket is not None:
+            ticket.release(error=response.status >= 500,
+                           blocked=response.status in self.BLOCKED_STATUSES or scheduler.is_blocked_page(final_url))
+
+        self.stats["bytes"] += len(response.data)
+        content_type = response.headers.get("Content-Type", "")
+        if not 200 <= response.status < 300 or (content_type and "html" not in content_type):
+            self.stats["failures"] += 1
+            logging.warning(f"静态下载{url}得到不可用的响应: {response.status} {content_type}")
+            return None
+
+        charset = self._get_charset(content_type)
+        # 响应头没有声明编码时交给lxml按页面中的meta标签识别
+        source = response.data.decode(charset, errors="replace") if charset else response.data
+        return DomSnapshot(source, final_url)
+
+    @staticmethod
+    def _get_charset(content_type: str) -> Optional[str]:
+        for part in content_type.split(";"):
+            part = part.strip()
+            if part.lower().startswith("charset="):
+                return part.split("=", 1)[1].strip("\"'") or None
+        return None
+
+    def close(self):
+        self.pool.clear()
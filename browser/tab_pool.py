@@ -0,0 +1,206 @@
+import logging
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from browser.page_tracker import PageTracker
+
+
+class TabSession:
+    """
+    标签池中的一个标签页，作为独立的逻辑会话
+
+    每个标签页有自己的PageTracker历史，以及已经开始但还没有等待完成的导航
+    """
+
+    def __init__(self, handle: str):
+        self.handle = handle
+        self.page_tracker = PageTracker()
+        self.url: Optional[str] = None  # 最近一次在该标签页中打开的网址
+        self.in_use = False  # 是否正在被某个块使用
+        # 待完成的导航：导航前的文档标识与就绪条件，wait_ready之后清空
+        self.loading = False
+        self.previous_origin: Optional[str] = None
+        self.load_strategy: Optional[str] = None
+        self.ready_when: Union[None, Dict, List] = None
+        self.last_used = 0  # 最近使用的序号，用于选择复用的标签页
+
+    def __repr__(self):
+        return f"TabSession({self.handle}, {self.url}, loading={self.loading})"
+
+
+class TabPool:
+    """
+    同一个浏览器进程中的标签页池
+
+    WebDriver同一时刻只能操作一个标签页，但页面加载在浏览器中是并行的：
+    启动配置开启manual_page_load时驱动不等待页面加载，在多个标签页中依次发起导航后不需要等待，
+    之后再逐个等待就绪，多个页面的加载时间因此相互重叠；没有开启时页面依次加载。
+    与启动多个浏览器进程相比，占用的内存少得多
+    """
+
+    def __init__(self, browser, size: int = 2):
+        """
+        :param browser: BrowserAutomation
+        :param size: 最多同时打开的标签页数量，不包括标签池之外的原始标签页
+        """
+        self.browser = browser
+        self.size = max(1, size)
+        self.sessions: List[TabSession] = []
+        self.home_handle: Optional[str] = None  # 第一次激活池中标签页之前所在的标签页
+        self.home_tracker: Optional[PageTracker] = None
+        self.stats = {"opened": 0, "loads": 0, "reused": 0}
+        self._use_count = 0
+
+    def find(self, url: str) -> Optional[TabSession]:
+        """已经打开或正在加载该网址、且没有被使用的标签页"""
+        for session in self.sessions:
+            if session.url == url and not session.in_use:
+                return session
+        return None
+
+    def acquire(self, exclude_urls: Iterable[str] = ()) -> Optional[TabSession]:
+        """
+        取得一个空闲的标签页，标签页数量未达到上限时新建，否则复用最久没有使用的空闲标签页
+        :param exclude_urls: 不能复用的标签页的网址，如已经开始加载、稍后要用到的页面
+        :return: 没有可用的标签页时返回None
+        """
+        if len(self.sessions) < self.size:
+            return self._open_session()
+        exclude_urls = set(exclude_urls)
+        candidates = [session for session in self.sessions
+                      if not session.in_use and session.url not in exclude_urls]
+        if not candidates:
+            return None
+        self.stats["reused"] += 1
+        return min(candidates, key=lambda session: session.last_used)
+
+    def _open_session(self) -> TabSession:
+        self._remember_home()
+        session = TabSession(self.browser.new_tab())
+        self.sessions.append(session)
+        self.stats["opened"] += 1
+        logging.info(f"标签池新建标签页{session.handle}，共{len(self.sessions)}个")
+        return session
+
+    def _remember_home(self):
+        if self.home_handle is None:
+            self.home_handle = self.browser.current_handle
+            self.home_tracker = self.browser.page_tracker
+
+    def start_load(self, session: TabSession, url: str, load_strategy: Optional[str] = None,
+                   ready_when: Union[None, Dict, List] = None):
+        """在标签页中发起导航，不等待加载完成"""
+        self._switch(session)
+        session.previous_origin = self.browser.start_page_load(url)
+        session.url = url
+        session.loading = True
+        session.load_strategy = load_strategy
+        session.ready_when = ready_when
+        # 新页面的回退历史从头开始
+        session.page_tracker = PageTracker()
+        self.stats["loads"] += 1
+
+    def wait_ready(self, session: TabSession) -> bool:
+        """切换到标签页并等待它的导航完成，没有待完成的导航时直接返回"""
+        self._switch(session)
+        if not session.loading:
+            return True
+        ready = self.browser.wait_for_page_load(session.previous_origin, session.load_strategy,
+                                                session.ready_when)
+        session.loading = False
+        session.previous_origin = None
+        self.browser.performance_log.poll()
+        return ready
+
+    def cancel_load(self, session: TabSession):
+        """停止标签页中尚未完成的导航，标签页可以立即被复用"""
+        if session.loading:
+            self._switch(session)
+            self.browser.stop_page_load()
+        session.loading = False
+        session.previous_origin = None
+        session.url = None
+
+    def activate(self, session: TabSession) -> bool:
+        """
+        等待标签页就绪并把它作为当前标签页，之后的点击、回退都记录在该标签页自己的PageTracker中
+        :return: 页面是否在超时时间内就绪
+        """
+        ready = self.wait_ready(session)
+        self._use_count += 1
+        session.in_use = True
+        session.last_used = self._use_count
+        self.browser.page_tracker = session.page_tracker
+        return ready
+
+    def release(self, session: TabSession):
+        """标签页使用完毕，可以被复用"""
+        session.in_use = False
+
+    def restore(self):
+        """回到标签池之外的原始标签页，恢复原来的PageTracker"""
+        if self.home_handle is None:
+            return
+        if self.browser.current_handle != self.home_handle:
+            self.browser.switch_to_window(self.home_handle)
+        self.browser.page_tracker = self.home_tracker
+
+    def open(self, url: str, load_strategy: Optional[str] = None,
+             ready_when: Union[None, Dict, List] = None,
+             upcoming_urls: Iterable[str] = ()) -> Tuple[Optional[TabSession], bool]:
+        """
+        在标签页中打开网址并激活，同时在空闲的标签页中为之后要打开的网址发起导航，
+        这些页面与当前页面并行加载，之后调用open时直接使用
+        :param upcoming_urls: 之后要打开的网址，按顺序最多占用剩余的标签页
+        :return: (标签页, 是否就绪)，没有可用的标签页时返回 (None, False)
+        """
+        upcoming_urls = [upcoming for upcoming in upcoming_urls if upcoming and upcoming != url]
+        session = self.find(url)
+        if session is None:
+            session = self.acquire(exclude_urls=upcoming_urls)
+            if session is None:
+                return None, False
+            self.start_load(session, url, load_strategy, ready_when)
+        # 当前页面先标记为使用中，不会被之后的网址占用
+        session.in_use = True
+        for upcoming in upcoming_urls:
+            if self.find(upcoming) is not None:
+                continue
+            busy_urls = [url] + upcoming_urls
+            spare = self.acquire(exclude_urls=busy_urls)
+            if spare is None:
+                break
+            self.start_load(spare, upcoming, load_strategy, ready_when)
+        return session, self.activate(session)
+
+    def load_all(self, urls: List[str], load_strategy: Optional[str] = None,
+                 ready_when: Union[None, Dict, List] = None) -> Iterator[Tuple[str, TabSession, bool]]:
+        """
+        按顺序依次打开多个网址，同时最多有size个页面在加载
+        每次产出 (网址, 已激活的标签页, 是否就绪)，调用方处理完页面后继续迭代，标签页随即被复用
+        """
+        for index, url in enumerate(urls):
+            session, ready = self.open(url, load_strategy, ready_when, urls[index + 1:index + self.size])
+            if session is None:
+                logging.warning(f"标签池没有可用的标签页，跳过 {url}")
+                continue
+            try:
+                yield url, session, ready
+            finally:
+                self.release(session)
+
+    def close(self):
+        """关闭池中所有标签页并回到原始标签页"""
+        for session in self.sessions:
+            self.browser.close_tab(session.handle)
+        self.sessions.clear()
+        self.restore()
+        self.home_handle = None
+        self.home_tracker = None
+
+    def _switch(self, session: TabSession):
+        self._remember_home()
+        if self.browser.current_handle != session.handle:
+            self.browser.switch_to_window(session.handle)
+
+    def summary(self) -> Dict[str, Any]:
+        return {"size": self.size, "tabs": len(self.sessions), **self.stats}
@@ -0,0 +1,99 @@
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+import unittest
+from browser.element_cache import ElementBatchCache, PageValueCache
+
+
+class CacheBrowser:
+    """元素用字符串表示，rendered中的元素才能被找到"""
+
+    def __init__(self, rendered):
+        self.rendered = rendered
+        self.version = 0
+        self.batch_calls = 0
+        self.single_lookups = []
+
+    def get_page_version(self):
+        return "main", self.version
+
+    def resolve(self, xpaths):
+        self.batch_calls += 1
+        return {xpath: self.rendered.get(xpath) for xpath in xpaths}
+
+    def get_element_by_xpath(self, xpath, timeout=None):
+        self.single_lookups.append(xpath)
+        return self.rendered.get(xpath)
+
+
+class TestElementBatchCache(unittest.TestCase):
+
+    def setUp(self):
+        self.browser = CacheBrowser({"//li[1]": "li1", "//li[2]": "li2"})
+        self.cache = ElementBatchCache(self.browser)
+        self.items = ["//li[1]", "//li[2]", "//li[3]"]
+
+    def get(self, xpath):
+        return self.cache.get(xpath, lambda: self.browser.resolve(self.items))
+
+    def test_batch_resolve_once(self):
+        self.assertEqual("li1", self.get("//li[1]"))
+        self.assertEqual("li2", self.get("//li[2]"))
+        self.assertEqual(1, self.browser.batch_calls)
+        self.assertEqual([], self.browser.single_lookups)
+
+    def test_missing_element_is_not_cached(self):
+        self.assertIsNone(self.get("//li[3]"))
+        self.assertEqual(["//li[3]"], self.browser.single_lookups)
+        # 之后渲染出来的元素通过单独查询得到，不需要再次批量解析
+        self.browser.rendered["//li[3]"] = "li3"
+        self.assertEqual("li3", self.get("//li[3]"))
+        self.assertEqual("li3", self.get("//li[3]"))
+        self.assertEqual(1, self.browser.batch_calls)
+        self.assertEqual(["//li[3]", "//li[3]"], self.browser.single_lookups)
+
+    def test_fallback(self):
+        value = self.cache.get("//li[3]", lambda: self.browser.resolve(self.items), lambda xpath: "fallback")
+        self.assertEqual("fallback", value)
+        self.assertEqual([], self.browser.single_lookups)
+
+    def test_invalidate_on_page_version(self):
+        self.get("//li[1]")
+        self.browser.version += 1
+        self.browser.rendered["//li[1]"] = "new-li1"
+        self.assertEqual("new-li1", self.get("//li[1]"))
+        self.assertEqual(2, self.browser.batch_calls)
+
+    def test_new_item_triggers_batch(self):
+        self.get("//li[1]")
+        self.items.append("//li[4]")
+        self.browser.rendered["//li[4]"] = "li4"
+        self.assertEqual("li4", self.get("//li[4]"))
+        self.assertEqual(2, self.browser.batch_calls)
+
+
+class TestPageValueCache(unittest.TestCase):
+
+    def test_none_values_are_cached(self):
+        browser = CacheBrowser({"//li[1]": "https://a"})
+        cache = PageValueCache(browser)
+        items = ["//li[1]", "//li[2]"]
+        fallback = []
+        get = lambda xpath: cache.get(xpath, lambda: browser.resolve(items), lambda x: fallback.append(x))
+        self.assertEqual("https://a", get("//li[1]"))
+        # 没有链接的循环项同样缓存，不会再次求值
+        self.assertIsNone(get("//li[2]"))
+        self.assertIsNone(get("//li[2]"))
+        self.assertEqual(1, browser.batch_calls)
+        # 重新批量求值后仍然没有得到的XPath单独求值
+        self.assertIsNone(get("//li[3]"))
+        self.assertEqual(["//li[3]"], fallback)
+        self.assertEqual(2, browser.batch_calls)
+        browser.version += 1
+        get("//li[1]")
+        self.assertEqual(3, browser.batch_calls)
+
+
+if __name__ == '__main__':
+    unittest.main()
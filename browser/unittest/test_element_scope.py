@@ -0,0 +1,91 @@
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+import unittest
+from selenium.common.exceptions import StaleElementReferenceException
+from browser.browser_automation import BrowserAutomation, ELEMENTS_BY_XPATHS_SCRIPT, SCOPED_ELEMENT_SCRIPT
+from browser.element_cache import ElementScope, to_scoped_xpath
+
+
+class ScopeDriver:
+    """循环项元素用字符串表示，stale中的元素已经失效"""
+
+    def __init__(self, elements):
+        self.elements = elements
+        self.stale = set()
+        self.calls = []
+
+    def execute_script(self, script, *args):
+        if script == ELEMENTS_BY_XPATHS_SCRIPT:
+            self.calls.append("resolve")
+            return [self.elements.get(xpath) for xpath in args[0]]
+        if script == SCOPED_ELEMENT_SCRIPT:
+            self.calls.append("scoped")
+            scope, xpath = args
+            if scope in self.stale:
+                raise StaleElementReferenceException("stale element reference")
+            return [False, scope + xpath[1:]]
+        raise AssertionError(script)
+
+
+class ScopeBrowser(BrowserAutomation):
+    def __init__(self, driver):
+        self.browser = driver
+        self.static_page = None
+        self.scope_stats = {"scoped": 0, "stale": 0, "fallback": 0}
+        self._current_handle = "main"
+        self.page_versions = {}
+        self.optional_timeout = 1
+        self.absolute_lookups = []
+        self.lookup_timeouts = []
+
+    def get_element_by_xpath(self, xpath, timeout=None):
+        self.absolute_lookups.append(xpath)
+        self.lookup_timeouts.append(timeout)
+        return None if "missing" in xpath else "absolute:" + xpath
+
+
+class TestElementScope(unittest.TestCase):
+
+    def setUp(self):
+        self.driver = ScopeDriver({"//li[1]": "li1"})
+        self.browser = ScopeBrowser(self.driver)
+
+    def test_to_scoped_xpath(self):
+        self.assertEqual("./h4", to_scoped_xpath("/h4"))
+        self.assertEqual(".//a", to_scoped_xpath("//a"))
+        self.assertEqual(".", to_scoped_xpath(""))
+        self.assertIsNone(to_scoped_xpath("[2]"))
+
+    def test_lookup_in_cached_element(self):
+        scope = ElementScope("//li[1]", "li1")
+        self.assertEqual("li1/h4", self.browser.get_element_in_scope(scope, "/h4"))
+        self.assertEqual("li1/strong", self.browser.get_element_in_scope(scope, "/strong"))
+        self.assertEqual(["scoped", "scoped"], self.driver.calls)
+        self.assertEqual(2, self.browser.scope_stats["scoped"])
+
+    def test_stale_element_is_resolved_again(self):
+        self.driver.stale.add("old")
+        scope = ElementScope("//li[1]", "old")
+        self.assertEqual("li1/h4", self.browser.get_element_in_scope(scope, "/h4"))
+        self.assertEqual("li1", scope.element)
+        self.assertEqual(["scoped", "resolve", "scoped"], self.driver.calls)
+        self.assertEqual(1, self.browser.scope_stats["stale"])
+        # 其他缓存的元素句柄同样失效
+        self.assertEqual(("main", 1), self.browser.get_page_version())
+
+    def test_fallback_to_absolute_xpath(self):
+        scope = ElementScope("//li[1]", "li1")
+        self.assertEqual("absolute://li[1][2]", self.browser.get_element_in_scope(scope, "[2]"))
+        missing = ElementScope("//li[9]")
+        self.assertEqual("absolute://li[9]/h4", self.browser.get_element_in_scope(missing, "/h4"))
+        self.assertEqual(2, self.browser.scope_stats["fallback"])
+
+    def test_missing_text_uses_optional_timeout(self):
+        self.assertIsNone(self.browser.get_element_text("//missing"))
+        self.assertEqual([1], self.browser.lookup_timeouts)
+
+
+if __name__ == '__main__':
+    unittest.main()
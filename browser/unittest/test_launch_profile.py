@@ -0,0 +1,51 @@
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+import unittest
+from unittest import mock
+from browser.launch_profile import LAUNCH_PROFILE_ENV, get_launch_profile
+
+
+class TestLaunchProfile(unittest.TestCase):
+    """测试浏览器启动配置"""
+
+    def test_default_profile_keeps_original_arguments(self):
+        with mock.patch.dict(os.environ, {}, clear=True):
+            options = get_launch_profile().to_options()
+        self.assertIn("--remote-debugging-port=9222", options.arguments)
+        self.assertIn("--user-data-dir=./edge_user_data", options.arguments)
+        self.assertNotIn("--headless=new", options.arguments)
+
+    def test_profile_from_environment(self):
+        with mock.patch.dict(os.environ, {LAUNCH_PROFILE_ENV: "headless-fast"}):
+            profile = get_launch_profile()
+        self.assertEqual(profile.name, "headless-fast")
+        self.assertEqual(profile.load_strategy, "eager")
+        options = profile.to_options()
+        self.assertIn("--headless=new", options.arguments)
+        self.assertEqual(options.experimental_options["prefs"]["profile.managed_default_content_settings.images"], 2)
+
+    def test_overrides_do_not_change_registered_profile(self):
+        profile = get_launch_profile({"profile": "low-memory", "window_size": [800, 600], "headless": False})
+        self.assertEqual(profile.window_size, (800, 600))
+        self.assertIn("--window-size=800,600", profile.to_options().arguments)
+        self.assertTrue(get_launch_profile("low-memory").headless)
+        with self.assertRaises(Exception):
+            get_launch_profile({"profile": "low-memory", "unknown_option": 1})
+
+    def test_network_log_only_when_configured(self):
+        self.assertNotIn("ms:loggingPrefs", get_launch_profile("default").to_options().to_capabilities())
+        options = get_launch_profile({"profile": "default", "network_log": True}).to_options()
+        self.assertEqual(options.to_capabilities()["ms:loggingPrefs"], {"performance": "ALL"})
+
+    def test_page_load_strategy(self):
+        # 驱动按启动配置的加载策略等待，开启manual_page_load时由浏览器自行等待
+        self.assertEqual(get_launch_profile("default").to_options().page_load_strategy, "normal")
+        self.assertEqual(get_launch_profile("headless-fast").to_options().page_load_strategy, "eager")
+        options = get_launch_profile({"profile": "headless-fast", "manual_page_load": True}).to_options()
+        self.assertEqual(options.page_load_strategy, "none")
+
+
+if __name__ == "__main__":
+    unittest.main()
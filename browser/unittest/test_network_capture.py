@@ -0,0 +1,56 @@
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+import unittest
+from browser.network_capture import ResponseRecorder, get_by_path, match_url, read_response_body
+
+
+def response_received(request_id: str, url: str, mime_type: str = "application/json", resource_type: str = "XHR"):
+    return {"requestId": request_id, "type": resource_type,
+            "response": {"url": url, "status": 200, "mimeType": mime_type}}
+
+
+class BodyDriver:
+    def __init__(self, bodies):
+        self.bodies = bodies
+
+    def execute_cdp_cmd(self, cmd, params):
+        return {"body": self.bodies[params["requestId"]], "base64Encoded": False}
+
+
+class TestNetworkCapture(unittest.TestCase):
+    """测试网络响应捕获"""
+
+    def test_match_url(self):
+        url = "https://example.com/api/search?page=2"
+        self.assertTrue(match_url(url, "/api/search"))
+        self.assertTrue(match_url(url, "*/api/*page=*"))
+        self.assertTrue(match_url(url, r"re:page=\d+"))
+        self.assertFalse(match_url(url, "/api/detail"))
+
+    def test_recorder(self):
+        recorder = ResponseRecorder()
+        recorder.on_event("Network.responseReceived", response_received("1", "https://a.com/api/list"))
+        recorder.on_event("Network.responseReceived", response_received("2", "https://a.com/logo.png", "image/png", "Image"))
+        recorder.on_event("Network.responseReceived", response_received("3", "https://a.com/api/list?page=2"))
+        # 只有加载完成的响应才能读取响应体
+        self.assertEqual(recorder.find("/api/list"), [])
+        recorder.on_event("Network.loadingFinished", {"requestId": "1"})
+        recorder.on_event("Network.loadingFinished", {"requestId": "2"})
+        records = recorder.find("/api/list")
+        self.assertEqual([record["request_id"] for record in records], ["1"])
+
+        recorder.consume(records)
+        recorder.on_event("Network.loadingFinished", {"requestId": "3"})
+        self.assertEqual([record["request_id"] for record in recorder.find("/api/list")], ["3"])
+
+    def test_read_body(self):
+        driver = BodyDriver({"1": '{"data": {"items": [{"id": 1}, {"id": 2}]}}', "2": 'callback({"ok": 1})'})
+        body = read_response_body(driver, {"request_id": "1", "url": "u"})
+        self.assertEqual(get_by_path(body, "data.items.1.id"), 2)
+        self.assertEqual(read_response_body(driver, {"request_id": "2", "url": "u"}), {"ok": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
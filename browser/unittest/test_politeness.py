@@ -0,0 +1,130 @@
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from browser.politeness import PolitenessScheduler, HostPolicy, configure_politeness, get_politeness_scheduler
+from browser.static_fetcher import StaticPageFetcher
+
+
+class LimitedHandler(BaseHTTPRequestHandler):
+    """/limited 返回429，其他路径返回普通页面"""
+
+    def do_GET(self):
+        body = b"<html><body><h1>ok</h1></body></html>"
+        self.send_response(429 if self.path == "/limited" else 200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestPoliteness(unittest.TestCase):
+
+    def test_token_bucket_spacing(self):
+        scheduler = PolitenessScheduler(HostPolicy(rate=20, burst=1, jitter=0))
+        start = time.monotonic()
+        scheduler.acquire("http://a.com/1").release()
+        scheduler.acquire("http://a.com/2").release()
+        # 第二个请求需要等待令牌补充，约0.05秒
+        self.assertGreaterEqual(time.monotonic() - start, 0.04)
+        # 其他站点有自己的令牌桶，不需要等待
+        start = time.monotonic()
+        scheduler.acquire("http://b.com/1").release()
+        self.assertLess(time.monotonic() - start, 0.04)
+        self.assertEqual(2, scheduler.summary()["a.com"]["requests"])
+
+    def test_max_concurrency_and_queue_depth(self):
+        scheduler = PolitenessScheduler(HostPolicy(rate=1000, burst=10, max_concurrency=1, jitter=0))
+        ticket = scheduler.acquire("http://a.com/1")
+        # 同一线程持有的名额不会阻塞自己
+        scheduler.acquire("http://a.com/2").release()
+
+        acquired = threading.Event()
+
+        def other_session():
+            scheduler.acquire("http://a.com/3").release()
+            acquired.set()
+
+        thread = threading.Thread(target=other_session)
+        thread.start()
+        for _ in range(100):
+            if scheduler.queue_depth().get("a.com") == 1:
+                break
+            time.sleep(0.01)
+        self.assertEqual({"a.com": 1}, scheduler.queue_depth())
+        self.assertFalse(acquired.is_set())
+
+        ticket.release()
+        thread.join(2)
+        self.assertTrue(acquired.is_set())
+        self.assertEqual({"a.com": 0}, scheduler.queue_depth())
+
+    def test_slow_down_on_blocked(self):
+        scheduler = PolitenessScheduler(HostPolicy(rate=1000, burst=10, backoff=2, recovery=0.5, jitter=0))
+        scheduler.acquire("http://a.com/1").release(blocked=True)
+        scheduler.acquire("http://a.com/2").release(error=True)
+        summary = scheduler.summary()["a.com"]
+        self.assertEqual(4, summary["penalty"])
+        self.assertEqual(1, summary["blocked"])
+        self.assertEqual(1, summary["errors"])
+        scheduler.acquire("http://a.com/3").release()
+        self.assertEqual(2, scheduler.summary()["a.com"]["penalty"])
+        # 没有发出的请求归还令牌，不计入请求数
+        scheduler.acquire("http://a.com/4").release(refund=True)
+        self.assertEqual(3, scheduler.summary()["a.com"]["requests"])
+
+    def test_refund_restores_spacing(self):
+        now = [100.0]
+        scheduler = PolitenessScheduler(HostPolicy(rate=1000, burst=10, min_interval=5, jitter=0),
+                                        clock=lambda: now[0])
+        scheduler.acquire("http://a.com/1").release()
+        now[0] += 5
+        # 没有导航的点击归还名额后，下一个请求不需要再等待间隔
+        scheduler.acquire("http://a.com/2").release(refund=True)
+        self.assertEqual(now[0], scheduler.states["a.com"].next_time)
+        ticket = scheduler.acquire("http://a.com/3")
+        self.assertEqual(now[0] + 5, scheduler.states["a.com"].next_time)
+        ticket.release()
+        self.assertEqual(2, scheduler.summary()["a.com"]["requests"])
+
+    def test_config(self):
+        scheduler = PolitenessScheduler.from_config({"rate": 2, "max_concurrency": 3,
+                                                     "hosts": {"example.com": {"rate": 0.5}}})
+        policy = scheduler.policy_for("www.example.com")
+        self.assertEqual(0.5, policy.rate)
+        self.assertEqual(3, policy.max_concurrency)
+        self.assertIs(scheduler.default, scheduler.policy_for("notexample.com"))
+        self.assertTrue(scheduler.is_blocked_page("https://a.com/verify", "请输入验证码"))
+        self.assertTrue(scheduler.is_blocked_page("https://a.com/CAPTCHA?next=/"))
+        self.assertFalse(scheduler.is_blocked_page("https://a.com/item/1", "商品详情"))
+
+    def test_static_fetch_slows_down(self):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), LimitedHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = "http://127.0.0.1:{}".format(server.server_address[1])
+        fetcher = StaticPageFetcher(retries=0)
+        configure_politeness({"rate": 1000, "burst": 10, "jitter": 0})
+        try:
+            self.assertIsNotNone(fetcher.fetch(base_url + "/page"))
+            self.assertIsNone(fetcher.fetch(base_url + "/limited"))
+            summary = get_politeness_scheduler().summary()["127.0.0.1"]
+        finally:
+            configure_politeness(None)
+            fetcher.close()
+            server.shutdown()
+            server.server_close()
+        self.assertEqual(2, summary["requests"])
+        self.assertEqual(1, summary["blocked"])
+        self.assertEqual(2, summary["penalty"])
+        self.assertEqual(0, summary["active"])
+
+
+if __name__ == '__main__':
+    unittest.main()
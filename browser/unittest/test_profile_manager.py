@@ -0,0 +1,89 @@
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+import subprocess
+import tempfile
+import time
+import unittest
+from unittest import mock
+from browser.profile_manager import ProfileManager, SESSION_MARKER
+
+
+class TestProfileManager(unittest.TestCase):
+    """测试用户目录模板克隆"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.template_dir = os.path.join(self.temp_dir.name, "edge_user_data")
+        files = {
+            "Local State": "{}",
+            "SingletonLock": "",
+            "Default/Cookies": "cookies",
+            "Default/Cache/Cache_Data/data_0": "cache",
+            "Default/Extensions/abc/1.0/manifest.json": "{}",
+        }
+        for path, content in files.items():
+            full_path = os.path.join(self.template_dir, *path.split("/"))
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            with open(full_path, "w") as f:
+                f.write(content)
+        self.manager = ProfileManager(self.template_dir)
+
+    def tearDown(self):
+        self.manager.release_all()
+        self.temp_dir.cleanup()
+
+    def test_clone(self):
+        # 不使用写时复制，不可变目录中的文件应为硬链接
+        with mock.patch("browser.profile_manager._reflink", return_value=False):
+            session_dir = self.manager.clone()
+        manifest = os.path.join("Default", "Extensions", "abc", "1.0", "manifest.json")
+        self.assertTrue(os.path.exists(os.path.join(session_dir, manifest)))
+        self.assertEqual(os.stat(os.path.join(session_dir, manifest)).st_ino,
+                         os.stat(os.path.join(self.template_dir, manifest)).st_ino)
+        self.assertNotEqual(os.stat(os.path.join(session_dir, "Default", "Cookies")).st_ino,
+                            os.stat(os.path.join(self.template_dir, "Default", "Cookies")).st_ino)
+        self.assertEqual(self.manager.stats["linked"], 1)
+        self.assertFalse(os.path.exists(os.path.join(session_dir, "SingletonLock")))
+        self.assertFalse(os.path.exists(os.path.join(session_dir, "Default", "Cache")))
+
+        # 可变状态是真实副本，修改后不影响模板
+        with open(os.path.join(session_dir, "Default", "Cookies"), "w") as f:
+            f.write("changed")
+        with open(os.path.join(self.template_dir, "Default", "Cookies")) as f:
+            self.assertEqual(f.read(), "cookies")
+
+        self.manager.release(session_dir)
+        self.assertFalse(os.path.exists(session_dir))
+
+    def test_gc_removes_sessions_of_dead_processes(self):
+        # 模拟异常退出的进程遗留的副本
+        process = subprocess.Popen([sys.executable, "-c", "pass"])
+        process.wait()
+        stale_dir = self.manager.clone("stale")
+        self.manager.active_sessions.discard(stale_dir)
+        with open(os.path.join(stale_dir, SESSION_MARKER), "w") as f:
+            f.write(str(process.pid))
+        # 进程仍在运行的副本即使创建了很久也不删除
+        running_dir = self.manager.clone("running")
+        self.manager.active_sessions.discard(running_dir)
+        past = time.time() - 3600
+        os.utime(os.path.join(running_dir, SESSION_MARKER), (past, past))
+        os.utime(running_dir, (past, past))
+
+        self.assertEqual(self.manager.gc(max_age=60), [stale_dir])
+        self.assertTrue(os.path.exists(running_dir))
+
+    def test_gc_sessions_without_marker(self):
+        # 克隆过程中退出的副本没有标记文件，超过max_age后删除
+        unfinished_dir = os.path.join(self.manager.sessions_dir, "session-unfinished")
+        os.makedirs(unfinished_dir)
+        self.assertEqual(self.manager.gc(max_age=60), [])
+        past = time.time() - 3600
+        os.utime(unfinished_dir, (past, past))
+        self.assertEqual(self.manager.gc(max_age=60), [unfinished_dir])
+
+
+if __name__ == "__main__":
+    unittest.main()
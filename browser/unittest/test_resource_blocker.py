@@ -0,0 +1,79 @@
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+import unittest
+from browser.resource_blocker import ResourceBlocker, ResourceStatistics, URL_PATTERN_GROUPS, resolve_block_config
+
+
+class FakeDriver:
+    def __init__(self):
+        self.commands = []
+
+    def execute_cdp_cmd(self, cmd, params):
+        self.commands.append((cmd, params))
+        return {}
+
+
+class FakeInterceptor:
+    def __init__(self):
+        self.applied_handles = {}
+        self.forgotten = []
+
+    def apply(self, window_handle, resource_types):
+        self.applied_handles[window_handle] = list(resource_types)
+
+    def forget(self, window_handle=None):
+        self.forgotten.append(window_handle)
+        self.applied_handles.pop(window_handle, None)
+
+
+class TestResourceBlocker(unittest.TestCase):
+    """测试资源拦截配置与统计"""
+
+    def test_resolve_config(self):
+        resource_types, patterns = resolve_block_config({"types": ["font", "Font", "image", "tracker"],
+                                                         "patterns": ["*ads*"]})
+        # 资源类型按DevTools的请求类型拦截，不再转换为扩展名
+        self.assertEqual(resource_types, ["Font", "Image"])
+        self.assertEqual(patterns, ["*ads*"] + URL_PATTERN_GROUPS["tracker"])
+        # 未知类型当作URL匹配模式
+        self.assertEqual(resolve_block_config(["*.gif"]), ([], ["*.gif"]))
+        self.assertEqual(resolve_block_config(None), ([], []))
+
+    def test_apply(self):
+        driver, interceptor = FakeDriver(), FakeInterceptor()
+        blocker = ResourceBlocker(driver, interceptor)
+        blocker.set_config(*resolve_block_config(["image"]))
+        blocker.apply("tab1")
+        blocker.apply("tab1")
+        self.assertEqual({"tab1": ["Image"]}, interceptor.applied_handles)
+        # 没有URL匹配模式时不发送setBlockedURLs
+        self.assertEqual([], driver.commands)
+
+        blocker.set_config(*resolve_block_config(["*ads*"]))
+        blocker.apply("tab1")
+        self.assertEqual({"tab1": []}, interceptor.applied_handles)
+        self.assertEqual([("Network.enable", {}), ("Network.setBlockedURLs", {"urls": ["*ads*"]})],
+                         driver.commands)
+        # 从未按类型拦截过的标签页不需要连接
+        blocker.apply("tab2")
+        self.assertNotIn("tab2", interceptor.applied_handles)
+
+    def test_statistics(self):
+        stats = ResourceStatistics()
+        stats.on_event("Network.requestWillBeSent", {"requestId": "1", "type": "Image"})
+        stats.on_event("Network.loadingFinished", {"requestId": "1", "encodedDataLength": 1000})
+        stats.on_event("Network.loadingFailed", {"requestId": "2", "type": "Image",
+                                                 "errorText": "net::ERR_BLOCKED_BY_CLIENT"})
+        stats.on_event("Network.loadingFailed", {"requestId": "3", "type": "Font", "blockedReason": "inspector"})
+        stats.on_event("Network.loadingFailed", {"requestId": "4", "type": "Script", "errorText": "net::ERR"})
+        summary = stats.summary()
+        self.assertEqual(summary["loaded_requests"], 1)
+        self.assertEqual(summary["blocked_requests"], 2)
+        # 图片按已加载图片的平均大小估算，字体按默认大小估算
+        self.assertEqual(summary["estimated_saved_bytes"], 1000 + 40 * 1024)
+
+
+if __name__ == "__main__":
+    unittest.main()
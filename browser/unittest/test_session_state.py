@@ -0,0 +1,75 @@
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+import tempfile
+import time
+import unittest
+from browser.browser_automation import BrowserAutomation
+from browser.session_state import SessionState, check_session_state
+
+
+class CdpDriver:
+    """记录CDP命令及其所在的标签页"""
+
+    def __init__(self):
+        self.current_window_handle = "main"
+        self.commands = []
+        self.switch_to = self
+        self.tab_count = 0
+
+    def new_window(self, type_hint):
+        self.tab_count += 1
+        self.current_window_handle = f"tab{self.tab_count}"
+
+    def execute_cdp_cmd(self, cmd, params):
+        self.commands.append((self.current_window_handle, cmd))
+        return {}
+
+
+class CdpBrowser(BrowserAutomation):
+    def __init__(self, driver):
+        self.browser = driver
+        self._current_handle = None
+        self.new_document_scripts = []
+
+
+class TestSessionState(unittest.TestCase):
+    """测试会话状态快照"""
+
+    def test_save_and_load(self):
+        state = SessionState([{"name": "token", "value": "abc", "expires": -1}],
+                             {"https://example.com": {"local": {"user": "1"}, "session": {}}})
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "session.json")
+            state.save(path)
+            loaded = SessionState.load(path)
+        self.assertEqual(loaded.to_dict(), state.to_dict())
+        self.assertIn('"user": "1"', loaded.storage_restore_script())
+
+    def test_check(self):
+        now = time.time()
+        state = SessionState([{"name": "token", "value": "abc", "expires": now + 3600},
+                              {"name": "old", "value": "x", "expires": now - 10}], created_at=now - 100)
+        self.assertTrue(check_session_state(state, ttl=1000, required_cookies=["token"]))
+        self.assertFalse(check_session_state(state, ttl=50))
+        self.assertFalse(check_session_state(state, required_cookies=["old"]))
+        self.assertFalse(check_session_state(None))
+
+
+    def test_restore_injects_storage_into_new_tabs(self):
+        state = SessionState([{"name": "token", "value": "abc", "expires": -1}],
+                             {"https://example.com": {"local": {"user": "1"}, "session": {}}})
+        driver = CdpDriver()
+        browser = CdpBrowser(driver)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "session.json")
+            state.save(path)
+            self.assertTrue(browser.restore_session_state(path))
+        self.assertEqual(browser.new_tab(), "tab1")
+        injected = [handle for handle, cmd in driver.commands if cmd == "Page.addScriptToEvaluateOnNewDocument"]
+        self.assertEqual(injected, ["main", "tab1"])
+
+
+if __name__ == "__main__":
+    unittest.main()
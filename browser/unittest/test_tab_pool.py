@@ -0,0 +1,137 @@
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+import unittest
+from browser.page_tracker import PageTracker, CurrentPageSWitcher
+from browser.tab_pool import TabPool
+from taskflow.block_context import BlockContext
+from taskflow.task_blocks.block import Block, BlockExecuteParams
+from taskflow.task_blocks.detail_page_block import DetailPageBlock
+from taskflow.task_blocks.loop_block import LoopBlock
+from taskflow.task_blocks.loop_type import FixedLoopType
+
+
+class FakePerformanceLog:
+    def poll(self):
+        pass
+
+
+class PoolBrowser:
+    """记录发起导航与等待就绪顺序的浏览器替身"""
+
+    def __init__(self, tab_concurrency=1, hrefs=None):
+        self.current_handle = "list"
+        self.page_tracker = PageTracker()
+        self.performance_log = FakePerformanceLog()
+        self.tab_concurrency = tab_concurrency
+        self.prefetcher = None
+        self.tab_pool = TabPool(self, tab_concurrency)
+        self.hrefs = hrefs or {}
+        self.events = []
+        self.tab_count = 0
+
+    def new_tab(self):
+        self.tab_count += 1
+        self.current_handle = f"tab{self.tab_count}"
+        return self.current_handle
+
+    def close_tab(self, window_handle):
+        self.events.append(("close", window_handle))
+
+    def switch_to_window(self, window_handle):
+        self.current_handle = window_handle
+
+    def start_page_load(self, url):
+        self.events.append(("start", self.current_handle, url))
+        return "origin"
+
+    def wait_for_page_load(self, previous_origin=None, load_strategy=None, ready_when=None):
+        self.events.append(("wait", self.current_handle))
+        return True
+
+    def get_page_version(self):
+        return self.current_handle, 0
+
+    def get_elements_by_xpaths(self, xpaths):
+        return ["element" + xpath for xpath in xpaths]
+
+    def get_item_keys(self, xpaths, key_xpath=""):
+        return [self.hrefs.get(xpath) for xpath in xpaths]
+
+
+class TraceBlock(Block):
+    def __init__(self, context, trace):
+        super().__init__({"name": "提取", "context": context})
+        self.trace = trace
+
+    def execute(self, params):
+        self.trace.append((self.browser.current_handle, params.get_loop_item(self.depth - 1)))
+
+
+class TestTabPool(unittest.TestCase):
+
+    def test_load_all_overlaps_page_loads(self):
+        browser = PoolBrowser()
+        pool = TabPool(browser, 2)
+        visited = []
+        for url, session, ready in pool.load_all(["a", "b", "c"]):
+            self.assertTrue(ready)
+            visited.append((url, browser.current_handle))
+
+        self.assertEqual([("a", "tab1"), ("b", "tab2"), ("c", "tab1")], visited)
+        # b在等待a就绪之前已经开始加载，c在处理b之前复用a的标签页开始加载
+        self.assertEqual([("start", "tab1", "a"), ("start", "tab2", "b"), ("wait", "tab1"),
+                          ("start", "tab1", "c"), ("wait", "tab2"), ("wait", "tab1")], browser.events)
+        self.assertEqual({"size": 2, "tabs": 2, "opened": 2, "loads": 3, "reused": 1}, pool.summary())
+
+    def test_each_tab_has_own_page_tracker(self):
+        browser = PoolBrowser()
+        home_tracker = browser.page_tracker
+        pool = TabPool(browser, 2)
+        first, _ = pool.open("a")
+        browser.page_tracker.track_page_switch(first.handle, CurrentPageSWitcher())
+        pool.release(first)
+        second, _ = pool.open("b")
+        self.assertIsNot(first.page_tracker, second.page_tracker)
+        self.assertIsNone(browser.page_tracker.peek(first.handle))
+
+        pool.restore()
+        self.assertEqual("list", browser.current_handle)
+        self.assertIs(home_tracker, browser.page_tracker)
+        self.assertIsInstance(first.page_tracker.peek(first.handle), CurrentPageSWitcher)
+
+    def test_no_spare_tab(self):
+        browser = PoolBrowser()
+        pool = TabPool(browser, 1)
+        session, _ = pool.open("a")
+        self.assertEqual((None, False), pool.open("b"))
+        pool.release(session)
+        # 已经打开的网址直接复用，不再发起导航
+        self.assertIs(session, pool.open("a")[0])
+        self.assertEqual(1, sum(1 for event in browser.events if event[0] == "start"))
+
+    def test_detail_pages_load_in_parallel(self):
+        browser = PoolBrowser(3, {"//li[1]": "http://example.com/1",
+                                  "//li[2]": "http://example.com/2",
+                                  "//li[3]": "http://example.com/3"})
+        context = BlockContext().set_browser(browser)
+        trace = []
+        loop = LoopBlock({"name": "循环", "context": context})
+        loop.set_loop_type(FixedLoopType("固定循环", ["//li[1]", "//li[2]", "//li[3]"]))
+        detail = DetailPageBlock({"name": "详情页", "context": context})
+        loop.add_inner(detail)
+        detail.add_inner(TraceBlock(context, trace))
+        loop.run(BlockExecuteParams())
+
+        self.assertEqual([("tab1", "http://example.com/1"), ("tab2", "http://example.com/2"),
+                          ("tab3", "http://example.com/3")], trace)
+        starts = [event for event in browser.events if event[0] == "start"]
+        self.assertEqual(3, len(starts))
+        # 三个详情页都在等待第一个页面就绪之前开始加载
+        self.assertEqual(("wait", "tab1"), browser.events[3])
+        self.assertEqual("list", browser.current_handle)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,136 @@
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+import unittest
+from selenium.webdriver.remote.webelement import WebElement
+from browser.browser_automation import (BrowserAutomation, PAGE_STATE_SCRIPT, TRACKED_CLICK_STATE_SCRIPT,
+                                        VIEWPORT_SIZE_SCRIPT)
+from browser.page_tracker import PageTracker
+from browser.wait_conditions import WaitStatistics
+
+
+class CommandDriver:
+    """记录收到的WebDriver命令，click_url不为空时点击后当前标签页导航到该网址"""
+
+    SCRIPT_NAMES = {PAGE_STATE_SCRIPT: "page_state", TRACKED_CLICK_STATE_SCRIPT: "tracked_click_state",
+                    VIEWPORT_SIZE_SCRIPT: "viewport_size"}
+
+    def __init__(self, click_url=None):
+        self.commands = []
+        self.url = "http://example.com/list"
+        self.click_url = click_url
+        self.viewport = [800, 600]
+
+    @property
+    def current_window_handle(self):
+        self.commands.append("current_window_handle")
+        return "main"
+
+    @property
+    def window_handles(self):
+        self.commands.append("window_handles")
+        return ["main"]
+
+    @property
+    def current_url(self):
+        self.commands.append("current_url")
+        return self.url
+
+    def execute_script(self, script, *args):
+        name = self.SCRIPT_NAMES[script]
+        self.commands.append(name)
+        if name == "tracked_click_state":
+            return [WebElement(self, "a"), self.url]
+        if name == "page_state":
+            return [self.url] + self.viewport
+        return self.viewport
+
+    def execute(self, command, params=None):
+        # ActionChains.perform
+        self.commands.append("actions")
+        if self.click_url:
+            self.url = self.click_url
+        return {"value": None}
+
+
+class CommandBrowser(BrowserAutomation):
+    def __init__(self, driver):
+        self.browser = driver
+        self.static_page = None
+        self._current_handle = None
+        self.page_versions = {}
+        self.page_tracker = PageTracker()
+        self.wait_stats = WaitStatistics()
+        self.default_timeout = 1
+        self.poll_interval = 0.01
+        self.click_navigation_timeout = 0.05
+        self.manual_page_load = False
+        self._navigation_tickets = {}
+        self.page_loads = 0
+
+    def wait_for_page_load(self, previous_origin=None, load_strategy=None, ready_when=None):
+        self.page_loads += 1
+        return True
+
+
+class TestTrackedClick(unittest.TestCase):
+    """测试跟踪点击、标签页句柄与视口大小需要的WebDriver命令数"""
+
+    def test_tracked_click_by_xpath(self):
+        driver = CommandDriver(click_url="http://example.com/detail")
+        browser = CommandBrowser(driver)
+        browser.click_element_and_track("//a")
+        # 元素和点击前的网址在一次脚本调用中取得，导航在第一次轮询时被发现
+        self.assertEqual(["tracked_click_state", "current_window_handle", "window_handles", "actions",
+                          "window_handles", "current_url"], driver.commands)
+        self.assertEqual(1, browser.page_loads)
+        self.assertEqual(("main", 1), browser.get_page_version())
+
+    def test_click_without_navigation(self):
+        # 默认只在点击后检查一次，没有导航的点击不需要等待
+        driver = CommandDriver()
+        browser = CommandBrowser(driver)
+        browser.click_element_and_track("//button")
+        self.assertEqual(1, driver.commands.count("current_url"))
+        self.assertEqual(0, browser.page_loads)
+        self.assertEqual(("main", 0), browser.get_page_version())
+        # 要求等待导航时轮询到超时
+        browser.click_element_and_track("//button", wait_navigation=True)
+        self.assertGreater(driver.commands.count("current_url"), 2)
+
+    def test_same_document_navigation(self):
+        driver = CommandDriver(click_url="http://example.com/list#page=2")
+        browser = CommandBrowser(driver)
+        browser.click_element_and_track("//a")
+        # 只改变了#之后的部分，不等待新文档加载，回退时也不需要
+        self.assertEqual(0, browser.page_loads)
+        self.assertTrue(browser.page_tracker.peek("main").same_document)
+
+    def test_current_handle_is_cached(self):
+        driver = CommandDriver(click_url="http://example.com/detail")
+        browser = CommandBrowser(driver)
+        browser.click_element_and_track("//a")
+        browser.click_element_and_track("//a", WebElement(driver, "a"))
+        self.assertEqual(1, driver.commands.count("current_window_handle"))
+        # 已经找到元素时只需要读取点击前的网址
+        self.assertEqual(1, driver.commands.count("tracked_click_state"))
+
+    def test_viewport_in_page_state(self):
+        driver = CommandDriver()
+        browser = CommandBrowser(driver)
+        browser.click_by_coordinates_and_track([0.5, 0.5])
+        self.assertEqual(1, driver.commands.count("page_state"))
+        self.assertNotIn("viewport_size", driver.commands)
+
+    def test_viewport_is_read_again(self):
+        # 窗口大小可能被用户或页面改变，不在两次点击之间缓存
+        driver = CommandDriver()
+        browser = CommandBrowser(driver)
+        self.assertEqual((800, 600), browser.get_viewport_size())
+        driver.viewport = [1024, 768]
+        self.assertEqual((1024, 768), browser.get_viewport_size())
+
+
+if __name__ == '__main__':
+    unittest.main()
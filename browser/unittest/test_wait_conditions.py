@@ -0,0 +1,84 @@
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+import unittest
+from browser.wait_conditions import (
+    WaitStatistics, UrlChangedCondition, NewWindowCondition, JsPredicateCondition,
+    ElementVisibleCondition, DocumentReadyCondition, create_wait_condition, create_wait_conditions, wait_until
+)
+
+
+class FakeDriver:
+    """按调用次数改变状态的WebDriver替身"""
+
+    def __init__(self, ready_after: int = 3):
+        self.ready_after = ready_after
+        self.calls = 0
+        self.window_handles = ["main"]
+        self._url = "https://example.com/list"
+
+    @property
+    def current_url(self):
+        self.calls += 1
+        if self.calls > self.ready_after:
+            return "https://example.com/detail"
+        return self._url
+
+    def execute_script(self, script, *args):
+        self.calls += 1
+        return self.calls > self.ready_after
+
+
+class TestWaitConditions(unittest.TestCase):
+    """测试条件等待"""
+
+    def test_create_from_config(self):
+        condition = create_wait_condition({"type": "element_visible", "xpath": "/html/body", "timeout": 3})
+        self.assertIsInstance(condition, ElementVisibleCondition)
+        self.assertEqual(condition.timeout, 3.0)
+        self.assertEqual(len(create_wait_conditions([{"type": "js", "script": "return 1"},
+                                                     {"type": "new_window"}])), 2)
+        with self.assertRaises(Exception):
+            create_wait_condition({"type": "unknown"})
+
+    def test_poll_until_satisfied(self):
+        stats = WaitStatistics()
+        result = wait_until(FakeDriver(ready_after=3), JsPredicateCondition("return ready"), 5, 0.001, stats)
+        self.assertTrue(result)
+        summary = stats.summary()["js"]
+        self.assertEqual((summary["count"], summary["timeouts"]), (1, 0))
+
+    def test_timeout(self):
+        stats = WaitStatistics()
+        result = wait_until(FakeDriver(ready_after=1000), JsPredicateCondition("return ready"), 0.05, 0.01, stats)
+        self.assertIsNone(result)
+        self.assertEqual(stats.summary()["js"]["timeouts"], 1)
+        self.assertGreaterEqual(stats.total_time(), 0.05)
+
+    def test_url_changed(self):
+        driver = FakeDriver(ready_after=2)
+        result = wait_until(driver, UrlChangedCondition(), 5, 0.001)
+        self.assertEqual(result, "https://example.com/detail")
+
+    def test_new_window(self):
+        driver = FakeDriver()
+        condition = NewWindowCondition(poll_interval=0.001)
+        condition.prepare(driver)
+        driver.window_handles = ["main", "detail"]
+        self.assertEqual(wait_until(driver, condition, 1, 1), ["detail"])
+
+    def test_document_ready_waits_for_new_document(self):
+        states = iter([["1.0", "complete"], ["2.0", "loading"], ["2.0", "interactive"]])
+
+        class DocumentDriver:
+            def execute_script(self, script, *args):
+                return next(states)
+
+        condition = DocumentReadyCondition(["interactive", "complete"], previous_origin="1.0")
+        # 旧文档的complete状态不能算作新页面加载完成
+        self.assertEqual(wait_until(DocumentDriver(), condition, 1, 0.001), "interactive")
+
+
+if __name__ == "__main__":
+    unittest.main()
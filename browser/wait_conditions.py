@@ -0,0 +1,377 @@
+import asyncio
+import logging
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Union
+
+
+# 元素相关条件共用的查找脚本，arguments[0]为XPath
+FIND_ELEMENT_SCRIPT = """
+function findElement(xpath) {
+    try {
+        return document.evaluate(xpath, document, null,
+                                 XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+    } catch (e) {
+        return null;
+    }
+}
+"""
+
+ELEMENT_PRESENT_SCRIPT = FIND_ELEMENT_SCRIPT + """
+return findElement(arguments[0]);
+"""
+
+ELEMENT_VISIBLE_SCRIPT = FIND_ELEMENT_SCRIPT + """
+var el = findElement(arguments[0]);
+if (!el || el.getClientRects().length === 0) return null;
+var style = window.getComputedStyle(el);
+if (style.visibility === 'hidden' || style.display === 'none') return null;
+return el;
+"""
+
+ELEMENT_CLICKABLE_SCRIPT = FIND_ELEMENT_SCRIPT + """
+var el = findElement(arguments[0]);
+if (!el || el.disabled || el.getClientRects().length === 0) return null;
+var style = window.getComputedStyle(el);
+if (style.visibility === 'hidden' || style.display === 'none' || style.pointerEvents === 'none') return null;
+var rect = el.getBoundingClientRect();
+var x = rect.left + rect.width / 2, y = rect.top + rect.height / 2;
+if (x < 0 || y < 0 || x > window.innerWidth || y > window.innerHeight) return el;  // 不在视口内，点击时会先滚动
+var top = document.elementFromPoint(x, y);
+return (top && (top === el || el.contains(top))) ? el : null;
+"""
+
+COUNT_ITEMS_SCRIPT = """
+try {
+    return document.evaluate('count(' + arguments[0] + ')', document, null,
+                             XPathResult.NUMBER_TYPE, null).numberValue;
+} catch (e) {
+    return 0;
+}
+"""
+
+# 返回 [文档标识, readyState]，文档标识在每次加载新文档时都会变化
+DOCUMENT_STATE_SCRIPT = """
+return [String(performance.timeOrigin), document.readyState];
+"""
+
+NETWORK_STATE_SCRIPT = """
+return [document.readyState, performance.getEntriesByType('resource').length];
+"""
+
+
+class WaitCondition(ABC):
+    """
+    等待条件
+
+    check在每次轮询时调用，返回真值表示条件已满足，返回值会作为等待结果
+    """
+    name = ""
+
+    def __init__(self, timeout: Optional[float] = None, poll_interval: Optional[float] = None, **kwargs):
+        self.timeout = float(timeout) if timeout is not None else None
+        self.poll_interval = float(poll_interval) if poll_interval is not None else None
+
+    def prepare(self, browser):
+        """开始等待前调用，用于记录页面的初始状态"""
+        ...
+
+    @abstractmethod
+    def check(self, browser) -> Any:
+        ...
+
+    def __str__(self):
+        return self.name
+
+    __repr__ = __str__
+
+
+class ElementPresentCondition(WaitCondition):
+    name = "element_present"
+
+    def __init__(self, xpath: str, **kwargs):
+        super().__init__(**kwargs)
+        self.xpath = xpath
+
+    def check(self, browser) -> Any:
+        return browser.execute_script(ELEMENT_PRESENT_SCRIPT, self.xpath)
+
+    def __str__(self):
+        return "{}({})".format(self.name, self.xpath)
+
+
+class ElementVisibleCondition(ElementPresentCondition):
+    name = "element_visible"
+
+    def check(self, browser) -> Any:
+        return browser.execute_script(ELEMENT_VISIBLE_SCRIPT, self.xpath)
+
+
+class ElementClickableCondition(ElementPresentCondition):
+    name = "element_clickable"
+
+    def check(self, browser) -> Any:
+        return browser.execute_script(ELEMENT_CLICKABLE_SCRIPT, self.xpath)
+
+
+class ItemCountCondition(WaitCondition):
+    """匹配XPath的元素数量达到count"""
+    name = "item_count"
+
+    def __init__(self, xpath: str, count: int = 1, **kwargs):
+        super().__init__(**kwargs)
+        self.xpath = xpath
+        self.count = int(count)
+
+    def check(self, browser) -> Any:
+        count = int(browser.execute_script(COUNT_ITEMS_SCRIPT, self.xpath))
+        return count if count >= self.count else None
+
+    def __str__(self):
+        return "{}({}>={})".format(self.name, self.xpath, self.count)
+
+
+class DocumentReadyCondition(WaitCondition):
+    """
+    文档加载到指定状态
+
+    previous_origin为导航前文档的标识，不为空时要求已经切换到新文档，
+    避免在新文档提交之前把旧文档的状态误认为加载完成
+    """
+    name = "document_ready"
+
+    def __init__(self, states: Optional[List[str]] = None, previous_origin: Optional[str] = None, **kwargs):
+        super().__init__(**kwargs)
+        self.states = states
+        self.previous_origin = previous_origin
+
+    def check(self, browser) -> Any:
+        origin, ready_state = browser.execute_script(DOCUMENT_STATE_SCRIPT)
+        if self.previous_origin is not None and origin == self.previous_origin:
+            return None
+        if self.states and ready_state not in self.states:
+            return None
+        return ready_state
+
+
+class UrlChangedCondition(WaitCondition):
+    name = "url_changed"
+
+    def __init__(self, from_url: Optional[str] = None, **kwargs):
+        super().__init__(**kwargs)
+        self.from_url = from_url
+
+    def prepare(self, browser):
+        if self.from_url is None:
+            self.from_url = browser.current_url
+
+    def check(self, browser) -> Any:
+        current_url = browser.current_url
+        return current_url if current_url != self.from_url else None
+
+
+class NewWindowCondition(WaitCondition):
+    name = "new_window"
+
+    def __init__(self, handles_count: Optional[int] = None, **kwargs):
+        super().__init__(**kwargs)
+        self.handles_count = handles_count
+
+    def prepare(self, browser):
+        if self.handles_count is None:
+            self.handles_count = len(browser.window_handles)
+
+    def check(self, browser) -> Any:
+        handles = browser.window_handles
+        return handles[self.handles_count:] if len(handles) > self.handles_count else None
+
+
+class NavigationCondition(WaitCondition):
+    """
+    点击等操作触发的导航：打开了新标签页，或者当前标签页的网址发生变化
+    满足时返回 (新标签页句柄, None) 或 (None, 新网址)
+    """
+    name = "navigation"
+
+    def __init__(self, from_url: Optional[str] = None, handles: Optional[List[str]] = None, **kwargs):
+        super().__init__(**kwargs)
+        self.from_url = from_url
+        self.handles = handles
+
+    def prepare(self, browser):
+        if self.handles is None:
+            self.handles = browser.window_handles
+        if self.from_url is None:
+            self.from_url = browser.current_url
+
+    def check(self, browser) -> Any:
+        new_handles = [handle for handle in browser.window_handles if handle not in self.handles]
+        if new_handles:
+            return new_handles[0], None
+        current_url = browser.current_url
+        return (None, current_url) if current_url != self.from_url else None
+
+
+class NetworkIdleCondition(WaitCondition):
+    """页面加载完成，并且在idle_time秒内没有新的资源请求完成"""
+    name = "network_idle"
+
+    def __init__(self, idle_time: float = 0.5, **kwargs):
+        super().__init__(**kwargs)
+        self.idle_time = float(idle_time)
+        self.last_count = -1
+        self.last_change = 0.0
+
+    def prepare(self, browser):
+        self.last_count = -1
+        self.last_change = time.monotonic()
+
+    def check(self, browser) -> Any:
+        ready_state, resource_count = browser.execute_script(NETWORK_STATE_SCRIPT)
+        now = time.monotonic()
+        if resource_count != self.last_count:
+            self.last_count = resource_count
+            self.last_change = now
+            return False
+        return ready_state == "complete" and now - self.last_change >= self.idle_time
+
+
+class JsPredicateCondition(WaitCondition):
+    """自定义JS谓词，脚本需要return一个值，真值表示条件满足"""
+    name = "js"
+
+    def __init__(self, script: str, args: Optional[List[Any]] = None, **kwargs):
+        super().__init__(**kwargs)
+        self.script = script
+        self.args = args or []
+
+    def check(self, browser) -> Any:
+        return browser.execute_script(self.script, *self.args)
+
+
+WaitCondition_MAP: Dict[str, type] = {}
+
+
+def register_wait_condition(condition_type: str, condition_class: type):
+    WaitCondition_MAP[condition_type] = condition_class
+
+
+def create_wait_condition(config: Union[Dict[str, Any], WaitCondition]) -> WaitCondition:
+    """根据配置创建等待条件，如 {"type": "element_visible", "xpath": "...", "timeout": 5}"""
+    if isinstance(config, WaitCondition):
+        return config
+    config = dict(config)
+    condition_type = config.pop("type", None)
+    condition_class = WaitCondition_MAP.get(condition_type)
+    if condition_class is None:
+        raise Exception("Wait condition type {} not found".format(condition_type))
+    return condition_class(**config)
+
+
+def create_wait_conditions(config: Union[None, Dict, List]) -> List[WaitCondition]:
+    if not config:
+        return []
+    if not isinstance(config, list):
+        config = [config]
+    return [create_wait_condition(item) for item in config]
+
+
+register_wait_condition(ElementPresentCondition.name, ElementPresentCondition)
+register_wait_condition(ElementVisibleCondition.name, ElementVisibleCondition)
+register_wait_condition(ElementClickableCondition.name, ElementClickableCondition)
+register_wait_condition(ItemCountCondition.name, ItemCountCondition)
+register_wait_condition(DocumentReadyCondition.name, DocumentReadyCondition)
+register_wait_condition(UrlChangedCondition.name, UrlChangedCondition)
+register_wait_condition(NewWindowCondition.name, NewWindowCondition)
+register_wait_condition(NavigationCondition.name, NavigationCondition)
+register_wait_condition(NetworkIdleCondition.name, NetworkIdleCondition)
+register_wait_condition(JsPredicateCondition.name, JsPredicateCondition)
+
+
+class WaitStatistics:
+    """按条件类型统计实际等待的耗时"""
+
+    def __init__(self):
+        self.records: Dict[str, Dict[str, float]] = {}
+
+    def record(self, name: str, elapsed: float, timed_out: bool):
+        record = self.records.setdefault(name, {"count": 0, "timeouts": 0, "total": 0.0, "max": 0.0})
+        record["count"] += 1
+        record["total"] += elapsed
+        record["max"] = max(record["max"], elapsed)
+        if timed_out:
+            record["timeouts"] += 1
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        result = {}
+        for name, record in self.records.items():
+            result[name] = {
+                **record,
+                "average": record["total"] / record["count"] if record["count"] else 0.0,
+            }
+        return result
+
+    def total_time(self) -> float:
+        return sum(record["total"] for record in self.records.values())
+
+    def clear(self):
+        self.records.clear()
+
+
+def _check_condition(browser, condition: WaitCondition) -> Any:
+    try:
+        return condition.check(browser)
+    except Exception as e:
+        logging.debug(f"等待条件{condition}检查失败 Exception: {e}")
+        return None
+
+
+def _finish_wait(condition: WaitCondition, timeout: float, start: float, result: Any,
+                 stats: Optional[WaitStatistics]) -> Any:
+    elapsed = time.monotonic() - start
+    timed_out = not result
+    if stats is not None:
+        stats.record(condition.name, elapsed, timed_out)
+    if timed_out:
+        logging.debug(f"等待条件{condition}超时({timeout}秒)")
+        return None
+    return result
+
+
+def wait_until(browser, condition: WaitCondition, timeout: float, poll_interval: float,
+               stats: Optional[WaitStatistics] = None) -> Any:
+    """
+    轮询直到条件满足或超时
+    :param browser: WebDriver实例
+    :return: 条件满足时check的返回值，超时返回None
+    """
+    timeout = condition.timeout if condition.timeout is not None else timeout
+    poll_interval = condition.poll_interval if condition.poll_interval is not None else poll_interval
+    start = time.monotonic()
+    deadline = start + timeout
+    condition.prepare(browser)
+    while True:
+        result = _check_condition(browser, condition)
+        if result or time.monotonic() >= deadline:
+            break
+        time.sleep(min(poll_interval, max(deadline - time.monotonic(), 0)))
+    return _finish_wait(condition, timeout, start, result, stats)
+
+
+async def async_wait_until(browser, condition: WaitCondition, timeout: float, poll_interval: float,
+                           run: Callable[..., Awaitable[Any]], stats: Optional[WaitStatistics] = None) -> Any:
+    """
+    wait_until的异步版本，轮询间隔期间让出事件循环
+    :param run: 在浏览器线程中执行同步函数的协程函数，如 AsyncBrowserAutomation.run
+    """
+    timeout = condition.timeout if condition.timeout is not None else timeout
+    poll_interval = condition.poll_interval if condition.poll_interval is not None else poll_interval
+    start = time.monotonic()
+    deadline = start + timeout
+    await run(condition.prepare, browser)
+    while True:
+        result = await run(_check_condition, browser, condition)
+        if result or time.monotonic() >= deadline:
+            break
+        await asyncio.sleep(min(poll_interval, max(deadline - time.monotonic(), 0)))
+    return _finish_wait(condition, timeout, start, result, stats)
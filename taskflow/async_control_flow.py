@@ -0,0 +1,80 @@
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+
+from browser.async_browser_automation import AsyncBrowserAutomation
+from taskflow.block_executor import AsyncBlockExecutor, BlockHook
+from taskflow.crawl_state import flush_crawl_state_stores
+from taskflow.control_flow import ControlFlow
+from taskflow.json_flow_parser import JsonFlowParser
+from taskflow.task_blocks.block import BlockExecuteParams
+
+
+class AsyncControlFlow:
+    """
+    ControlFlow的异步版本
+
+    包装一个已经构建好的ControlFlow，用AsyncBlockExecutor执行其中的块，
+    多个流程以及workflow模块可以在同一个事件循环中并发运行
+    """
+
+    def __init__(self, control_flow: ControlFlow, async_browser: Optional[AsyncBrowserAutomation] = None):
+        self.control_flow = control_flow
+        self.async_browser = async_browser or AsyncBrowserAutomation(control_flow.browser)
+        self.control_flow.get_context().set_async_browser(self.async_browser)
+        self.executor = AsyncBlockExecutor(self.async_browser, [control_flow.block_timing])
+
+    @classmethod
+    async def from_json(cls, json_file_path: str, debug_mode: bool = False) -> "AsyncControlFlow":
+        """在线程中解析流程并启动浏览器，不阻塞事件循环"""
+        control_flow = await asyncio.get_running_loop().run_in_executor(
+            None, JsonFlowParser(json_file_path).parse, debug_mode)
+        return cls(control_flow)
+
+    def add_block_hook(self, hook: BlockHook):
+        self.executor.add_hook(hook)
+        return self
+
+    async def run(self):
+        control_flow = self.control_flow
+        session_config: Optional[Dict[str, Any]] = control_flow.session_config
+        restored = False
+        if session_config:
+            restored = await self.async_browser.restore_session_state(session_config["file"],
+                                                                      session_config.get("ttl"),
+                                                                      session_config.get("required_cookies"))
+        params = BlockExecuteParams()
+        try:
+            await self.executor.run(control_flow.start_block, params)
+        finally:
+            if control_flow.field_saver:
+                # 与块的数据写入在同一个线程中串行执行
+                await self.async_browser.run(control_flow.field_saver.close)
+            await self.async_browser.run(flush_crawl_state_stores)
+        if session_config and not restored and session_config.get("export_on_finish", True):
+            await self.async_browser.export_session_state(session_config["file"])
+        logging.info(f"运行指标: {await self.async_browser.get_metrics()}")
+        logging.info(f"耗时最多的块: {control_flow.block_timing.summary(10)}")
+
+    async def close(self):
+        await self.async_browser.quit()
+
+    @staticmethod
+    async def run_all(flows: List["AsyncControlFlow"], close: bool = True) -> List[Any]:
+        """
+        并发运行多个流程
+        :return: 每个流程的异常，成功时为None
+        """
+
+        async def run_one(flow: AsyncControlFlow):
+            try:
+                await flow.run()
+            finally:
+                if close:
+                    await flow.close()
+
+        results = await asyncio.gather(*[run_one(flow) for flow in flows], return_exceptions=True)
+        for result in results:
+            if isinstance(result, BaseException):
+                logging.error(f"流程运行失败: {result}")
+        return [result if isinstance(result, BaseException) else None for result in results]
@@ -7,6 +7,7 @@ from taskflow.variable_system import Variable, VariableManager, VariableScope, V
 class BlockContext:
     def __init__(self):
         self.browser: Optional[BrowserAutomation] = None
+        self.async_browser = None  # AsyncBrowserAutomation，异步流程中由AsyncBlock使用
         self._debug_mode = False  # 调试模式标志
         self.variable_manager = VariableManager()  # 变量管理器
 
@@ -14,6 +15,10 @@ class BlockContext:
         self.browser = browser
         return self
 
+    def set_async_browser(self, async_browser):
+        self.async_browser = async_browser
+        return self
+
     def set_debug_mode(self, debug_mode: bool):
         """设置调试模式开关"""
         self._debug_mode = debug_mode
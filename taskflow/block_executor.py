@@ -0,0 +1,234 @@
+import logging
+import time
+from typing import Any, Dict, Generator, List, Optional, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from browser.async_browser_automation import AsyncBrowserAutomation
+    from taskflow.task_blocks.block import Block, BlockExecuteParams
+
+
+class BlockHook:
+    """执行器钩子，在每个块开始和结束时调用"""
+
+    def before_block(self, block: 'Block', params: 'BlockExecuteParams'):
+        ...
+
+    def after_block(self, block: 'Block', params: 'BlockExecuteParams', elapsed: float):
+        """
+        :param elapsed: 块从开始到结束的耗时（秒），包括内部块
+        """
+        ...
+
+
+class BlockTimingHook(BlockHook):
+    """按块统计执行次数与耗时"""
+
+    def __init__(self):
+        self.timings: Dict[str, Dict[str, float]] = {}
+
+    def after_block(self, block: 'Block', params: 'BlockExecuteParams', elapsed: float):
+        key = "{}[{}]".format(type(block).__name__, block.name)
+        timing = self.timings.setdefault(key, {"count": 0, "total": 0.0, "max": 0.0})
+        timing["count"] += 1
+        timing["total"] += elapsed
+        timing["max"] = max(timing["max"], elapsed)
+
+    def summary(self, top: Optional[int] = None) -> List[Dict[str, Any]]:
+        """按总耗时从高到低排列"""
+        items = sorted(self.timings.items(), key=lambda item: item[1]["total"], reverse=True)
+        return [{"block": key, **timing} for key, timing in items[:top]]
+
+
+class _ChainFrame:
+    """沿next_block执行的一条块链"""
+
+    def __init__(self, block: Optional['Block']):
+        self.block = block
+        self.started = False  # 当前块是否已经开始执行
+        self.start_time = 0.0
+        self.result: Any = None
+
+
+class _StepsFrame:
+    """复合块的execute_steps生成器，每yield一个内部块就执行以它开头的块链"""
+
+    def __init__(self, steps: Generator, block: Optional['Block'] = None):
+        self.steps = steps
+        self.block = block
+
+
+class BlockExecutor:
+    """
+    用显式栈执行块，取代 Block.run 末尾递归调用 next_block.run 以及复合块递归调用 inner.run 的方式，
+    Python调用栈的深度不再随块链的长度和嵌套层数增长
+    """
+
+    def __init__(self, hooks: Optional[List[BlockHook]] = None):
+        self.hooks: List[BlockHook] = list(hooks or [])
+
+    def add_hook(self, hook: BlockHook):
+        self.hooks.append(hook)
+        return self
+
+    def run(self, block: 'Block', params: 'BlockExecuteParams'):
+        stack: List[Any] = [_ChainFrame(block)]
+        error: Optional[BaseException] = None
+        while stack:
+            frame = stack[-1]
+            if isinstance(frame, _StepsFrame):
+                try:
+                    if error is not None:
+                        # 内部块抛出的异常交给复合块处理，与递归调用时的行为一致
+                        exception, error = error, None
+                        child = frame.steps.throw(exception)
+                    else:
+                        child = next(frame.steps)
+                except StopIteration as stop:
+                    stack.pop()
+                    stack[-1].result = stop.value
+                    continue
+                except BaseException as e:
+                    stack.pop()
+                    error = e
+                    continue
+                stack.append(_ChainFrame(child))
+                continue
+
+            if error is not None:
+                stack.pop()
+                continue
+            try:
+                if frame.started:
+                    self._finish_block(frame, params)
+                    frame.block = frame.block.next_block
+                    frame.started = False
+                if frame.block is None:
+                    stack.pop()
+                    continue
+                self._start_block(frame, params)
+                steps = frame.block.execute_steps(params)
+            except BaseException as e:
+                stack.pop()
+                error = e
+                continue
+            stack.append(_StepsFrame(steps))
+
+        if error is not None:
+            raise error
+
+    def _start_block(self, frame: _ChainFrame, params: 'BlockExecuteParams'):
+        frame.started = True
+        frame.result = None
+        frame.start_time = time.perf_counter()
+        for hook in self.hooks:
+            hook.before_block(frame.block, params)
+        frame.block.prepare_run(params)
+
+    def _finish_block(self, frame: _ChainFrame, params: 'BlockExecuteParams'):
+        frame.block.finish_run(params, frame.result)
+        elapsed = time.perf_counter() - frame.start_time
+        for hook in self.hooks:
+            hook.after_block(frame.block, params, elapsed)
+        logging.debug(f"{frame.block.name} 耗时 {elapsed:.3f} 秒")
+
+
+def _start_sync_block(block: 'Block', params: 'BlockExecuteParams') -> Generator:
+    block.prepare_run(params)
+    return block.execute_steps(params)
+
+
+def _advance_sync_steps(steps: Generator, error: Optional[BaseException]) -> Tuple[bool, Any]:
+    # StopIteration不能跨线程传递，转换为 (是否结束, 内部块或返回值)
+    try:
+        child = steps.throw(error) if error is not None else next(steps)
+    except StopIteration as stop:
+        return True, stop.value
+    return False, child
+
+
+class AsyncBlockExecutor:
+    """
+    BlockExecutor的异步版本
+
+    AsyncBlock的生命周期协程直接在事件循环中执行；同步块作为适配对象，
+    它的每一步(准备、推进execute_steps、结束)都放到浏览器线程中执行，不会阻塞事件循环
+    """
+
+    def __init__(self, async_browser: 'AsyncBrowserAutomation', hooks: Optional[List[BlockHook]] = None):
+        self.async_browser = async_browser
+        self.hooks: List[BlockHook] = list(hooks or [])
+
+    def add_hook(self, hook: BlockHook):
+        self.hooks.append(hook)
+        return self
+
+    async def run(self, block: 'Block', params: 'BlockExecuteParams'):
+        stack: List[Any] = [_ChainFrame(block)]
+        error: Optional[BaseException] = None
+        while stack:
+            frame = stack[-1]
+            if isinstance(frame, _StepsFrame):
+                pending, error = error, None
+                try:
+                    finished, value = await self._advance(frame, pending)
+                except BaseException as e:
+                    stack.pop()
+                    error = e
+                    continue
+                if finished:
+                    stack.pop()
+                    stack[-1].result = value
+                else:
+                    stack.append(_ChainFrame(value))
+                continue
+
+            if error is not None:
+                stack.pop()
+                continue
+            try:
+                if frame.started:
+                    await self._finish_block(frame, params)
+                    frame.block = frame.block.next_block
+                    frame.started = False
+                if frame.block is None:
+                    stack.pop()
+                    continue
+                steps = await self._start_block(frame, params)
+            except BaseException as e:
+                stack.pop()
+                error = e
+                continue
+            stack.append(_StepsFrame(steps, frame.block))
+
+        if error is not None:
+            raise error
+
+    async def _advance(self, frame: _StepsFrame, error: Optional[BaseException]) -> Tuple[bool, Any]:
+        if not frame.block.is_async:
+            return await self.async_browser.run(_advance_sync_steps, frame.steps, error)
+        try:
+            child = await (frame.steps.athrow(error) if error is not None else frame.steps.__anext__())
+        except StopAsyncIteration:
+            return True, frame.block.execute_result
+        return False, child
+
+    async def _start_block(self, frame: _ChainFrame, params: 'BlockExecuteParams'):
+        frame.started = True
+        frame.result = None
+        frame.start_time = time.perf_counter()
+        for hook in self.hooks:
+            hook.before_block(frame.block, params)
+        if frame.block.is_async:
+            await frame.block.prepare_run_async(params)
+            return frame.block.execute_steps_async(params)
+        return await self.async_browser.run(_start_sync_block, frame.block, params)
+
+    async def _finish_block(self, frame: _ChainFrame, params: 'BlockExecuteParams'):
+        if frame.block.is_async:
+            await frame.block.finish_run_async(params, frame.result)
+        else:
+            await self.async_browser.run(frame.block.finish_run, params, frame.result)
+        elapsed = time.perf_counter() - frame.start_time
+        for hook in self.hooks:
+            hook.after_block(frame.block, params, elapsed)
+        logging.debug(f"{frame.block.name} 耗时 {elapsed:.3f} 秒")
@@ -1,18 +1,27 @@
-from typing import Optional
+import logging
+from typing import Optional, Union, Dict, Any
 
 from browser.browser_automation import BrowserAutomation
 from taskflow.block_context import BlockContext
+from taskflow.block_executor import BlockExecutor, BlockHook, BlockTimingHook
+from taskflow.crawl_state import flush_crawl_state_stores
 from taskflow.field_saver import FieldSaver
 from taskflow.task_blocks.block import Block, BlockExecuteParams
 
 
 class ControlFlow:
 
-    def __init__(self):
-        self.browser = BrowserAutomation()
+    def __init__(self, launch_profile: Union[None, str, Dict[str, Any]] = None):
+        """
+        :param launch_profile: 浏览器启动配置名称或配置，如 "headless-fast"
+        """
+        self.browser = BrowserAutomation(launch_profile)
         self.block_context: Optional[BlockContext] = BlockContext()
         self.start_block: Optional[Block] = None
         self.field_saver = None
+        self.session_config: Optional[Dict[str, Any]] = None
+        self.block_timing = BlockTimingHook()  # 每个块的执行次数与耗时
+        self.executor = BlockExecutor([self.block_timing])
         self.block_context.set_browser(self.browser)
 
     def set_start_block(self, block: Block):
@@ -24,14 +33,45 @@ class ControlFlow:
     def get_field_saver(self) -> FieldSaver:
         return self.field_saver
 
+    def set_session_config(self, session_config: Optional[Dict[str, Any]]):
+        """
+        设置会话快照，如 {"file": "session.json", "ttl": 86400, "required_cookies": ["token"]}
+        运行前尝试恢复快照，快照无效时在运行结束后导出新的快照
+        """
+        if session_config is not None:
+            if not isinstance(session_config, dict) or not session_config.get("file"):
+                raise Exception("Session config must be a dict with a file, got {}".format(session_config))
+        self.session_config = session_config
+
+    def add_block_hook(self, hook: BlockHook):
+        """添加块执行钩子，如统计耗时或记录执行轨迹"""
+        self.executor.add_hook(hook)
+        return self
+
     def enable_debug_mode(self, enable: bool = True):
         """启用或禁用调试模式"""
         self.block_context.set_debug_mode(enable)
         return self
 
     def run(self):
+        restored = False
+        if self.session_config:
+            restored = self.browser.restore_session_state(self.session_config["file"],
+                                                          self.session_config.get("ttl"),
+                                                          self.session_config.get("required_cookies"))
         params = BlockExecuteParams()
-        self.start_block.run(params)
+        try:
+            self.start_block.run(params, self.executor)
+        finally:
+            # 流式导出时即使运行中断，已经提取的数据也要落盘
+            if self.field_saver:
+                self.field_saver.close()
+            # 数据落盘后记录的循环项
+            flush_crawl_state_stores()
+        if self.session_config and not restored and self.session_config.get("export_on_finish", True):
+            self.browser.export_session_state(self.session_config["file"])
+        logging.info(f"运行指标: {self.browser.get_metrics()}")
+        logging.info(f"耗时最多的块: {self.block_timing.summary(10)}")
 
     def get_context(self) -> BlockContext:
         return self.block_context
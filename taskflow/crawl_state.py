@@ -0,0 +1,138 @@
+import atexit
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+
+def make_item_key(value: Any, use_hash: bool = False) -> str:
+    """
+    生成循环项的标识
+    :param value: 网址、字段值或者整个循环项
+    :param use_hash: 是否使用内容哈希，适合比较长或者没有唯一字段的循环项
+    """
+    if not isinstance(value, str):
+        value = json.dumps(value, ensure_ascii=False, sort_keys=True, default=str)
+    value = value.strip()
+    if use_hash:
+        return hashlib.sha1(value.encode("utf-8")).hexdigest()
+    return value
+
+
+class CrawlStateStore:
+    """
+    增量采集状态，记录已经采集过的循环项
+
+    使用本地SQLite数据库(WAL模式)，写入先缓存在内存中，每batch_size条批量提交一次；
+    同一个数据库可以保存多个循环的状态，用scope区分
+    """
+
+    def __init__(self, path: str, batch_size: int = 100):
+        self.path = path
+        self.batch_size = batch_size
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS crawl_items (
+                scope TEXT NOT NULL,
+                item_key TEXT NOT NULL,
+                first_seen REAL NOT NULL,
+                last_seen REAL NOT NULL,
+                PRIMARY KEY (scope, item_key)
+            )
+        """)
+        self.connection.commit()
+        self.known: Dict[str, Dict[str, float]] = {}  # scope -> {item_key: last_seen}
+        self.pending: List[Tuple[str, str, float]] = []
+        self.stats: Dict[str, Dict[str, int]] = {}
+
+    def _load_scope(self, scope: str) -> Dict[str, float]:
+        # 每个scope只查询一次数据库，之后的判断都在内存中完成
+        if scope not in self.known:
+            rows = self.connection.execute("SELECT item_key, last_seen FROM crawl_items WHERE scope = ?", (scope,))
+            self.known[scope] = dict(rows)
+            self.stats[scope] = {"new": 0, "skipped": 0, "revisited": 0}
+        return self.known[scope]
+
+    def is_crawled(self, scope: str, item_key: str, ttl: Optional[float] = None) -> bool:
+        """
+        循环项是否已经采集过且没有超过新鲜度，不计入统计，用于决定预取哪些循环项
+        :param ttl: 新鲜度，超过ttl秒的循环项重新采集，为空时永不重新采集
+        """
+        last_seen = self._load_scope(scope).get(item_key)
+        if last_seen is None:
+            return False
+        return ttl is None or time.time() - last_seen <= ttl
+
+    def should_skip(self, scope: str, item_key: str, ttl: Optional[float] = None) -> bool:
+        """
+        判断循环项是否已经采集过，跳过时计入统计
+        :param ttl: 新鲜度，超过ttl秒的循环项重新采集，为空时永不重新采集
+        """
+        if not self.is_crawled(scope, item_key, ttl):
+            return False
+        self.stats[scope]["skipped"] += 1
+        return True
+
+    def mark_done(self, scope: str, item_key: str):
+        """循环项采集完成后记录"""
+        known = self._load_scope(scope)
+        self.stats[scope]["revisited" if item_key in known else "new"] += 1
+        now = time.time()
+        known[item_key] = now
+        self.pending.append((scope, item_key, now))
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+        with self.connection:
+            self.connection.executemany("""
+                INSERT INTO crawl_items (scope, item_key, first_seen, last_seen) VALUES (?, ?, ?, ?)
+                ON CONFLICT (scope, item_key) DO UPDATE SET last_seen = excluded.last_seen
+            """, [(scope, item_key, now, now) for scope, item_key, now in self.pending])
+        self.pending = []
+
+    def get_stats(self, scope: str) -> Dict[str, int]:
+        return dict(self.stats.get(scope, {"new": 0, "skipped": 0, "revisited": 0}))
+
+    def reset_stats(self, scope: str):
+        if scope in self.stats:
+            self.stats[scope] = {"new": 0, "skipped": 0, "revisited": 0}
+
+    def close(self):
+        self.flush()
+        self.connection.close()
+        STORE_MAP.pop(os.path.abspath(self.path), None)
+
+
+STORE_MAP: Dict[str, CrawlStateStore] = {}
+
+
+def get_crawl_state_store(path: str) -> CrawlStateStore:
+    """同一个数据库文件在进程内共用一个连接"""
+    key = os.path.abspath(path)
+    store = STORE_MAP.get(key)
+    if store is None:
+        store = STORE_MAP[key] = CrawlStateStore(path)
+        logging.info(f"加载增量采集状态{path}")
+    return store
+
+
+def flush_crawl_state_stores():
+    """
+    提交所有数据库中缓存的写入。循环项在数据落盘后才记录，可能发生在循环结束之后(如整体导出在结束块中保存)，
+    因此在运行结束以及进程退出时统一提交
+    """
+    for store in list(STORE_MAP.values()):
+        store.flush()
+
+
+atexit.register(flush_crawl_state_stores)
@@ -1,5 +1,10 @@
+import csv
+import json
+import logging
+import os
+import time
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Optional
 import openpyxl
 
 from taskflow.task_blocks.extract_data_block import Field
@@ -8,25 +13,14 @@ from taskflow.task_blocks.extract_data_block import Field
 class DataExporter(ABC):
 
     @abstractmethod
-    def export(self, fields_order: List[str], fields: Dict[str, Any]) -> None:
+    def export(self, fields_order: List[str], rows: Iterable[List[Any]]) -> None:
+        """
+        :param fields_order: 表头
+        :param rows: 与表头对齐的数据行，通常是RecordStore.iter_rows返回的迭代器
+        """
         ...
 
 
-def get_value(value_list: List[Any],
-              index: int) -> Any:
-    if index >= len(value_list):
-        return value_list[-1]
-    return value_list[index]
-
-
-def construct_data_row(fields_order: List[str], fields: Dict[str, Any], index: int) -> List[Any]:
-    data_row = []
-    for field_name in fields_order:
-        field = fields[field_name]
-        data_row.append(get_value(field, index))
-    return data_row
-
-
 class ExcelExporter(DataExporter):
 
     def __init__(self, name: str):
@@ -34,15 +28,218 @@ class ExcelExporter(DataExporter):
         self.workbook = openpyxl.Workbook()
         self.sheet = self.workbook.active
 
-    def export(self, fields_order: List[str], fields: Dict[str, Any]) -> None:
-        values = fields.values()
-        if len(values) == 0:
-            return
-        size = max([len(value) for value in values])
+    def export(self, fields_order: List[str], rows: Iterable[List[Any]]) -> None:
         self.sheet.append(fields_order)
-
-        for i in range(size):
-            data_row = construct_data_row(fields_order, fields, i)
+        for data_row in rows:
             self.sheet.append(data_row)
 
         self.workbook.save(self.name)
+
+
+class StreamingExporter(DataExporter):
+    """
+    流式导出器：每条记录完成后立即追加，每flush_rows行或flush_interval秒刷新到磁盘一次，
+    文件超过max_file_size字节后滚动到新文件，内存占用与数据量无关
+    """
+
+    durable_flush = True  # flush后数据是否已经落盘
+
+    def __init__(self, name: str, flush_rows: int = 100, flush_interval: float = 5.0,
+                 max_file_size: Optional[int] = None):
+        self.name = name
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self.max_file_size = max_file_size
+        self.fields_order: List[str] = []
+        self.part = 0  # 当前文件的序号，滚动后递增
+        self.file_path: Optional[str] = None
+        self.unflushed_rows = 0
+        self.last_flush = time.monotonic()
+        self.row_count = 0
+        self.persisted_rows = 0  # 已经落盘的行数
+
+    def part_path(self, part: int) -> str:
+        """第一个文件使用原文件名，之后为 name_1.ext、name_2.ext ..."""
+        if part == 0:
+            return self.name
+        root, ext = os.path.splitext(self.name)
+        return "{}_{}{}".format(root, part, ext)
+
+    @abstractmethod
+    def _open(self, file_path: str) -> None:
+        ...
+
+    @abstractmethod
+    def _write(self, row: List[Any]) -> None:
+        ...
+
+    @abstractmethod
+    def _flush(self) -> None:
+        ...
+
+    @abstractmethod
+    def _close(self) -> None:
+        ...
+
+    def _file_size(self) -> int:
+        return os.path.getsize(self.file_path) if self.file_path and os.path.exists(self.file_path) else 0
+
+    def _rotate(self):
+        self._close()
+        self.persisted_rows = self.row_count
+        self.part += 1
+        self.file_path = None
+
+    def write_row(self, fields_order: List[str], row: Dict[str, Any]) -> None:
+        if self.file_path is not None and self.fields_order != fields_order and not self.supports_new_fields():
+            # 出现了新字段，表头需要改变，滚动到新文件
+            self._rotate()
+        self.fields_order = list(fields_order)
+        if self.file_path is None:
+            self.file_path = self.part_path(self.part)
+            self._open(self.file_path)
+
+        self._write([row.get(field_name) for field_name in self.fields_order])
+        self.row_count += 1
+        self.unflushed_rows += 1
+        if self.unflushed_rows >= self.flush_rows or time.monotonic() - self.last_flush >= self.flush_interval:
+            self.flush()
+
+    def supports_new_fields(self) -> bool:
+        """每行自带字段名的格式可以直接增加字段"""
+        return False
+
+    def flush(self) -> None:
+        if self.file_path is None:
+            return
+        self._flush()
+        if self.durable_flush:
+            self.persisted_rows = self.row_count
+        self.unflushed_rows = 0
+        self.last_flush = time.monotonic()
+        if self.max_file_size and self._file_size() >= self.max_file_size:
+            self._rotate()
+
+    def close(self) -> None:
+        if self.file_path is None:
+            return
+        self._flush()
+        self._close()
+        self.persisted_rows = self.row_count
+        self.file_path = None
+        logging.info(f"已导出{self.row_count}条数据到{self.part_path(self.part)}")
+
+    def export(self, fields_order: List[str], rows: Iterable[List[Any]]) -> None:
+        # 兼容整体导出
+        for data_row in rows:
+            self.write_row(fields_order, dict(zip(fields_order, data_row)))
+        self.close()
+
+
+class CsvExporter(StreamingExporter):
+
+    def __init__(self, name: str, encoding: str = "utf-8-sig", **kwargs):
+        super().__init__(name, **kwargs)
+        self.encoding = encoding  # 默认带BOM，Excel打开时中文不会乱码
+        self.file = None
+        self.writer = None
+
+    def _open(self, file_path: str) -> None:
+        self.file = open(file_path, "w", newline="", encoding=self.encoding)
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(self.fields_order)
+
+    def _write(self, row: List[Any]) -> None:
+        self.writer.writerow(row)
+
+    def _flush(self) -> None:
+        self.file.flush()
+
+    def _close(self) -> None:
+        if self.file:
+            self.file.close()
+            self.file = None
+
+
+class JsonLinesExporter(StreamingExporter):
+
+    def __init__(self, name: str, **kwargs):
+        super().__init__(name, **kwargs)
+        self.file = None
+
+    def supports_new_fields(self) -> bool:
+        return True
+
+    def _open(self, file_path: str) -> None:
+        self.file = open(file_path, "w", encoding="utf-8")
+
+    def _write(self, row: List[Any]) -> None:
+        self.file.write(json.dumps(dict(zip(self.fields_order, row)), ensure_ascii=False, default=str))
+        self.file.write("\n")
+
+    def _flush(self) -> None:
+        self.file.flush()
+
+    def _close(self) -> None:
+        if self.file:
+            self.file.close()
+            self.file = None
+
+
+class XlsxStreamExporter(StreamingExporter):
+    """
+    openpyxl只写模式，行数据写入临时文件而不是保存在内存中。
+    只写模式的工作簿只能在关闭时保存一次，因此用max_rows控制滚动来落盘，flush只是释放内存
+    """
+
+    durable_flush = False
+
+    def __init__(self, name: str, max_rows: Optional[int] = 100000, **kwargs):
+        super().__init__(name, **kwargs)
+        self.max_rows = max_rows
+        self.workbook = None
+        self.sheet = None
+        self.part_rows = 0
+
+    def _open(self, file_path: str) -> None:
+        self.workbook = openpyxl.Workbook(write_only=True)
+        self.sheet = self.workbook.create_sheet()
+        self.sheet.append(self.fields_order)
+        self.part_rows = 0
+
+    def _write(self, row: List[Any]) -> None:
+        self.sheet.append(row)
+        self.part_rows += 1
+
+    def _flush(self) -> None:
+        if self.max_rows and self.part_rows >= self.max_rows:
+            self._rotate()
+
+    def _close(self) -> None:
+        if self.workbook:
+            self.workbook.save(self.file_path)
+            self.workbook = None
+            self.sheet = None
+
+
+EXPORTER_MAP = {}
+
+
+def register_exporter(exporter_type: str, exporter_class: type):
+    EXPORTER_MAP[exporter_type] = exporter_class
+
+
+def create_exporter(config: Dict[str, Any]) -> DataExporter:
+    """根据配置创建导出器，如 {"type": "csv", "name": "data.csv", "flush_rows": 100}"""
+    config = dict(config)
+    exporter_type = config.pop("type", "excel")
+    exporter_class = EXPORTER_MAP.get(exporter_type)
+    if exporter_class is None:
+        raise Exception("Exporter type {} not found".format(exporter_type))
+    return exporter_class(**config)
+
+
+register_exporter("excel", ExcelExporter)
+register_exporter("csv", CsvExporter)
+register_exporter("jsonl", JsonLinesExporter)
+register_exporter("xlsx_stream", XlsxStreamExporter)
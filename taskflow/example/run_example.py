@@ -9,7 +9,9 @@ from taskflow.field_saver import FieldSaver
 from taskflow.json_flow_parser import JsonFlowParser
 from taskflow.task_blocks.block import BlockFactory
 from taskflow.task_blocks.click_element_block import ClickElementBlock
+from taskflow.task_blocks.collect_links_block import CollectLinksBlock
 from taskflow.task_blocks.condition_block import ExecJavaScriptConditionBlock, PassConditionBlock
+from taskflow.task_blocks.detail_page_block import DetailPageBlock
 from taskflow.data_exporter import ExcelExporter
 from taskflow.task_blocks.end_block import EndBlock
 from taskflow.task_blocks.extract_data_block import ExtractDataBlock, Field, TextFieldExtractor
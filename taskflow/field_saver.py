@@ -1,26 +1,154 @@
-from typing import List, Dict, Any, Optional
+from collections import deque
+from typing import Callable, Deque, List, Dict, Any, Optional, Set, Tuple
 
-from taskflow.data_exporter import DataExporter
+from taskflow.data_exporter import DataExporter, StreamingExporter
+from taskflow.record_store import RecordStore
 from taskflow.task_blocks.extract_data_block import ExtractDataBlock, Field
 
 
+def after_all_persisted(savers: List["FieldSaver"], callback: Callable[[], None]):
+    """给定的FieldSaver中目前已经提取的数据都落盘后调用callback，没有未落盘的数据时立即调用"""
+    savers = [saver for saver in savers if saver.persisted < saver.extracted]
+    if not savers:
+        callback()
+        return
+    remaining = [len(savers)]
+
+    def on_persisted():
+        remaining[0] -= 1
+        if remaining[0] == 0:
+            callback()
+
+    for saver in savers:
+        saver.after_persisted(on_persisted)
+
+
 class FieldSaver(ExtractDataBlock.Delegate):
 
-    def __init__(self):
-        self.fields_order: List[str] = []  # 控制字段的顺序
-        self.fields: Dict[str, List[Any]] = {}  # 保存具体的数据
+    def __init__(self, memory_rows: int = 50000):
+        """
+        :param memory_rows: 整体导出时内存中最多保存的行数，超过后溢出到临时文件
+        """
+        self.fields_index: Dict[str, None] = {}  # 控制字段的顺序，用字典实现O(1)查找
+        self.record_store = RecordStore(memory_rows)  # 整体导出时保存已经完成的记录
         self.fields_dict: Dict[str, Any] = {}  # 给 js 用的，获取循环项的值，field['name']
         self.data_exporter: Optional[DataExporter] = None
+        # 正在拼装的记录：外层循环提取的字段作为上下文，与内层循环的每一次提取拼成一行
+        self.pending_row: Optional[Dict[str, Any]] = None
+        self.pending_fields: Set[str] = set()  # 本行中新提取的字段
+        self.pending_depth = 0
+        self.field_depths: Dict[str, int] = {}  # 字段所在提取块的循环深度
+        # 落盘进度：按提取次数计，已经输出但尚未落盘的行记录 (导出器中的行数, 该行包含的提取次数)
+        self.extracted = 0
+        self.persisted = 0
+        self.pending_extracted = 0  # 正在拼装的行包含的提取次数
+        self.unpersisted_rows: Deque[Tuple[int, int]] = deque()
+        self.persist_callbacks: Deque[Tuple[int, Callable[[], None]]] = deque()
+
+    @property
+    def streaming(self) -> bool:
+        return isinstance(self.data_exporter, StreamingExporter)
+
+    @property
+    def fields_order(self) -> List[str]:
+        return list(self.fields_index)
 
     def on_field_extracted(self, field: Field):
         if field.need_export:
-            if field.name not in self.fields_order:
-                self.fields_order.append(field.name)
-            self.fields.setdefault(field.name, []).append(field.get_value())
+            self.fields_index.setdefault(field.name)
         self.fields_dict[field.name] = field.value
 
+    def on_fields_extracted(self, block: ExtractDataBlock, fields: List[Field]):
+        values = {field.name: field.get_value() for field in fields if field.need_export}
+        if not values:
+            return
+
+        self.extracted += 1
+        depth = block.depth
+        for name in values:
+            self.field_depths[name] = depth
+        if self.pending_row is not None:
+            if depth > self.pending_depth:
+                # 进入了内层循环，当前行作为上下文，由内层的每一次提取输出
+                row = dict(self.pending_row)
+            elif depth < self.pending_depth or self.pending_fields & values.keys():
+                # 回到外层，或者同一字段再次提取，说明上一行已经完成，只保留更外层的字段作为上下文
+                self._emit_pending_row()
+                row = {name: value for name, value in self.pending_row.items()
+                       if self.field_depths.get(name, 0) < depth}
+            else:
+                # 同一层的多个提取块，合并到同一行
+                self.pending_row.update(values)
+                self.pending_fields.update(values.keys())
+                self.pending_extracted = self.extracted
+                return
+        else:
+            row = {}
+        row.update(values)
+        self.pending_row = row
+        self.pending_fields = set(values.keys())
+        self.pending_depth = depth
+        self.pending_extracted = self.extracted
+
+    def _emit_pending_row(self):
+        if self.pending_row is not None and self.pending_fields:
+            if self.streaming:
+                self.data_exporter.write_row(self.fields_order, self.pending_row)
+                self.unpersisted_rows.append((self.data_exporter.row_count, self.pending_extracted))
+                # 写入时可能触发了导出器自己的定时刷新
+                self._update_persisted()
+            else:
+                self.record_store.append(self.pending_row)
+            self.pending_fields = set()
+
+    def after_persisted(self, callback: Callable[[], None]):
+        """
+        目前已经提取的数据全部落盘后调用callback，已经落盘时立即调用
+        用于循环在循环项的数据落盘后才记录增量采集状态，运行中断时没有落盘的循环项下次会重新采集
+        """
+        if self.persisted >= self.extracted:
+            callback()
+        else:
+            self.persist_callbacks.append((self.extracted, callback))
+
+    def _update_persisted(self):
+        if self.streaming:
+            persisted_rows = self.data_exporter.persisted_rows
+            while self.unpersisted_rows and self.unpersisted_rows[0][0] <= persisted_rows:
+                self.persisted = self.unpersisted_rows.popleft()[1]
+        else:
+            # 整体导出在save时一次性写入全部数据
+            self.persisted = self.extracted
+        while self.persist_callbacks and self.persist_callbacks[0][0] <= self.persisted:
+            self.persist_callbacks.popleft()[1]()
+
+    def end_row(self):
+        """没有循环嵌套、每次提取就是一条完整记录时，立即输出当前行"""
+        self._emit_pending_row()
+        self.pending_row = None
+
     def set_data_exporter(self, data_exporter: DataExporter):
         self.data_exporter = data_exporter
 
+    def flush(self):
+        """流式导出时把已经完成的数据刷新到磁盘"""
+        if self.streaming:
+            self.data_exporter.flush()
+            self._update_persisted()
+
+    def close(self):
+        """输出最后一行并关闭导出器"""
+        if self.streaming:
+            self._emit_pending_row()
+            self.data_exporter.close()
+            self._update_persisted()
+        self.record_store.close()
+
     def save(self):
-        self.data_exporter.export(self.fields_order, self.fields)
+        if self.streaming:
+            self.close()
+            return
+        self._emit_pending_row()
+        if len(self.record_store) > 0:
+            self.data_exporter.export(self.fields_order, self.record_store.iter_rows(self.fields_order))
+        self._update_persisted()
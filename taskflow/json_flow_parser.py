@@ -1,47 +1,96 @@
 import json
 from typing import Optional, List, Any, Dict
 
+from browser.politeness import configure_politeness
 from taskflow.control_flow import ControlFlow
 from taskflow.field_saver import FieldSaver
 from taskflow.task_blocks.block import BlockFactory, Block
-from taskflow.data_exporter import ExcelExporter
+from taskflow.data_exporter import ExcelExporter, create_exporter
 from taskflow.task_blocks.end_block import EndBlock
 from taskflow.variable_system import VariableType, VariableScope
 
 
 class JsonFlowParser:
+    # 需要读取网络事件的块，流程中出现时浏览器启动时开启性能日志
+    NETWORK_LOG_BLOCKS = ("NetworkCaptureBlock",)
 
     def __init__(self, json_file_path: str):
         self.json_file_path = json_file_path
 
     def parse(self, debug_mode: bool = False) -> ControlFlow:
-        data_exporter = ExcelExporter(name='data.xlsx')
+        with open(self.json_file_path, "r", encoding="utf-8") as f:
+            json_data = json.load(f)
+
+        # 数据导出配置，如 "export": {"type": "csv", "name": "data.csv", "flush_rows": 100}
+        if isinstance(json_data, dict) and "export" in json_data:
+            data_exporter = create_exporter(json_data["export"])
+        else:
+            data_exporter = ExcelExporter(name='data.xlsx')
         field_saver = FieldSaver()
         field_saver.set_data_exporter(data_exporter)
 
-        control_flow = ControlFlow()
+        # 浏览器启动配置，如 "browser": "headless-fast" 或 {"profile": "headless-fast", "window_size": [1280, 800]}
+        browser_config = json_data.get("browser") if isinstance(json_data, dict) else None
+        json_flow = json_data.get("flow", json_data) if isinstance(json_data, dict) else json_data
+        if not isinstance(json_flow, list):
+            json_flow = [json_flow]
+        launch_options = {}
+        if self.needs_network_log(json_flow):
+            launch_options["network_log"] = True
+        # 页面单独的加载策略、预取与多个标签页并行加载需要驱动不等待页面加载
+        if self.needs_manual_page_load(json_flow) or \
+                (isinstance(json_data, dict) and int(json_data.get("tabs", 1)) > 1):
+            launch_options["manual_page_load"] = True
+        if launch_options:
+            browser_config = dict(browser_config) if isinstance(browser_config, dict) else {"profile": browser_config}
+            for key, value in launch_options.items():
+                browser_config.setdefault(key, value)
+        control_flow = ControlFlow(browser_config)
         control_flow.set_field_saver(field_saver)
         if debug_mode:
             control_flow.enable_debug_mode(True)
         
-        block_factory = BlockFactory(control_flow.get_context())
+        if isinstance(json_data, dict) and "session" in json_data:
+            control_flow.set_session_config(json_data["session"])
 
-        with open(self.json_file_path, "r", encoding="utf-8") as f:
-            json_data = json.load(f)
+        # 按站点限速，如 "politeness": {"rate": 1, "max_concurrency": 2, "hosts": {"example.com": {"rate": 0.2}}}，
+        # 所有浏览器会话与静态下载共用
+        if isinstance(json_data, dict) and "politeness" in json_data:
+            configure_politeness(json_data["politeness"])
+
+        # 标签页并发数，如 "tabs": 4，详情页在同一个浏览器的多个标签页中并行加载
+        if isinstance(json_data, dict) and "tabs" in json_data:
+            control_flow.browser.set_tab_concurrency(json_data["tabs"])
+
+        block_factory = BlockFactory(control_flow.get_context())
             
         # 处理全局变量定义
         if "variables" in json_data:
             self.parse_variables(json_data["variables"], control_flow)
             
         # 处理流程块
-        json_flow = json_data.get("flow", json_data)
-        if not isinstance(json_flow, list):
-            json_flow = [json_flow]
-            
         self.parse_block(json_flow, None, control_flow, block_factory)
 
         return control_flow
         
+    def needs_network_log(self, json_flow: List[Any]) -> bool:
+        """流程中是否有资源拦截或响应捕获，拦截统计与捕获的响应都来自性能日志"""
+        for json_config in json_flow:
+            if json_config.get("block") in self.NETWORK_LOG_BLOCKS or json_config.get("block_resources"):
+                return True
+            if self.needs_network_log(json_config.get("inners") or []):
+                return True
+        return False
+
+    def needs_manual_page_load(self, json_flow: List[Any]) -> bool:
+        """流程中是否有块设置了加载策略或预取"""
+        for json_config in json_flow:
+            if json_config.get("load_strategy") or json_config.get("prefetch"):
+                return True
+            if self.needs_manual_page_load(json_config.get("inners") or []):
+                return True
+        return False
+
     def parse_variables(self, variables_config: Dict, control_flow: ControlFlow):
         """解析变量配置"""
         context = control_flow.get_context()
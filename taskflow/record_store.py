@@ -0,0 +1,156 @@
+import logging
+import os
+import pickle
+import tempfile
+from array import array
+from typing import Any, Dict, Iterator, List, Optional
+
+
+class Column:
+    """
+    单个字段的数据列
+
+    整数、浮点数和布尔值保存在array中，其他值保存在list中；
+    出现类型不一致的值时升级为list。缺失值用nulls掩码标记，保证各列按行对齐
+    """
+
+    TYPE_CODES = {bool: "b", int: "q", float: "d"}
+
+    def __init__(self, size: int = 0):
+        self.type_code: Optional[str] = None  # None表示还没有确定类型，"object"表示普通list
+        self.values: Any = []
+        self.nulls = bytearray()
+        self.pad(size)
+
+    def _promote(self):
+        if self.type_code == "b":
+            self.values = [bool(value) for value in self.values]
+        else:
+            self.values = self.values.tolist()
+        self.type_code = "object"
+
+    def append(self, value: Any):
+        if value is None:
+            self.values.append(0 if isinstance(self.values, array) else None)
+            self.nulls.append(1)
+            return
+        if self.type_code is None:
+            type_code = self.TYPE_CODES.get(type(value))
+            if type_code is not None:
+                # 之前只有缺失值，用0占位
+                self.values = array(type_code, [0] * len(self.nulls))
+            self.type_code = type_code or "object"
+        elif self.type_code != "object" and self.TYPE_CODES.get(type(value)) != self.type_code:
+            self._promote()
+        if self.type_code == "q" and not -2 ** 63 <= value < 2 ** 63:
+            self._promote()
+        self.values.append(value)
+        self.nulls.append(0)
+
+    def pad(self, size: int):
+        """补齐缺失值到指定行数"""
+        while len(self.nulls) < size:
+            self.append(None)
+
+    def get(self, index: int) -> Any:
+        if self.nulls[index]:
+            return None
+        value = self.values[index]
+        return bool(value) if self.type_code == "b" else value
+
+    def to_list(self) -> List[Any]:
+        return [self.get(i) for i in range(len(self.nulls))]
+
+    def __len__(self):
+        return len(self.nulls)
+
+
+class RecordStore:
+    """
+    按行写入、按列保存的记录集
+
+    每次ExtractDataBlock执行产生的数据作为完整的一行写入，缺失字段为空值而不是沿用上一行的值；
+    内存中的行数超过memory_rows后整体写入临时文件，导出时通过iter_rows依次读取
+    """
+
+    def __init__(self, memory_rows: int = 50000, spill_dir: Optional[str] = None):
+        self.memory_rows = memory_rows
+        self.spill_dir = spill_dir
+        self.columns: Dict[str, Column] = {}  # 字典保持插入顺序，同时提供O(1)的字段查找
+        self.size = 0  # 内存中的行数
+        self.spilled_rows = 0
+        self.spill_path: Optional[str] = None
+
+    @property
+    def fields_order(self) -> List[str]:
+        return list(self.columns)
+
+    def add_field(self, name: str):
+        if name not in self.columns:
+            self.columns[name] = Column(self.size)
+
+    def append(self, row: Dict[str, Any]):
+        for name in row:
+            self.add_field(name)
+        for name, column in self.columns.items():
+            column.append(row.get(name))
+        self.size += 1
+        if self.memory_rows and self.size >= self.memory_rows:
+            self._spill()
+
+    def _spill(self):
+        """把内存中的行作为一个块追加到临时文件"""
+        if self.spill_path is None:
+            fd, self.spill_path = tempfile.mkstemp(prefix="records_", suffix=".spill", dir=self.spill_dir)
+            os.close(fd)
+            logging.info(f"记录数超过{self.memory_rows}，溢出到临时文件{self.spill_path}")
+        chunk = {name: column.to_list() for name, column in self.columns.items()}
+        with open(self.spill_path, "ab") as f:
+            pickle.dump((self.size, chunk), f, protocol=pickle.HIGHEST_PROTOCOL)
+        self.spilled_rows += self.size
+        self.size = 0
+        for name in self.columns:
+            self.columns[name] = Column()
+
+    def _iter_spilled_chunks(self) -> Iterator[Any]:
+        if self.spill_path is None:
+            return
+        with open(self.spill_path, "rb") as f:
+            while True:
+                try:
+                    yield pickle.load(f)
+                except EOFError:
+                    return
+
+    def iter_rows(self, fields_order: Optional[List[str]] = None) -> Iterator[List[Any]]:
+        """
+        按行遍历，直接从列中取值，不复制整个数据集
+        :param fields_order: 输出的字段顺序，默认为字段的出现顺序
+        """
+        fields_order = fields_order or self.fields_order
+        for size, chunk in self._iter_spilled_chunks():
+            # 溢出之后才出现的字段在之前的块中没有数据
+            columns = [chunk.get(name) for name in fields_order]
+            for i in range(size):
+                yield [column[i] if column is not None else None for column in columns]
+        columns = [self.columns.get(name) for name in fields_order]
+        for i in range(self.size):
+            yield [column.get(i) if column is not None else None for column in columns]
+
+    def __len__(self):
+        return self.spilled_rows + self.size
+
+    def clear(self):
+        self.columns = {name: Column() for name in self.columns}
+        self.size = 0
+        self.spilled_rows = 0
+        self.close()
+
+    def close(self):
+        """删除溢出文件"""
+        if self.spill_path is not None:
+            try:
+                os.remove(self.spill_path)
+            except OSError:
+                pass
+            self.spill_path = None
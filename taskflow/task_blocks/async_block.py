@@ -0,0 +1,61 @@
+import asyncio
+import logging
+from typing import Any, AsyncGenerator
+
+from browser.async_browser_automation import AsyncBrowserAutomation
+from taskflow.task_blocks.block import Block, BlockExecuteParams
+
+
+class AsyncBlock(Block):
+    """
+    异步块：before_execute/execute/after_execute都是协程，等待时让出事件循环
+
+    浏览器调用通过 self.async_browser 完成；包含内部块的异步块重写execute_steps_async，
+    每yield一个内部块，执行器就执行以它开头的块链
+    """
+    is_async = True
+
+    @property
+    def async_browser(self) -> AsyncBrowserAutomation:
+        return self.context.async_browser
+
+    def run(self, params: BlockExecuteParams, executor=None):
+        raise Exception("AsyncBlock {} must be run by AsyncBlockExecutor".format(self.name))
+
+    async def prepare_run_async(self, params: BlockExecuteParams):
+        logging.debug("Run async block: {}".format(self.name))
+
+        wait_time = params.get_variable("wait_time")
+        if wait_time and float(wait_time) > 0 and not self.breakpoint:
+            logging.info(f"等待 {wait_time} 秒后继续执行...")
+            await asyncio.sleep(float(wait_time))
+
+        for condition in self.wait_conditions:
+            if await self.async_browser.wait_until(condition) is None:
+                logging.warning(f"{self.name} 等待条件 {condition} 超时，继续执行")
+
+        if self.context.is_debug_mode() and self.breakpoint:
+            logging.info(f"遇到断点: {self.name}，按F9继续...")
+            await asyncio.get_running_loop().run_in_executor(None, self.wait_for_continue)
+
+        await self.before_execute_async(params)
+
+    async def execute_steps_async(self, params: BlockExecuteParams) -> AsyncGenerator[Block, None]:
+        """执行结果保存在execute_result中"""
+        self.execute_result = await self.execute_async(params)
+        return
+        yield
+
+    async def finish_run_async(self, params: BlockExecuteParams, execute_result: Any):
+        self.execute_result = execute_result
+        params.exec_result = self.execute_result
+        await self.after_execute_async(params)
+
+    async def before_execute_async(self, params: BlockExecuteParams):
+        ...
+
+    async def execute_async(self, params: BlockExecuteParams) -> Any:
+        raise NotImplementedError("Please implement [execute_async] method")
+
+    async def after_execute_async(self, params: BlockExecuteParams):
+        ...
@@ -1,12 +1,15 @@
 import logging
 from abc import abstractmethod, ABC
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Generator, List, Optional
 import keyboard
 import time
 
 from selenium.webdriver.remote.webelement import WebElement
 
+from browser.element_cache import ElementScope
+from browser.wait_conditions import WaitCondition, create_wait_conditions
 from taskflow.block_context import BlockContext, BrowserAutomation
+from taskflow.block_executor import BlockExecutor
 from taskflow.variable_system import VariableType, VariableScope
 
 
@@ -33,6 +36,8 @@ class BlockExecuteParams:
         self.loop_item_element_list[depth] = loop_item_element
 
     def get_loop_item_element(self, depth: int) -> Optional[WebElement]:
+        if depth >= len(self.loop_item_element_list):
+            return None
         return self.loop_item_element_list[depth]
 
     def set_variable(self, name: str, value: Any):
@@ -90,6 +95,8 @@ class BlockBase(ABC):
 
 
 class Block(BlockBase):
+    is_async = False  # 异步块的生命周期方法是协程，只能由AsyncBlockExecutor执行
+
     def __init__(self, params: Dict[str, Any]):
         self.name = params.get("name", "")
         self.xpath = params.get("xpath", '')
@@ -102,6 +109,7 @@ class Block(BlockBase):
         self.execute_result: Any = None
         self.breakpoint = False  # 是否在此块设置断点
         self.wait_time = 0  # 执行前等待时间（秒）
+        self.wait_conditions: List[WaitCondition] = create_wait_conditions(params.get("wait_for"))  # 执行前等待的条件
         self.input_variables: List[str] = []  # 输入变量列表
         self.output_variables: List[str] = []  # 输出变量列表
 
@@ -109,14 +117,23 @@ class Block(BlockBase):
     def browser(self) -> BrowserAutomation:
         return self.context.browser
 
-    def run(self, params: BlockExecuteParams):
+    def run(self, params: BlockExecuteParams, executor: Optional['BlockExecutor'] = None):
+        """执行本块以及之后的块链"""
+        (executor or BlockExecutor()).run(self, params)
+
+    def prepare_run(self, params: BlockExecuteParams):
         logging.debug("Run block: {}".format(self.name))
         
         # 执行前等待
         wait_time = params.get_variable("wait_time")
-        if wait_time and int(wait_time) > 0 and not self.breakpoint:
+        if wait_time and float(wait_time) > 0 and not self.breakpoint:
             logging.info(f"等待 {wait_time} 秒后继续执行...")
-            time.sleep(int(wait_time))
+            time.sleep(float(wait_time))
+
+        # 等待执行条件满足
+        for condition in self.wait_conditions:
+            if self.browser.wait_until(condition) is None:
+                logging.warning(f"{self.name} 等待条件 {condition} 超时，继续执行")
         
         # 处理断点
         if self.context.is_debug_mode():
@@ -133,8 +150,17 @@ class Block(BlockBase):
         #         logging.warning(f"输入变量 {var_name} 未定义")
             
         self.before_execute(params)
-        
-        self.execute_result = self.execute(params)
+
+    def execute_steps(self, params: BlockExecuteParams) -> Generator['Block', None, Any]:
+        """
+        执行器调用的执行入口，返回值作为execute_result
+        包含内部块的块重写此方法，每yield一个内部块，执行器就执行以它开头的块链，执行完再回到这里
+        """
+        return self.execute(params)
+        yield
+
+    def finish_run(self, params: BlockExecuteParams, execute_result: Any):
+        self.execute_result = execute_result
         params.exec_result = self.execute_result
         
         # 处理输出变量
@@ -145,9 +171,6 @@ class Block(BlockBase):
         #         logging.warning(f"输出变量 {var_name} 未在execute中设置")
                 
         self.after_execute(params)
-
-        if self.next_block:
-            self.next_block.run(params)
             
     def wait_for_continue(self):
         """等待用户按下F9键继续执行"""
@@ -163,6 +186,11 @@ class Block(BlockBase):
         """设置执行前等待时间（秒）"""
         self.wait_time = wait_time
         return self
+
+    def set_wait_conditions(self, wait_for):
+        """设置执行前等待的条件，接受单个条件配置或配置列表"""
+        self.wait_conditions = create_wait_conditions(wait_for)
+        return self
         
     def add_input_variable(self, var_name: str):
         """添加输入变量"""
@@ -214,6 +242,18 @@ class Block(BlockBase):
     def set_use_relative_xpath(self, use_relative_xpath: bool):
         self.use_relative_xpath = use_relative_xpath
 
+    def get_loop_item_scope(self, params: BlockExecuteParams) -> ElementScope:
+        """外层循环项的元素作用域"""
+        return ElementScope(params.get_loop_item(self.depth - 1), params.get_loop_item_element(self.depth - 1))
+
+    def find_relative_element(self, params: BlockExecuteParams, relative_xpath: str,
+                              timeout: Optional[float] = None) -> Optional[WebElement]:
+        """在外层循环项元素内查找相对XPath对应的元素，重新解析的循环项元素写回执行参数，供之后的块复用"""
+        scope = self.get_loop_item_scope(params)
+        element = self.browser.get_element_in_scope(scope, relative_xpath, timeout)
+        params.set_loop_item_element(self.depth - 1, scope.element)
+        return element
+
     def set_next_block(self, next_block: BlockBase) -> BlockBase:
         self.next_block = next_block
         next_block.depth = self.depth
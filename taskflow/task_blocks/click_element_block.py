@@ -1,5 +1,7 @@
 import logging
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
+
+from selenium.webdriver.remote.webelement import WebElement
 
 from taskflow.task_blocks.block import Block, BlockExecuteParams, register_block
 
@@ -11,18 +13,20 @@ class ClickElementBlock(Block):
         self.xpath = params.get("xpath", '')
         self.coordinates = params.get("coordinates", None)
         self.need_track = params.get("need_track", True)
+        # 跟踪时是否等待导航发生，默认只在点击后检查一次，没有导航的点击不需要额外等待
+        self.wait_navigation = params.get("wait_navigation", False)
         self.use_relative_xpath = params.get("use_relative_xpath", False)
         self.use_coordinates = self.coordinates is not None
 
-    def click(self, xpath: str):
+    def click(self, xpath: str, element: Optional[WebElement] = None):
         if self.need_track:
-            self.browser.click_element_and_track(xpath)
+            self.browser.click_element_and_track(xpath, element, self.wait_navigation)
         else:
-            self.browser.click_element(xpath)
+            self.browser.click_element(xpath, element)
             
     def click_by_coordinates(self, coordinates: List[float]):
         if self.need_track:
-            self.browser.click_by_coordinates_and_track(coordinates)
+            self.browser.click_by_coordinates_and_track(coordinates, self.wait_navigation)
         else:
             self.browser.click_by_coordinates(coordinates)
 
@@ -42,8 +46,9 @@ class ClickElementBlock(Block):
         elif self.use_relative_xpath:
             # 使用相对XPath点击
             if params.in_loop:
+                # 在缓存的循环项元素内查找，不从文档根节点重新求值整个XPath
                 loop_xpath = params.get_loop_item(self.depth - 1)
-                self.click(loop_xpath + self.xpath)
+                self.click(loop_xpath + self.xpath, self.find_relative_element(params, self.xpath))
             else:
                 logging.error("relative xpath is not supported in no-loop context")
         else:
@@ -58,6 +63,11 @@ class ClickElementBlock(Block):
         else:
             self.use_relative_xpath = False
             
+        wait_navigation = config.get("wait_navigation", self.wait_navigation)
+        if isinstance(wait_navigation, str):
+            wait_navigation = wait_navigation.lower() == "true"
+        self.wait_navigation = wait_navigation
+
         # 处理坐标选项
         coordinates = config.get("coordinates", None)
         if coordinates:
@@ -0,0 +1,35 @@
+import logging
+from typing import Dict, Any
+
+from browser.browser_automation import DEFAULT_HREF_XPATH
+from taskflow.task_blocks.block import Block, BlockExecuteParams, register_block
+
+
+class CollectLinksBlock(Block):
+    """
+    在一次脚本调用中收集列表中所有循环项的链接，输出到变量links
+
+    之后按网址循环打开详情页，不需要在列表页中逐个点击、跟踪和回退
+    """
+
+    def __init__(self, params: Dict[str, Any]):
+        super().__init__(params)
+        self.item_xpath = params.get("item_xpath", "")  # 可匹配所有列表项的XPath
+        self.href_xpath = params.get("href_xpath") or DEFAULT_HREF_XPATH
+        self.unique = params.get("unique", True)  # 是否去除重复的链接
+
+    def load_from_config(self, control_flow, config: Dict):
+        self.item_xpath = config.get("item_xpath", "")
+        self.href_xpath = config.get("href_xpath") or DEFAULT_HREF_XPATH
+        self.unique = config.get("unique", True)
+
+    def execute(self, params: BlockExecuteParams) -> Any:
+        links = [link for link in self.browser.collect_links(self.item_xpath, self.href_xpath) if link]
+        if self.unique:
+            links = list(dict.fromkeys(links))
+        logging.info(f"{self.name} 收集到{len(links)}个链接")
+        params.set_variable("links", links)
+        return links
+
+
+register_block("CollectLinksBlock", CollectLinksBlock)
@@ -13,9 +13,9 @@ class ConditionBlock(Block):
     def should_run(self, params: BlockExecuteParams) -> bool:
         ...
 
-    def execute(self, params: BlockExecuteParams):
+    def execute_steps(self, params: BlockExecuteParams):
         for inner in self.inners:
-            inner.run(params)
+            yield inner
 
 
 class PassConditionBlock(ConditionBlock):
@@ -37,12 +37,12 @@ class ExecJavaScriptConditionBlock(ConditionBlock):
         loop_item_element = params.get_loop_item_element(self.depth - 1)
         return self.browser.execute_script(self.js_script, loop_item_element)
 
-    def execute(self, params: BlockExecuteParams):
+    def execute_steps(self, params: BlockExecuteParams):
         loop_item_element = params.get_loop_item_element(self.depth - 1)
         params.set_loop_item_element(self.depth, loop_item_element)
         params.set_loop_item(self.depth, params.get_loop_item(self.depth - 1))
         for inner in self.inners:
-            inner.run(params)
+            yield inner
 
 
 register_block("PassConditionBlock", PassConditionBlock)
@@ -0,0 +1,121 @@
+import logging
+from typing import Dict, Any, List, Optional
+
+from browser.browser_automation import DEFAULT_HREF_XPATH
+from browser.element_cache import PageValueCache
+from taskflow.task_blocks.block import Block, BlockExecuteParams, register_block
+from taskflow.task_blocks.loop_type import XPathLoopType
+
+
+class DetailPageBlock(Block):
+    """
+    打开循环项的详情页，代替 点击(need_track) -> 提取 -> 回退 的组合
+
+    所有待处理循环项的链接在一次脚本调用中求出，详情页在可复用的标签页中直接打开，
+    内部块在详情页中执行，执行完切换回列表页所在的标签页，列表页不会回退或重新渲染
+
+    浏览器的标签池并发数(tab_concurrency)大于1时，详情页在标签池中打开，
+    打开当前循环项的同时为之后的循环项发起导航，多个详情页并行加载；
+    所在的循环设置了预取(prefetch)时由循环负责预取，详情页在预取的标签页中打开
+    """
+
+    def __init__(self, params: Dict[str, Any]):
+        super().__init__(params)
+        # 链接相对循环项的XPath，默认为循环项本身或其中第一个带href的元素
+        self.href_xpath = params.get("href_xpath") or DEFAULT_HREF_XPATH
+        self.load_strategy = params.get("load_strategy", None)
+        self.ready_when = params.get("ready_when", None)
+        if isinstance(self.ready_when, str):
+            self.ready_when = {"type": "element_present", "xpath": self.ready_when} if self.ready_when else None
+        self.href_cache: Optional[PageValueCache] = None  # 批量求出的循环项链接
+
+    def load_from_config(self, control_flow, config: Dict):
+        self.href_xpath = config.get("href_xpath") or DEFAULT_HREF_XPATH
+
+    def _load_hrefs(self, xpaths: List[str]) -> Dict[str, Optional[str]]:
+        return dict(zip(xpaths, self.browser.get_item_keys(xpaths, self.href_xpath)))
+
+    def _get_url(self, loop_item: Any, xpaths: List[str]) -> Optional[str]:
+        if not isinstance(loop_item, str) or not loop_item:
+            return None
+        if loop_item.startswith("http://") or loop_item.startswith("https://"):
+            # 循环项本身就是网址
+            return loop_item
+        if self.href_cache is None:
+            self.href_cache = PageValueCache(self.browser)
+        return self.href_cache.get(loop_item,
+                                   lambda: self._load_hrefs(xpaths or [loop_item]),
+                                   lambda xpath: self._load_hrefs([xpath])[xpath])
+
+    @staticmethod
+    def _pending_items(params: BlockExecuteParams) -> List[Any]:
+        """当前循环项及之后待处理的循环项"""
+        loop_type = getattr(params.current_loop, "loop_type", None)
+        if isinstance(loop_type, XPathLoopType):
+            return loop_type.pending_xpaths()
+        return []
+
+    def get_detail_url(self, params: BlockExecuteParams) -> Optional[str]:
+        return self._get_url(params.get_loop_item(self.depth - 1), self._pending_items(params))
+
+    def get_upcoming_urls(self, params: BlockExecuteParams, count: int) -> List[str]:
+        """当前循环项之后count个循环项的链接，需要在列表页所在的标签页中调用"""
+        pending = self._pending_items(params)
+        loop_item = params.get_loop_item(self.depth - 1)
+        if loop_item not in pending:
+            return []
+        will_skip = getattr(params.current_loop, "will_skip", None)
+        urls = []
+        for item in pending[pending.index(loop_item) + 1:]:
+            if len(urls) >= count:
+                break
+            if will_skip is not None and will_skip(item):
+                # 之后会被跳过的循环项不需要提前打开
+                continue
+            url = self._get_url(item, pending)
+            if url:
+                urls.append(url)
+        return urls
+
+    def execute_steps(self, params: BlockExecuteParams):
+        if not params.in_loop:
+            logging.error(f"{self.name} 只能在循环中使用")
+            return
+        url = self.get_detail_url(params)
+        if not url:
+            logging.warning(f"{self.name} 循环项{params.get_loop_item(self.depth - 1)}没有链接，跳过")
+            return
+
+        list_handle = self.browser.current_handle
+        session = None
+        prefetcher = self.browser.prefetcher
+        if prefetcher is None and self.browser.tab_concurrency > 1:
+            pool = self.browser.tab_pool
+            upcoming = self.get_upcoming_urls(params, pool.size - 1)
+            session, ready = pool.open(url, self.load_strategy, self.ready_when, upcoming)
+            if session is None:
+                logging.warning(f"{self.name} 标签池没有可用的标签页，在详情页标签页中打开 {url}")
+                self.browser.switch_to_window(list_handle)
+        if session is None:
+            ready = self.browser.open_detail_page(url, self.load_strategy, self.ready_when)
+        if not ready:
+            logging.warning(f"{self.name} 打开 {url} 时页面没有在超时时间内就绪")
+        # 详情页中没有循环项元素，内部块使用绝对XPath
+        params.set_loop_item(self.depth, url)
+        params.set_loop_item_element(self.depth, None)
+        try:
+            if self.inners:
+                # 内部块已经用next_block串成链，执行第一个即执行整条链
+                yield self.inners[0]
+        finally:
+            if session is not None:
+                self.browser.tab_pool.release(session)
+                self.browser.tab_pool.restore()
+            elif prefetcher is not None:
+                prefetcher.release()
+            if self.browser.current_handle != list_handle:
+                self.browser.switch_to_window(list_handle)
+        return url
+
+
+register_block("DetailPageBlock", DetailPageBlock)
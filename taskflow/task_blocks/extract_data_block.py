@@ -2,12 +2,20 @@ import logging
 from abc import abstractmethod, ABC
 from typing import Optional, List, Any, Dict
 
+from selenium.webdriver.remote.webelement import WebElement
+
+from browser.dom_snapshot import DomSnapshot
+from browser.element_cache import ElementScope
 from taskflow.block_context import BlockContext
 
 from taskflow.task_blocks.block import Block, BlockExecuteParams, register_block
 
 
 class FieldExtractor(ABC):
+    # 是否支持在DOM快照上本地提取
+    supports_snapshot = False
+    # 是否支持直接从元素提取，支持时相对XPath在循环项元素内查找
+    supports_element = False
 
     def __init__(self, name: str):
         self.name = name
@@ -16,6 +24,16 @@ class FieldExtractor(ABC):
     def extract(self, xpath: str, context: BlockContext) -> Any:
         ...
 
+    def extract_from_snapshot(self, xpath: str, snapshot: DomSnapshot) -> Any:
+        raise NotImplementedError(
+            "Please implement [{}] method".format("extract_from_snapshot")
+        )
+
+    def extract_from_element(self, element: Optional[WebElement], context: BlockContext) -> Any:
+        raise NotImplementedError(
+            "Please implement [{}] method".format("extract_from_element")
+        )
+
 
 Extractor_MAP = {}
 
@@ -25,9 +43,18 @@ def register_extractor(extractor_type: str, extractor_class: FieldExtractor):
 
 
 class TextFieldExtractor(FieldExtractor):
+    supports_snapshot = True
+    supports_element = True
+
     def extract(self, xpath: str, context: BlockContext) -> Any:
         return context.browser.get_element_text(xpath)
 
+    def extract_from_element(self, element: Optional[WebElement], context: BlockContext) -> Any:
+        return element.text if element is not None else None
+
+    def extract_from_snapshot(self, xpath: str, snapshot: DomSnapshot) -> Any:
+        return snapshot.get_text(xpath)
+
 
 register_extractor("TextFieldExtractor", TextFieldExtractor)
 
@@ -42,6 +69,7 @@ class Field:
         self.default_value = None
         self.extractor: Optional[FieldExtractor] = None
         self.need_export = True
+        self.required = False  # 静态模式下必需字段为空时改用浏览器重新提取
 
     def set_extractor(self, extractor: FieldExtractor):
         self.extractor = extractor
@@ -54,6 +82,26 @@ class Field:
         logging.debug(self)
         return self.value
 
+    def extract_in_scope(self, scope: ElementScope, context: BlockContext) -> Any:
+        """在循环项元素内查找字段元素后提取"""
+        if self.extractor.supports_element:
+            element = context.browser.get_element_in_scope(scope, self.xpath, context.browser.optional_timeout)
+            self.value = self.extractor.extract_from_element(element, context)
+        else:
+            self.value = self.extractor.extract(scope.absolute_xpath(self.xpath), context)
+        logging.debug(self)
+        return self.value
+
+    def extract_from_snapshot(self, absolute_path: str, snapshot: DomSnapshot, context: BlockContext) -> Any:
+        xpath = "{}{}".format(absolute_path, self.xpath)
+        # 快照容器之外的XPath在浏览器中查询
+        if self.extractor.supports_snapshot and snapshot.covers(xpath):
+            self.value = self.extractor.extract_from_snapshot(xpath, snapshot)
+        else:
+            self.value = self.extractor.extract(xpath, context)
+        logging.debug(self)
+        return self.value
+
     def get_value(self) -> Optional[Any]:
         return self.value or self.default_value
 
@@ -63,6 +111,7 @@ class Field:
         self.type = config.get("type")
         self.default_value = config.get("default_value")
         self.need_export = config.get("need_export", True)
+        self.required = config.get("required", False)
         extractor = config.get("field_extractor")
         self.extractor = Extractor_MAP[extractor](extractor)
 
@@ -86,30 +135,49 @@ class ExtractDataBlock(Block):
         def on_field_extracted(self, field: Field):
             ...
 
+        def on_fields_extracted(self, block: 'ExtractDataBlock', fields: List[Field]):
+            """一次执行的所有字段提取完成后调用"""
+            ...
+
     def __init__(self, params: Dict[str, Any]):
         super().__init__(params)
         self.fields: List[Dict] = params.get("fields", [])
         self.field_list: List[Field] = []
         self.export_to_excel: bool = params.get("export_to_excel", False)
+        self.use_snapshot: bool = params.get("use_snapshot", False)  # 是否基于DOM快照在本地提取
+        self.snapshot_root_xpath: str = params.get("snapshot_root_xpath", "")  # 快照容器，为空时对整页做快照
         self.field_observer: Optional[ExtractDataBlock.Delegate] = None
 
     def set_field_observer(self, field_observer: 'ExtractDataBlock.Delegate'):
         self.field_observer = field_observer
 
+    def set_use_snapshot(self, use_snapshot: bool, snapshot_root_xpath: str = ""):
+        self.use_snapshot = use_snapshot
+        self.snapshot_root_xpath = snapshot_root_xpath
+
     def execute(self, params: BlockExecuteParams):
         loop_item_xpath = ""
+        scope: Optional[ElementScope] = None
         if self.use_relative_xpath:
             loop_item_xpath = params.get_loop_item(self.depth - 1)
-            
-        # 提取所有字段
-        results = []
+            if params.in_loop:
+                scope = self.get_loop_item_scope(params)
+
+        static_page = self.browser.static_page
+        results = self._extract_fields(loop_item_xpath, self.use_snapshot or static_page is not None, scope)
+        if static_page is not None and self._missing_required_fields():
+            # 静态下载的页面缺少数据，可能需要JS渲染，改为在浏览器中打开后重新提取
+            logging.info(f"{self.name} 静态页面缺少必需字段，改为在浏览器中提取")
+            self.browser.ensure_live_page()
+            results = self._extract_fields(loop_item_xpath, self.use_snapshot, scope)
+        if scope is not None:
+            # 重新解析过的循环项元素供之后的块复用
+            params.set_loop_item_element(self.depth - 1, scope.element)
+
         for field in self.field_list:
-            value = field.extract(loop_item_xpath, self.context)
             self.on_field_extract(field)
-            results.append({
-                "name": field.name,
-                "value": value
-            })
+        if self.field_observer:
+            self.field_observer.on_fields_extracted(self, self.field_list)
             
         # 输出到变量系统
         if "results" in self.output_variables:
@@ -120,6 +188,39 @@ class ExtractDataBlock(Block):
             
         return results
 
+    def _extract_fields(self, loop_item_xpath: str, use_snapshot: bool,
+                        scope: Optional[ElementScope] = None) -> List[Dict[str, Any]]:
+        """
+        :param scope: 循环项元素作用域，逐字段提取时相对XPath在循环项元素内查找
+        """
+        snapshot: Optional[DomSnapshot] = None
+        if use_snapshot:
+            snapshot = self.browser.get_dom_snapshot(self.snapshot_root_xpath)
+            if snapshot is None:
+                logging.warning(f"{self.name} 获取DOM快照失败，改为逐字段提取")
+
+        # 提取所有字段
+        results = []
+        for field in self.field_list:
+            if snapshot is not None:
+                value = field.extract_from_snapshot(loop_item_xpath, snapshot, self.context)
+            elif scope is not None:
+                value = field.extract_in_scope(scope, self.context)
+            else:
+                value = field.extract(loop_item_xpath, self.context)
+            results.append({
+                "name": field.name,
+                "value": value
+            })
+        return results
+
+    def _missing_required_fields(self) -> bool:
+        """必需字段为空；没有标记必需字段时，所有字段都为空才算缺失"""
+        required_fields = [field for field in self.field_list if field.required]
+        if required_fields:
+            return any(not field.value for field in required_fields)
+        return bool(self.field_list) and all(not field.value for field in self.field_list)
+
     def on_field_extract(self, field: Field):
         if self.field_observer:
             self.field_observer.on_field_extracted(field)
@@ -139,12 +240,20 @@ class ExtractDataBlock(Block):
             self.use_relative_xpath = use_relative_xpath.lower() == "true"
         else:
             self.use_relative_xpath = bool(use_relative_xpath)
+
+        use_snapshot = config.get("use_snapshot", False)
+        if isinstance(use_snapshot, str):
+            self.use_snapshot = use_snapshot.lower() == "true"
+        else:
+            self.use_snapshot = bool(use_snapshot)
+        self.snapshot_root_xpath = config.get("snapshot_root_xpath", "")
             
         self.set_field_observer(control_flow.get_field_saver())
         
         # 从配置中加载字段
         for field_config in config.get("fields", []):
             field = Field(field_config["name"], field_config["xpath"])
+            field.required = field_config.get("required", False)
             
             # 设置提取器
             extractor_type = field_config.get("extractor_type", "TextFieldExtractor")
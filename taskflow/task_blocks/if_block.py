@@ -1,25 +1,68 @@
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, List
 
 from taskflow.task_blocks.block import Block, BlockExecuteParams, register_block
-from taskflow.task_blocks.condition_block import ConditionBlock
+from taskflow.task_blocks.condition_block import ConditionBlock, ExecJavaScriptConditionBlock
 
 
 class IfBlock(Block):
+    MATCH_ALL = "all_matching"  # 执行所有满足条件的分支
+    MATCH_FIRST = "first_match"  # 只执行第一个满足条件的分支，相当于switch
 
     def __init__(self, params: Dict[str, Any]):
         Block.__init__(self, params)
+        self.mode = params.get("mode", self.MATCH_ALL)
+        # 是否在一次脚本调用中求值所有JS条件，为False时在执行每个分支之前单独求值。
+        # 批量求值时所有条件在执行任何分支之前求值，看不到前面分支对页面的改动，因此需要显式开启
+        self.batch_conditions = params.get("batch_conditions", False)
 
-    def execute(self, params: BlockExecuteParams):
+    def load_from_config(self, control_flow, config: Dict):
+        self.mode = config.get("mode", self.MATCH_ALL)
+        batch_conditions = config.get("batch_conditions", False)
+        if isinstance(batch_conditions, str):
+            batch_conditions = batch_conditions.lower() == "true"
+        self.batch_conditions = batch_conditions
+
+    def execute_steps(self, params: BlockExecuteParams):
         if params.in_loop:
             loop_item_element = params.get_loop_item_element(self.depth - 1)
             params.set_loop_item_element(self.depth, loop_item_element)
             params.set_loop_item(self.depth, params.get_loop_item(self.depth - 1))
-        for inner in self.inners:
-            if not isinstance(inner, ConditionBlock): continue
-            inner: ConditionBlock = inner
-            if inner.should_run(params):
-                inner.run(params)
+        conditions = [inner for inner in self.inners if isinstance(inner, ConditionBlock)]
+        if not self.batch_conditions:
+            for inner in conditions:
+                if inner.should_run(params):
+                    yield inner
+                    if self.mode == self.MATCH_FIRST:
+                        break
+            return
+        for inner in self.match_conditions(conditions, params):
+            yield inner
+
+    def match_conditions(self, conditions: List[ConditionBlock], params: BlockExecuteParams) -> List[ConditionBlock]:
+        """
+        JS条件在一次脚本调用中求值，其他条件按顺序调用should_run
+        所有条件在执行分支之前求值完毕
+        """
+        first_match = self.mode == self.MATCH_FIRST
+        scripts = [inner.js_script if isinstance(inner, ExecJavaScriptConditionBlock) else None
+                   for inner in conditions]
+        results = [None] * len(conditions)
+        if any(script is not None for script in scripts):
+            element = params.get_loop_item_element(self.depth) if params.in_loop else None
+            evaluated = self.browser.evaluate_conditions(scripts, element, first_match)
+            # first_match时脚本在第一个满足的JS条件后停止，之后的条件不会被用到
+            results = evaluated + [False] * (len(conditions) - len(evaluated))
+
+        matched = []
+        for inner, result in zip(conditions, results):
+            if result is None:
+                result = inner.should_run(params)
+            if result:
+                matched.append(inner)
+                if first_match:
+                    break
+        return matched
 
     def add_condition(self, condition: ConditionBlock):
         if not isinstance(condition, ConditionBlock):
@@ -28,5 +71,3 @@ class IfBlock(Block):
 
 
 register_block("IfBlock", IfBlock)
-
-
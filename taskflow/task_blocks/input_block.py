@@ -22,8 +22,7 @@ class InputBlock(Block):
     def execute(self, params: BlockExecuteParams) -> any:
         if self.use_relative_xpath:
             if params.in_loop:
-                loop_xpath = params.get_loop_item(self.depth - 1)
-                element = self.browser.get_element_by_xpath(loop_xpath + self.xpath)
+                element = self.find_relative_element(params, self.xpath)
                 if self.use_loop_item:
                     loop_item = "示例-提取到的元素" + params.get_loop_item(self.depth - 1)
                     _input(element, loop_item)
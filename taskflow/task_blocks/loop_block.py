@@ -1,8 +1,16 @@
 import logging
-from typing import Optional, Dict, Any
+from functools import partial
+from typing import Optional, Dict, Any, List, Union
 
+from selenium.webdriver.remote.webelement import WebElement
+
+from browser.browser_automation import DEFAULT_HREF_XPATH
+from browser.element_cache import ElementBatchCache, PageValueCache
+from browser.page_prefetcher import PagePrefetcher
+from taskflow.crawl_state import CrawlStateStore, get_crawl_state_store, make_item_key
+from taskflow.field_saver import FieldSaver
 from taskflow.task_blocks.block import Block, BlockExecuteParams, register_block
-from taskflow.task_blocks.loop_type import LoopType, get_loop_type
+from taskflow.task_blocks.loop_type import LoopType, XPathLoopType, get_loop_type
 
 
 class LoopControl:
@@ -24,40 +32,202 @@ class LoopBlock(Block, LoopControl):
         LoopControl.__init__(self)
         super().__init__(params)
         self.loop_type: Optional[LoopType] = None
+        self.item_element_cache: Optional[ElementBatchCache] = None  # 批量解析的循环项元素
+        self.crawl_state: Optional[Dict[str, Any]] = None  # 增量采集配置
+        self.crawl_state_store: Optional[CrawlStateStore] = None
+        self.item_key_cache: Optional[PageValueCache] = None  # 批量求出的循环项标识
+        self.prefetch: Optional[Dict[str, Any]] = None  # 预取配置
+        self.prefetcher: Optional[PagePrefetcher] = None
+        self.prefetch_url_cache: Optional[PageValueCache] = None  # 批量求出的循环项链接
+        self.field_saver: Optional[FieldSaver] = None  # 循环项的数据落盘后才记录增量采集状态
+        self.outer_loop: Optional["LoopBlock"] = None  # 本次执行所在的外层循环
+        self.current_item = None
+        self.current_item_key: Optional[str] = None
 
     def set_loop_type(self, loop_type: LoopType):
         self.loop_type = loop_type
 
+    def set_crawl_state(self, crawl_state: Optional[Dict[str, Any]]):
+        """
+        设置增量采集，跳过之前已经采集过的循环项
+        如 {"file": "crawl_state.db", "key_xpath": ".//a/@href", "hash": false, "ttl": 86400}
+        key_xpath为循环项标识相对循环项的XPath，为空时使用循环项的文本；
+        hash为true时保存标识的哈希值；超过ttl秒的循环项会重新采集
+        """
+        self.crawl_state = crawl_state
+        self.crawl_state_store = get_crawl_state_store(crawl_state["file"]) if crawl_state else None
+
+    def set_field_saver(self, field_saver: Optional[FieldSaver]):
+        """设置后循环项在数据落盘之后才记录为已采集，否则循环项处理完立即记录"""
+        self.field_saver = field_saver
+
+    def set_prefetch(self, prefetch: Union[None, int, Dict[str, Any]]):
+        """
+        设置预取，处理当前循环项时在后台标签页中加载之后count个循环项的详情页，
+        循环体中的DetailPageBlock或OpenPageBlock(detail_tab)打开详情页时直接使用
+        如 {"count": 2, "href_xpath": ".//a/@href", "load_strategy": "eager", "ready_when": "//h1"}，
+        也可以只写预取数量；循环项本身是网址时直接预取，否则按href_xpath求出链接
+        """
+        if isinstance(prefetch, int):
+            prefetch = {"count": prefetch}
+        self.prefetch = prefetch if prefetch and int(prefetch.get("count", 0)) > 0 else None
+
     def load_from_config(self, control_flow, config: Dict):
         loop_type_class = get_loop_type(config["loop_type"]["type"])
         self.loop_type = loop_type_class(**config["loop_type"])
-
-    def execute(self, params: BlockExecuteParams):
+        if "crawl_state" in config:
+            self.set_crawl_state(config["crawl_state"])
+            self.set_field_saver(control_flow.get_field_saver())
+        if "prefetch" in config:
+            self.set_prefetch(config["prefetch"])
+
+    @property
+    def crawl_scope(self) -> str:
+        """增量采集的范围，嵌套在外层循环中时加上外层循环项的标识，不同外层循环项下的内层循环项分开记录"""
+        parts = [self.crawl_state.get("scope") or self.name]
+        outer = self.outer_loop
+        while outer is not None:
+            parts.append(outer.current_item_key or make_item_key(outer.current_item))
+            outer = outer.outer_loop
+        return "/".join(reversed(parts))
+
+    def get_item_key(self, next_item) -> Optional[str]:
+        """循环项的标识，在点击或者跳转之前求出"""
+        if isinstance(self.loop_type, XPathLoopType):
+            value = self.item_key_cache.get(next_item,
+                                            lambda: self._load_item_keys(self.loop_type.pending_xpaths()),
+                                            lambda xpath: self._load_item_keys([xpath])[xpath])
+        else:
+            value = next_item
+        if not value:
+            return None
+        return make_item_key(value, self.crawl_state.get("hash", False))
+
+    def _load_item_keys(self, xpaths) -> Dict[str, Optional[str]]:
+        return dict(zip(xpaths, self.browser.get_item_keys(xpaths, self.crawl_state.get("key_xpath", ""))))
+
+    def execute_steps(self, params: BlockExecuteParams):
         if not self.loop_type:
             logging.error("LoopType is not set.")
 
+        self.outer_loop = params.current_loop if params.in_loop else None
+        self.loop_type.begin(self.browser)
+        self.item_element_cache = ElementBatchCache(self.browser)
+        if self.crawl_state_store:
+            self.item_key_cache = PageValueCache(self.browser)
+            self.crawl_state_store.reset_stats(self.crawl_scope)
+        previous_prefetcher = None
+        if self.prefetch:
+            previous_prefetcher = self.browser.prefetcher
+            ready_when = self.prefetch.get("ready_when")
+            if isinstance(ready_when, str):
+                ready_when = {"type": "element_present", "xpath": ready_when} if ready_when else None
+            self.prefetcher = PagePrefetcher(self.browser.tab_pool, self.prefetch["count"],
+                                             self.prefetch.get("load_strategy"), ready_when)
+            self.prefetch_url_cache = PageValueCache(self.browser)
+            self.browser.prefetcher = self.prefetcher
+        try:
+            yield from self._execute_loop(params)
+        finally:
+            if self.prefetcher:
+                # 循环正常结束或中断时，尚未使用的预取都不再需要
+                self.prefetcher.cancel()
+                self.browser.prefetcher = previous_prefetcher
+                logging.info(f"[{self.name}]预取: {self.prefetcher.summary()}")
+                self.prefetcher = None
+            if self.crawl_state_store:
+                self.crawl_state_store.flush()
+                logging.info(f"[{self.name}]增量采集: {self.crawl_state_store.get_stats(self.crawl_scope)}")
+            # 回到外层循环，之后的块不再属于本循环
+            params.current_loop = self.outer_loop
+            params.in_loop = self.outer_loop is not None
+
+    def _execute_loop(self, params: BlockExecuteParams):
+        ttl = self.crawl_state.get("ttl") if self.crawl_state else None
         while self.loop_type.has_next():
             next_item = self.loop_type.get_next()
+            item_key = self.get_item_key(next_item) if self.crawl_state_store else None
+            self.current_item, self.current_item_key = next_item, item_key
+            if item_key is not None and self.crawl_state_store.should_skip(self.crawl_scope, item_key, ttl):
+                logging.debug(f"[{self.name}]跳过已采集的循环项{item_key}")
+                continue
+            if self.prefetcher:
+                pending = self.loop_type.pending_xpaths() if isinstance(self.loop_type, XPathLoopType) else []
+                self.prefetcher.prefetch(self.get_upcoming_urls(next_item),
+                                         self._get_prefetch_url(next_item, pending))
             for inner in self.inners:
                 self.process_inner(inner, next_item, params)
+                yield inner
                 if self.need_continue:
                     self.need_continue = False
                     break
                 if self.need_break:
                     self.need_break = False
                     return
+            if item_key is not None:
+                self._commit_item(item_key)
+
+    def _commit_item(self, item_key: str):
+        """循环项的数据落盘后再记录为已采集，运行中断时没有落盘的循环项下次会重新采集"""
+        commit = partial(self.crawl_state_store.mark_done, self.crawl_scope, item_key)
+        if self.field_saver is not None:
+            self.field_saver.after_persisted(commit)
+        else:
+            commit()
+
+    def get_upcoming_urls(self, next_item) -> List[str]:
+        """当前循环项之后、预取窗口内的循环项链接"""
+        if not isinstance(self.loop_type, XPathLoopType):
+            return []
+        pending = self.loop_type.pending_xpaths()
+        if next_item not in pending:
+            return []
+        urls = []
+        for item in pending[pending.index(next_item) + 1:]:
+            if len(urls) >= self.prefetcher.window:
+                break
+            if self.will_skip(item):
+                # 之后会被跳过的循环项不需要预取
+                continue
+            url = self._get_prefetch_url(item, pending)
+            if url:
+                urls.append(url)
+        return urls
+
+    def will_skip(self, item) -> bool:
+        """循环项是否会因为已经采集过而被跳过，不计入跳过统计，用于决定提前加载哪些循环项"""
+        if not self.crawl_state_store:
+            return False
+        item_key = self.get_item_key(item)
+        return item_key is not None and self.crawl_state_store.is_crawled(self.crawl_scope, item_key,
+                                                                          self.crawl_state.get("ttl"))
+
+    def _get_prefetch_url(self, item, pending: List[str]) -> Optional[str]:
+        if not isinstance(item, str) or not item:
+            return None
+        if item.startswith("http://") or item.startswith("https://"):
+            return item
+        xpaths = [xpath for xpath in pending if not xpath.startswith("http")]
+        return self.prefetch_url_cache.get(item,
+                                           lambda: self._load_prefetch_urls(xpaths),
+                                           lambda xpath: self._load_prefetch_urls([xpath])[xpath])
+
+    def _load_prefetch_urls(self, xpaths) -> Dict[str, Optional[str]]:
+        href_xpath = self.prefetch.get("href_xpath") or DEFAULT_HREF_XPATH
+        return dict(zip(xpaths, self.browser.get_item_keys(xpaths, href_xpath)))
+
+    def get_loop_item_element(self, next_item) -> Optional[WebElement]:
+        if isinstance(self.loop_type, XPathLoopType):
+            return self.item_element_cache.get(next_item,
+                                               lambda: self.loop_type.resolve_elements(self.browser))
+        return self.browser.get_element_by_xpath(next_item)
 
     def process_inner(self, inner, next_item, params: BlockExecuteParams):
-        # try:
+        """设置循环项，之后由执行器执行inner所在的块链"""
         params.set_loop_item(self.depth, next_item)
-        params.set_loop_item_element(self.depth, self.browser.get_element_by_xpath(next_item))
+        params.set_loop_item_element(self.depth, self.get_loop_item_element(next_item))
         params.in_loop = True
         params.current_loop = self
 
-        inner.run(params)
-
-        # except Exception as e:
-        #     logging.error(f"An error occurred while processing an inner object: {e}")
-
 
 register_block("LoopBlock", LoopBlock)
\ No newline at end of file
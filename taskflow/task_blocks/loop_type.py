@@ -1,5 +1,12 @@
+import logging
+import uuid
 from abc import abstractmethod, ABC
-from typing import Tuple, Any, List
+from collections import deque
+from typing import Tuple, Any, List, Dict, Optional, Deque, Union
+
+from selenium.webdriver.remote.webelement import WebElement
+
+from browser.wait_conditions import create_wait_conditions
 
 
 class LoopType(ABC):
@@ -7,6 +14,10 @@ class LoopType(ABC):
     def __init__(self, name: str):
         self.name = name
 
+    def begin(self, browser):
+        """循环开始前调用，需要访问页面的循环类型在这里完成初始化"""
+        ...
+
     @abstractmethod
     def has_next(self) -> bool:
         ...
@@ -27,7 +38,15 @@ def get_loop_type(loop_type_name: str):
     return LoopType_MAP.get(loop_type_name, None)
 
 class XPathLoopType(LoopType, ABC):
-    ...
+
+    def pending_xpaths(self) -> List[str]:
+        """尚未处理完的循环项XPath(包括当前项)，用于批量解析元素"""
+        return []
+
+    def resolve_elements(self, browser) -> Dict[str, Optional[WebElement]]:
+        """在一次浏览器调用中解析所有待处理循环项的元素"""
+        xpaths = self.pending_xpaths()
+        return dict(zip(xpaths, browser.get_elements_by_xpaths(xpaths)))
 
 
 # 写一个固定元素的循环类型，接受xpath列表作为参数。
@@ -42,6 +61,10 @@ class FixedLoopType(XPathLoopType):
         self.is_end = False
         self.current_element = None
 
+    def begin(self, browser):
+        # 嵌套在外层循环中时每个外层循环项都从头开始
+        self.index = 0
+
     def has_next(self) -> bool:
         return self.index < self.length
 
@@ -52,12 +75,263 @@ class FixedLoopType(XPathLoopType):
         self.index += 1
         return self.current_xpath
 
+    def pending_xpaths(self) -> List[str]:
+        return self.xpaths[max(self.index - 1, 0):]
+
 
 register_loop_type("FixedLoopType", FixedLoopType)
 
 
+# 按XPath查询动态枚举循环项，不需要预先生成所有XPath。
+class XPathQueryLoopType(XPathLoopType):
+
+    def __init__(self, name: str, container_xpath: str, item_xpath: str = "*",
+                 max_items: Optional[int] = None, start_offset: int = 0, requery: bool = True, **kwargs):
+        """
+        :param container_xpath: 列表容器的XPath
+        :param item_xpath: 循环项相对容器的XPath，默认为容器的所有子元素
+        :param max_items: 本次最多处理的循环项数量，为空时不限制
+        :param start_offset: 从第几个循环项开始(从0开始计数)，配合max_items可以分批处理长列表
+        :param requery: 处理完已知的循环项后是否重新查询，以处理列表增长的情况
+        """
+        super().__init__(name)
+        self.query = "{}/{}".format(container_xpath.rstrip("/"), item_xpath.lstrip("/"))
+        self.max_items = int(max_items) if max_items not in (None, "") else None
+        self.start_offset = int(start_offset or 0)
+        if isinstance(requery, str):
+            requery = requery.lower() == "true"
+        self.requery = requery
+        self.browser = None
+        self.index = self.start_offset  # 已经越过的循环项数量
+        self.produced = 0  # 本次循环已经产生的循环项数量
+        self.count = 0  # 最近一次查询到的匹配数量
+
+    def item_xpath(self, position: int) -> str:
+        """第position个(从1开始)匹配项的XPath，可以直接拼接相对XPath"""
+        return "({})[{}]".format(self.query, position)
+
+    def begin(self, browser):
+        self.browser = browser
+        self.index = self.start_offset
+        self.produced = 0
+        self.count = browser.count_xpath_matches(self.query)
+
+    def _reach_limit(self) -> bool:
+        return self.max_items is not None and self.produced >= self.max_items
+
+    def has_next(self) -> bool:
+        if self._reach_limit():
+            return False
+        if self.index < self.count:
+            return True
+        if self.requery and self.browser is not None:
+            count = self.browser.count_xpath_matches(self.query)
+            if count > self.count:
+                logging.info(f"[{self.name}]列表增长 {self.count} -> {count}")
+                self.count = count
+                return True
+        return False
+
+    def get_next(self) -> Any:
+        if self._reach_limit() or self.index >= self.count:
+            return None
+        self.index += 1
+        self.produced += 1
+        return self.item_xpath(self.index)
+
+    def _first_pending_position(self) -> int:
+        # 已经产生过循环项时，当前项(第index个)仍在处理中
+        return self.index if self.produced > 0 else self.index + 1
+
+    def pending_xpaths(self) -> List[str]:
+        end = self.count
+        if self.max_items is not None:
+            end = min(end, self.index + self.max_items - self.produced)
+        return [self.item_xpath(position) for position in range(self._first_pending_position(), end + 1)]
+
+    def resolve_elements(self, browser) -> Dict[str, Optional[WebElement]]:
+        # 一次查询拿到所有匹配项，比逐个XPath求值更省
+        elements = browser.get_elements_by_xpath_query(self.query)
+        self.count = max(self.count, len(elements))
+        return {self.item_xpath(position): elements[position - 1]
+                for position in range(self._first_pending_position(), len(elements) + 1)}
+
+
+register_loop_type("XPathQueryLoopType", XPathQueryLoopType)
+
+
+# 收集尚未见过的循环项，没有新项时在页面内用MutationObserver等待，返回 [[元素, 键, 位置], ...]
+# arguments: 循环标识, 循环项XPath, 键XPath(相对循环项), 等待毫秒数, 回调
+COLLECT_NEW_ITEMS_SCRIPT = """
+var done = arguments[arguments.length - 1];
+var loopId = arguments[0], itemXpath = arguments[1], keyXpath = arguments[2], timeout = arguments[3];
+var state = window.__autowebScrollLoop = window.__autowebScrollLoop || {};
+var seen = state[loopId] = state[loopId] || {};
+function collect() {
+    var result = document.evaluate(itemXpath, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    var items = [];
+    for (var i = 0; i < result.snapshotLength; i++) {
+        var el = result.snapshotItem(i);
+        var key = keyXpath
+            ? document.evaluate('string(' + keyXpath + ')', el, null, XPathResult.STRING_TYPE, null).stringValue
+            : (el.textContent || '').trim().slice(0, 200);
+        if (!key || seen[key]) continue;
+        seen[key] = true;
+        items.push([el, key, i + 1]);
+    }
+    return items;
+}
+var items = collect();
+if (items.length || timeout <= 0) { done(items); return; }
+var scheduled = false, finished = false;
+function finish(items) {
+    if (finished) return;
+    finished = true;
+    observer.disconnect();
+    clearTimeout(timer);
+    done(items);
+}
+var observer = new MutationObserver(function () {
+    if (scheduled) return;
+    scheduled = true;
+    // 合并短时间内的多次变更，避免每次变更都重新求值
+    setTimeout(function () {
+        scheduled = false;
+        var items = collect();
+        if (items.length) finish(items);
+    }, 50);
+});
+observer.observe(document, {childList: true, subtree: true});
+var timer = setTimeout(function () { finish([]); }, timeout);
+"""
+
+SCROLL_TO_END_SCRIPT = """
+var container = arguments[0] ? document.evaluate(arguments[0], document, null,
+                                                 XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue : null;
+if (container) {
+    container.scrollTop = container.scrollHeight;
+} else {
+    window.scrollTo(0, (document.scrollingElement || document.documentElement).scrollHeight);
+}
+"""
+
+
+# 无限滚动或翻页的列表，每次只产生新出现的循环项
+class ScrollLoopType(XPathLoopType):
 
+    def __init__(self, name: str, item_xpath: str, key_xpath: str = "", mode: str = "scroll",
+                 next_xpath: str = "", scroll_container_xpath: str = "", max_items: Optional[int] = None,
+                 max_no_growth: int = 2, wait_timeout: float = 5, wait_navigation: Union[bool, str] = True,
+                 ready_when: Union[None, Dict, List] = None, **kwargs):
+        """
+        :param item_xpath: 匹配所有循环项的XPath
+        :param key_xpath: 循环项的稳定键，相对循环项的XPath，如 @data-id 或 .//a/@href，为空时使用文本内容
+        :param mode: 加载更多的方式，scroll滚动到底部，next点击下一页
+        :param next_xpath: 下一页按钮的XPath，mode为next时使用
+        :param scroll_container_xpath: 滚动容器的XPath，为空时滚动整个页面
+        :param max_items: 最多处理的循环项数量，为空时不限制
+        :param max_no_growth: 连续多少次加载没有新循环项时结束
+        :param wait_timeout: 每次加载后等待新循环项出现的时间（秒）
+        :param wait_navigation: mode为next时点击后是否等待页面跳转，页面内异步翻页时可以关闭以免每页多等待
+        :param ready_when: mode为next时翻页后的页面就绪条件，如 {"type": "item_count", "xpath": "//li", "count": 10}
+        """
+        super().__init__(name)
+        self.item_xpath = item_xpath
+        self.key_xpath = key_xpath
+        self.mode = mode
+        self.next_xpath = next_xpath
+        self.scroll_container_xpath = scroll_container_xpath
+        # 流程配置中未填写的选项为空字符串
+        self.max_items = int(max_items) if max_items not in (None, "") else None
+        self.max_no_growth = int(max_no_growth) if max_no_growth not in (None, "") else 2
+        self.wait_timeout = float(wait_timeout) if wait_timeout not in (None, "") else 5
+        self.wait_navigation = wait_navigation.lower() == "true" if isinstance(wait_navigation, str) \
+            else bool(wait_navigation)
+        self.ready_when = ready_when
+        self.loop_id = ""  # 页面内记录已收集循环项的标识，每次开始循环时重新生成
+        self.browser = None
+        self.seen_keys = set()  # 页面跳转后页面内的记录会丢失，以这里的记录为准
+        self.buffer: Deque[Tuple[str, WebElement]] = deque()  # 待处理的 (XPath, 元素)
+        self.current: Optional[Tuple[str, WebElement]] = None
+        self.produced = 0
+        self.no_growth = 0
+        self.load_count = 0  # 加载更多的次数
+
+    def begin(self, browser):
+        self.browser = browser
+        # 同一页面上再次开始循环时不能沿用页面内上一次的记录，否则已经见过的循环项不会再被收集
+        self.loop_id = uuid.uuid4().hex[:8]
+        self.seen_keys.clear()
+        self.buffer.clear()
+        self.current = None
+        self.produced = 0
+        self.no_growth = 0
+        self.load_count = 0
+        self._collect(0)
+
+    def _collect(self, timeout: float) -> int:
+        """收集新出现的循环项，返回新增数量"""
+        items = self.browser.execute_async_script(COLLECT_NEW_ITEMS_SCRIPT, self.loop_id, self.item_xpath,
+                                                  self.key_xpath, int(timeout * 1000),
+                                                  timeout=timeout + self.browser.default_timeout)
+        added = 0
+        for element, key, position in items or []:
+            if key in self.seen_keys:
+                continue
+            self.seen_keys.add(key)
+            self.buffer.append(("({})[{}]".format(self.item_xpath, position), element))
+            added += 1
+        return added
+
+    def _load_more(self) -> bool:
+        self.load_count += 1
+        if self.mode == "next":
+            # 翻页可能跳转到新文档，在旧文档卸载的过程中执行收集脚本会失败，
+            # 因此跟踪点击并等待跳转的页面加载完成
+            if not self.browser.click_element_and_track(self.next_xpath, wait_navigation=self.wait_navigation):
+                logging.info(f"[{self.name}]没有下一页")
+                return False
+            for condition in create_wait_conditions(self.ready_when):
+                if self.browser.wait_until(condition, self.browser.page_load_timeout) is None:
+                    logging.warning(f"[{self.name}]翻页后就绪条件{condition}在超时时间内没有满足")
+        else:
+            self.browser.execute_script(SCROLL_TO_END_SCRIPT, self.scroll_container_xpath)
+        # 列表内容发生了变化(翻页或虚拟列表回收节点)，按位置缓存的元素句柄不再可靠
+        self.browser.mark_navigation(self.browser.current_handle)
+        return True
+
+    def _reach_limit(self) -> bool:
+        return self.max_items is not None and self.produced >= self.max_items
+
+    def has_next(self) -> bool:
+        if self._reach_limit():
+            return False
+        while not self.buffer:
+            if self.no_growth >= self.max_no_growth or not self._load_more():
+                return False
+            added = self._collect(self.wait_timeout)
+            if added:
+                self.no_growth = 0
+                logging.info(f"[{self.name}]第{self.load_count}次加载新增{added}项")
+            else:
+                self.no_growth += 1
+        return True
+
+    def get_next(self) -> Any:
+        if self._reach_limit() or not self.buffer:
+            return None
+        self.current = self.buffer.popleft()
+        self.produced += 1
+        return self.current[0]
 
+    def pending_xpaths(self) -> List[str]:
+        items = ([self.current] if self.current else []) + list(self.buffer)
+        return [xpath for xpath, _ in items]
 
+    def resolve_elements(self, browser) -> Dict[str, Optional[WebElement]]:
+        # 收集时已经拿到了元素句柄，不需要再次查询
+        items = ([self.current] if self.current else []) + list(self.buffer)
+        return dict(items)
 
 
+register_loop_type("ScrollLoopType", ScrollLoopType)
@@ -0,0 +1,52 @@
+import logging
+from typing import Dict, Any, List
+
+from browser.network_capture import get_by_path
+from taskflow.task_blocks.block import Block, BlockExecuteParams, register_block
+
+
+class NetworkCaptureBlock(Block):
+    """
+    捕获页面自己发出的XHR/Fetch请求的JSON响应，直接获取结构化数据而不是从渲染后的DOM中逐字段提取
+
+    需要放在触发请求的块（打开页面、点击、滚动等）之后
+    """
+
+    def __init__(self, params: Dict[str, Any]):
+        super().__init__(params)
+        self.url_pattern: str = params.get("url_pattern", "")  # re:开头为正则表达式，包含*时为通配符，否则为子串
+        self.min_responses: int = int(params.get("min_responses", 1))  # 至少等待到的响应数量
+        self.capture_timeout: float = float(params.get("capture_timeout", 10))
+        self.items_path: str = params.get("items_path", "")  # 列表数据在响应中的路径，如 data.items
+
+    def execute(self, params: BlockExecuteParams) -> List[Dict[str, Any]]:
+        responses = self.browser.capture_responses(self.url_pattern, self.min_responses, self.capture_timeout)
+        items = []
+        for response in responses:
+            value = get_by_path(response["body"], self.items_path)
+            if isinstance(value, list):
+                items.extend(value)
+            elif value is not None:
+                items.append(value)
+        logging.info("{} 捕获到{}个响应，共{}条数据".format(self.name, len(responses), len(items)))
+
+        # 输出到变量系统
+        if "responses" in self.output_variables:
+            params.set_variable("responses", responses)
+
+        if "items" in self.output_variables:
+            params.set_variable("items", items)
+
+        if "item_count" in self.output_variables:
+            params.set_variable("item_count", len(items))
+
+        return items
+
+    def load_from_config(self, control_flow, config: Dict):
+        self.url_pattern = config.get("url_pattern", "")
+        self.min_responses = int(config.get("min_responses", 1))
+        self.capture_timeout = float(config.get("capture_timeout", 10))
+        self.items_path = config.get("items_path", "")
+
+
+register_block("NetworkCaptureBlock", NetworkCaptureBlock)
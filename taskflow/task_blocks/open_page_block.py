@@ -10,22 +10,60 @@ class OpenPageBlock(Block):
         super().__init__(params)
         self._page_url = params.get("page_url", '')
         self._fullscreen = params.get("fullscreen", False)
+        # 要拦截的资源，如 ["image", "font"] 或 {"types": [...], "patterns": [...]}，为None时沿用浏览器当前设置
+        self._block_resources = params.get("block_resources", None)
+        # 加载策略 normal/eager/none，为空时使用浏览器的默认策略
+        self._load_strategy = params.get("load_strategy", None)
+        # 页面就绪条件，XPath字符串表示等待元素出现，也可以是等待条件配置，如 {"type": "item_count", ...}
+        self._ready_when = self._parse_ready_when(params.get("ready_when", None))
+        # 获取方式：browser在浏览器中打开；static直接下载页面，供后续的数据提取使用
+        self._fetch_mode = params.get("fetch_mode", "browser")
+        # 是否在可复用的详情页标签页中打开，当前标签页(列表页)保持不变
+        self._detail_tab = params.get("detail_tab", False)
+
+    @staticmethod
+    def _parse_ready_when(ready_when):
+        if isinstance(ready_when, str):
+            return {"type": "element_present", "xpath": ready_when} if ready_when else None
+        return ready_when
+
+    def set_load_strategy(self, load_strategy: str, ready_when=None):
+        self._load_strategy = load_strategy
+        self._ready_when = self._parse_ready_when(ready_when)
+
+    def set_fetch_mode(self, fetch_mode: str):
+        self._fetch_mode = fetch_mode or "browser"
+
+    def set_block_resources(self, block_resources):
+        self._block_resources = block_resources
 
     def execute(self, params: BlockExecuteParams):
-        self.browser.open_page(self._page_url)
+        if self._fetch_mode == "static":
+            if self.browser.open_static_page(self._page_url):
+                logging.info("{} 以静态方式下载了 {}".format(self.name, self._page_url))
+                return
+            logging.info("{} 静态下载 {} 失败，改为在浏览器中打开".format(self.name, self._page_url))
+
+        if self._block_resources is not None:
+            self.browser.set_blocked_resources(self._block_resources)
+        open_page = self.browser.open_detail_page if self._detail_tab else self.browser.open_page
+        if not open_page(self._page_url, self._load_strategy, self._ready_when):
+            logging.warning("{} 打开 {} 时页面没有在超时时间内就绪".format(self.name, self._page_url))
         if self._fullscreen:
             self.browser.maximize_window()
         logging.info("{} 打开了 {}".format(self.name, self._page_url))
+        if self._block_resources:
+            stats = self.browser.get_resource_stats()
+            logging.info("{} 已拦截请求{}个，预计节省{:.1f}KB，已加载{:.1f}KB".format(
+                self.name, stats["blocked_requests"], stats["estimated_saved_bytes"] / 1024,
+                stats["loaded_bytes"] / 1024))
 
     def load_from_config(self, control_flow, config: Dict):
         self._fullscreen = config.get("fullscreen", False)
+        self._block_resources = config.get("block_resources", None)
+        self.set_load_strategy(config.get("load_strategy", None), config.get("ready_when", None))
+        self.set_fetch_mode(config.get("fetch_mode", "browser"))
+        self._detail_tab = config.get("detail_tab", False)
 
 
 register_block("OpenPageBlock", OpenPageBlock)
-
-
-
-
-
-
-
@@ -0,0 +1,117 @@
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+import asyncio
+import threading
+import unittest
+from browser.async_browser_automation import AsyncBrowserAutomation
+from browser.wait_conditions import JsPredicateCondition, WaitStatistics
+from taskflow.block_context import BlockContext
+from taskflow.block_executor import AsyncBlockExecutor, BlockTimingHook
+from taskflow.task_blocks.async_block import AsyncBlock
+from taskflow.task_blocks.block import Block, BlockExecuteParams
+from taskflow.task_blocks.loop_block import LoopBlock
+from taskflow.task_blocks.loop_type import LoopType
+
+
+class StubDriver:
+    def __init__(self):
+        self.checks = 0
+
+    def execute_script(self, script, *args):
+        self.checks += 1
+        return self.checks >= 3
+
+
+class StubBrowser:
+    def __init__(self):
+        self.browser = StubDriver()
+        self.default_timeout = 1
+        self.poll_interval = 0.01
+        self.wait_stats = WaitStatistics()
+
+    def get_element_by_xpath(self, xpath):
+        return None
+
+
+class ListLoopType(LoopType):
+    def __init__(self, values):
+        super().__init__("列表循环")
+        self.values = values
+        self.index = 0
+
+    def has_next(self) -> bool:
+        return self.index < len(self.values)
+
+    def get_next(self):
+        self.index += 1
+        return self.values[self.index - 1]
+
+
+class ThreadRecordBlock(Block):
+    def __init__(self, name, context, trace):
+        super().__init__({"name": name, "context": context})
+        self.trace = trace
+
+    def execute(self, params):
+        self.trace.append((self.name, params.get_loop_item(0), threading.current_thread().name))
+
+
+class SleepBlock(AsyncBlock):
+    def __init__(self, name, context, trace):
+        super().__init__({"name": name, "context": context})
+        self.trace = trace
+
+    async def execute_async(self, params):
+        await asyncio.sleep(0.01)
+        self.trace.append((self.name, params.get_loop_item(0), threading.current_thread().name))
+        return "slept"
+
+
+class TestAsyncBlockExecutor(unittest.TestCase):
+
+    def make_flow(self, name, trace):
+        async_browser = AsyncBrowserAutomation(StubBrowser())
+        context = BlockContext().set_browser(async_browser.browser).set_async_browser(async_browser)
+        loop_block = LoopBlock({"name": name, "context": context})
+        loop_block.set_loop_type(ListLoopType([1, 2]))
+        record = ThreadRecordBlock(name + "-sync", context, trace)
+        loop_block.add_inner(record)
+        loop_block.add_inner(SleepBlock(name + "-async", context, trace))
+        return async_browser, loop_block
+
+    def test_flows_run_concurrently(self):
+        trace = []
+        hook = BlockTimingHook()
+
+        async def main():
+            runs = []
+            for name in ("A", "B"):
+                async_browser, loop_block = self.make_flow(name, trace)
+                runs.append(AsyncBlockExecutor(async_browser, [hook]).run(loop_block, BlockExecuteParams()))
+            await asyncio.gather(*runs)
+
+        asyncio.run(main())
+        names = [name for name, _, _ in trace]
+        # 两个流程交替推进，而不是一个执行完再执行另一个
+        self.assertLess(names.index("B-sync"), names.index("A-async"))
+        self.assertEqual(len(trace), 8)
+        # 同步块在浏览器线程中执行，异步块在事件循环线程中执行
+        for name, _, thread_name in trace:
+            if name.endswith("-sync"):
+                self.assertTrue(thread_name.startswith("browser"))
+            else:
+                self.assertEqual(thread_name, threading.main_thread().name)
+        self.assertEqual(hook.timings["SleepBlock[A-async]"]["count"], 2)
+
+    def test_async_wait_until(self):
+        async_browser = AsyncBrowserAutomation(StubBrowser())
+        result = asyncio.run(async_browser.wait_until(JsPredicateCondition("return true")))
+        self.assertTrue(result)
+        self.assertEqual(async_browser.browser.browser.checks, 3)
+        self.assertEqual(async_browser.browser.wait_stats.summary()["js"]["count"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
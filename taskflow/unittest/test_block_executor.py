@@ -0,0 +1,107 @@
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+import unittest
+from taskflow.block_context import BlockContext
+from taskflow.block_executor import BlockExecutor, BlockTimingHook
+from taskflow.task_blocks.block import Block, BlockExecuteParams
+from taskflow.task_blocks.loop_block import LoopBlock
+from taskflow.task_blocks.loop_type import LoopType
+
+
+class StubBrowser:
+    def get_element_by_xpath(self, xpath):
+        return None
+
+
+class ListLoopType(LoopType):
+    def __init__(self, values):
+        super().__init__("列表循环")
+        self.values = values
+        self.index = 0
+
+    def begin(self, browser):
+        self.index = 0
+
+    def has_next(self) -> bool:
+        return self.index < len(self.values)
+
+    def get_next(self):
+        self.index += 1
+        return self.values[self.index - 1]
+
+
+class RecordBlock(Block):
+    """记录执行轨迹，可以在指定循环项上跳出或继续循环"""
+
+    def __init__(self, name, context, trace, on_item=None):
+        super().__init__({"name": name, "context": context})
+        self.trace = trace
+        self.on_item = on_item or {}
+
+    def execute(self, params):
+        item = params.get_loop_item(self.depth - 1) if params.in_loop else None
+        self.trace.append((self.name, item))
+        action = self.on_item.get(item)
+        if action == "break":
+            params.current_loop.break_loop()
+        elif action == "continue":
+            params.current_loop.continue_loop()
+        elif action == "raise":
+            raise ValueError(item)
+        return item
+
+
+class TestBlockExecutor(unittest.TestCase):
+
+    def setUp(self):
+        self.context = BlockContext().set_browser(StubBrowser())
+        self.trace = []
+
+    def make_loop(self, values, *inners):
+        loop_block = LoopBlock({"name": "循环", "context": self.context})
+        loop_block.set_loop_type(ListLoopType(values))
+        last = None
+        for inner in inners:
+            loop_block.add_inner(inner)
+            if last:
+                last.set_next_block(inner)
+            last = inner
+        return loop_block
+
+    def test_long_chain_does_not_recurse(self):
+        start = RecordBlock("0", self.context, self.trace)
+        block = start
+        for i in range(1, sys.getrecursionlimit() * 2):
+            block = block.set_next_block(RecordBlock(str(i), self.context, self.trace))
+        hook = BlockTimingHook()
+        params = BlockExecuteParams()
+        start.run(params, BlockExecutor([hook]))
+        self.assertEqual(len(self.trace), sys.getrecursionlimit() * 2)
+        self.assertEqual(sum(timing["count"] for timing in hook.timings.values()), len(self.trace))
+
+    def test_loop_control_and_chained_inners(self):
+        a = RecordBlock("a", self.context, self.trace, {2: "continue"})
+        b = RecordBlock("b", self.context, self.trace, {3: "break"})
+        loop_block = self.make_loop([1, 2, 3, 4], a, b)
+        loop_block.run(BlockExecuteParams())
+        # 与递归执行相同：内部块之间也用next_block相连，从a开始的块链会执行b，之后b自己再执行一次；
+        # continue与break在整条块链执行完后才生效
+        self.assertEqual(self.trace, [
+            ("a", 1), ("b", 1), ("b", 1),
+            ("a", 2), ("b", 2),
+            ("a", 3), ("b", 3),
+        ])
+
+    def test_exception_propagates_through_loop(self):
+        loop_block = self.make_loop([1, 2], RecordBlock("a", self.context, self.trace, {1: "raise"}))
+        after = RecordBlock("after", self.context, self.trace)
+        loop_block.set_next_block(after)
+        with self.assertRaises(ValueError):
+            loop_block.run(BlockExecuteParams())
+        self.assertEqual(self.trace, [("a", 1)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,153 @@
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+import tempfile
+import time
+import unittest
+from taskflow.block_context import BlockContext
+from taskflow.crawl_state import CrawlStateStore, get_crawl_state_store, make_item_key
+from taskflow.data_exporter import CsvExporter
+from taskflow.field_saver import FieldSaver
+from taskflow.task_blocks.block import Block, BlockExecuteParams
+from taskflow.task_blocks.loop_block import LoopBlock
+from taskflow.task_blocks.extract_data_block import Field
+from taskflow.task_blocks.loop_type import FixedLoopType
+
+
+class ListBrowser:
+    """循环项XPath对应固定网址的浏览器替身"""
+
+    def __init__(self, urls):
+        self.urls = urls
+        self.key_calls = 0
+
+    def get_page_version(self):
+        return "main", 0
+
+    def get_item_keys(self, xpaths, key_xpath=""):
+        self.key_calls += 1
+        return [self.urls.get(xpath) for xpath in xpaths]
+
+    def get_elements_by_xpaths(self, xpaths):
+        return ["element" + xpath for xpath in xpaths]
+
+
+class RecordInner(Block):
+    def __init__(self, params):
+        super().__init__(params)
+        self.items = []
+
+    def execute(self, params):
+        self.items.append(params.get_loop_item(self.depth - 1))
+
+
+class SaveInner(Block):
+    """把循环项作为一条记录交给FieldSaver"""
+
+    def __init__(self, params, field_saver):
+        super().__init__(params)
+        self.field_saver = field_saver
+
+    def execute(self, params):
+        field = Field("项", "")
+        field.value = params.get_loop_item(self.depth - 1)
+        self.field_saver.on_fields_extracted(self, [field])
+
+
+class TestCrawlState(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "crawl_state.db")
+
+    def tearDown(self):
+        get_crawl_state_store(self.path).close()
+        self.temp_dir.cleanup()
+
+    def test_store_persists_and_ttl(self):
+        store = CrawlStateStore(self.path, batch_size=2)
+        store.mark_done("list", "a")
+        self.assertTrue(store.should_skip("list", "a"))
+        store.close()
+
+        # 未满一批的写入在关闭时提交
+        store = CrawlStateStore(self.path)
+        self.assertTrue(store.should_skip("list", "a"))
+        self.assertFalse(store.should_skip("other", "a"))
+        store.known["list"]["a"] = time.time() - 100
+        self.assertFalse(store.should_skip("list", "a", ttl=10))
+        store.mark_done("list", "a")
+        store.mark_done("list", "b")
+        self.assertEqual(store.get_stats("list"), {"new": 1, "skipped": 1, "revisited": 1})
+        store.close()
+        self.assertEqual(make_item_key(" x ", True), make_item_key("x", True))
+
+    def _run_loop(self, browser):
+        context = BlockContext().set_browser(browser)
+        loop_block = LoopBlock({"name": "列表", "context": context})
+        loop_block.set_loop_type(FixedLoopType("固定循环", ["//li[1]", "//li[2]", "//li[3]"]))
+        loop_block.set_crawl_state({"file": self.path, "key_xpath": ".//a/@href"})
+        inner = RecordInner({"name": "记录", "context": context})
+        loop_block.add_inner(inner)
+        loop_block.run(BlockExecuteParams())
+        return inner.items, loop_block.crawl_state_store.get_stats("列表")
+
+    def test_loop_block_skips_known_items(self):
+        urls = {"//li[1]": "https://a", "//li[2]": "https://b", "//li[3]": "https://c"}
+        items, stats = self._run_loop(ListBrowser({"//li[1]": "https://a", "//li[2]": "https://b"}))
+        self.assertEqual(items, ["//li[1]", "//li[2]", "//li[3]"])
+        self.assertEqual(stats["new"], 2)
+
+        browser = ListBrowser(urls)
+        items, stats = self._run_loop(browser)
+        # 第三项上次没有标识，不会被记录，这次作为新项处理
+        self.assertEqual(items, ["//li[3]"])
+        self.assertEqual(stats, {"new": 1, "skipped": 2, "revisited": 0})
+        # 所有循环项的标识在一次调用中求出
+        self.assertEqual(browser.key_calls, 1)
+
+
+    def test_commit_after_rows_persisted(self):
+        urls = {"//li[1]": "https://a", "//li[2]": "https://b"}
+        context = BlockContext().set_browser(ListBrowser(urls))
+        field_saver = FieldSaver()
+        field_saver.set_data_exporter(CsvExporter(os.path.join(self.temp_dir.name, "data.csv"),
+                                                  flush_rows=100, flush_interval=3600))
+        loop_block = LoopBlock({"name": "列表", "context": context})
+        loop_block.set_loop_type(FixedLoopType("固定循环", ["//li[1]", "//li[2]"]))
+        loop_block.set_crawl_state({"file": self.path, "key_xpath": ".//a/@href"})
+        loop_block.set_field_saver(field_saver)
+        loop_block.add_inner(SaveInner({"name": "保存", "context": context}, field_saver))
+        loop_block.run(BlockExecuteParams())
+
+        # 数据还没有落盘，循环项不能记录为已采集
+        store = loop_block.crawl_state_store
+        self.assertFalse(store.should_skip("列表", "https://a"))
+        field_saver.flush()
+        self.assertTrue(store.should_skip("列表", "https://a"))
+        self.assertFalse(store.should_skip("列表", "https://b"))
+        field_saver.close()
+        self.assertTrue(store.should_skip("列表", "https://b"))
+
+    def test_scope_includes_outer_item(self):
+        browser = ListBrowser({"//li[1]": "https://a", "//li[2]": "https://b"})
+        context = BlockContext().set_browser(browser)
+        outer = LoopBlock({"name": "分类", "context": context})
+        outer.set_loop_type(FixedLoopType("固定循环", ["//ul[1]", "//ul[2]"]))
+        inner_loop = LoopBlock({"name": "列表", "context": context})
+        inner_loop.set_loop_type(FixedLoopType("固定循环", ["//li[1]", "//li[2]"]))
+        inner_loop.set_crawl_state({"file": self.path, "key_xpath": ".//a/@href"})
+        outer.add_inner(inner_loop)
+        record = RecordInner({"name": "记录", "context": context})
+        inner_loop.add_inner(record)
+        params = BlockExecuteParams()
+        outer.run(params)
+        # 不同外层循环项下相同标识的内层循环项分别采集
+        self.assertEqual(record.items, ["//li[1]", "//li[2]"] * 2)
+        self.assertTrue(inner_loop.crawl_state_store.should_skip("//ul[2]/列表", "https://a"))
+        self.assertFalse(params.in_loop)
+
+
+if __name__ == '__main__':
+    unittest.main()
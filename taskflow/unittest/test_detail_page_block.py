@@ -0,0 +1,134 @@
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+import tempfile
+import unittest
+from taskflow.block_context import BlockContext
+from taskflow.crawl_state import get_crawl_state_store
+from taskflow.task_blocks.block import Block, BlockExecuteParams
+from taskflow.task_blocks.collect_links_block import CollectLinksBlock
+from taskflow.task_blocks.detail_page_block import DetailPageBlock
+from taskflow.task_blocks.loop_block import LoopBlock
+from taskflow.task_blocks.loop_type import FixedLoopType
+
+
+class TabBrowser:
+    """记录标签页切换的浏览器替身，列表页在list标签页，详情页在detail标签页"""
+
+    def __init__(self, hrefs):
+        self.hrefs = hrefs
+        self.current_handle = "list"
+        self.tab_concurrency = 1
+        self.prefetcher = None
+        self.key_calls = 0
+        self.opened = []
+
+    def get_page_version(self):
+        return self.current_handle, 0
+
+    def get_elements_by_xpaths(self, xpaths):
+        return ["element" + xpath for xpath in xpaths]
+
+    def get_item_keys(self, xpaths, key_xpath=""):
+        self.key_calls += 1
+        return [self.hrefs.get(xpath) for xpath in xpaths]
+
+    def collect_links(self, xpath, href_xpath):
+        return list(self.hrefs.values()) + [None, self.hrefs["//li[1]"]]
+
+    def open_detail_page(self, url, load_strategy=None, ready_when=None):
+        self.current_handle = "detail"
+        self.opened.append(url)
+        return True
+
+    def switch_to_window(self, window_handle):
+        self.current_handle = window_handle
+
+
+class FakeTabPool:
+    """记录每次打开时一并发起导航的后续链接"""
+
+    def __init__(self, size):
+        self.size = size
+        self.upcoming = []
+
+    def open(self, url, load_strategy=None, ready_when=None, upcoming=()):
+        self.upcoming.append((url, list(upcoming)))
+        return "session", True
+
+    def release(self, session):
+        pass
+
+    def restore(self):
+        pass
+
+
+class TraceBlock(Block):
+    def __init__(self, context, trace):
+        super().__init__({"name": "提取", "context": context})
+        self.trace = trace
+
+    def execute(self, params):
+        self.trace.append((self.browser.current_handle, params.get_loop_item(self.depth - 1)))
+
+
+class TestDetailPageBlock(unittest.TestCase):
+
+    def setUp(self):
+        self.browser = TabBrowser({
+            "//li[1]": "http://example.com/1",
+            "//li[2]": None,
+            "//li[3]": "http://example.com/3",
+        })
+        self.context = BlockContext().set_browser(self.browser)
+        self.trace = []
+
+    def test_open_details_in_detail_tab(self):
+        loop = LoopBlock({"name": "循环", "context": self.context})
+        loop.set_loop_type(FixedLoopType("固定循环", ["//li[1]", "//li[2]", "//li[3]"]))
+        detail = DetailPageBlock({"name": "详情页", "context": self.context})
+        loop.add_inner(detail)
+        detail.add_inner(TraceBlock(self.context, self.trace))
+        loop.run(BlockExecuteParams())
+
+        self.assertEqual(["http://example.com/1", "http://example.com/3"], self.browser.opened)
+        self.assertEqual([("detail", "http://example.com/1"), ("detail", "http://example.com/3")], self.trace)
+        # 所有链接在第一次调用中求出，每个详情页之后都回到列表页
+        self.assertEqual(1, self.browser.key_calls)
+        self.assertEqual("list", self.browser.current_handle)
+
+    def test_pool_skips_crawled_items(self):
+        self.browser.hrefs = {f"//li[{i}]": f"http://example.com/{i}" for i in range(1, 5)}
+        self.browser.tab_concurrency = 3
+        self.browser.tab_pool = FakeTabPool(3)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "crawl_state.db")
+            store = get_crawl_state_store(path)
+            store.mark_done("循环", "http://example.com/2")
+            try:
+                loop = LoopBlock({"name": "循环", "context": self.context})
+                loop.set_loop_type(FixedLoopType("固定循环", [f"//li[{i}]" for i in range(1, 5)]))
+                loop.set_crawl_state({"file": path})
+                detail = DetailPageBlock({"name": "详情页", "context": self.context})
+                loop.add_inner(detail)
+                loop.run(BlockExecuteParams())
+            finally:
+                store.close()
+
+        # 已经采集过的第2项不会提前在标签池中打开
+        self.assertEqual([
+            ("http://example.com/1", ["http://example.com/3", "http://example.com/4"]),
+            ("http://example.com/3", ["http://example.com/4"]),
+            ("http://example.com/4", []),
+        ], self.browser.tab_pool.upcoming)
+
+    def test_collect_links(self):
+        block = CollectLinksBlock({"name": "收集链接", "context": self.context, "item_xpath": "//li"})
+        params = BlockExecuteParams()
+        block.run(params)
+        self.assertEqual(["http://example.com/1", "http://example.com/3"], params.get_variable("links"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+import unittest
+from taskflow.block_context import BlockContext
+from taskflow.task_blocks.block import Block, BlockExecuteParams
+from taskflow.task_blocks.condition_block import ExecJavaScriptConditionBlock, PassConditionBlock
+from taskflow.task_blocks.if_block import IfBlock
+
+
+class ConditionBrowser:
+    """按脚本内容返回条件结果，记录页面调用次数"""
+
+    def __init__(self, script_results):
+        self.script_results = script_results
+        self.batch_calls = []
+        self.script_calls = 0
+
+    def evaluate_conditions(self, scripts, element=None, first_match=False):
+        self.batch_calls.append((list(scripts), element, first_match))
+        results = []
+        for script in scripts:
+            if script is None:
+                results.append(None)
+                continue
+            results.append(self.script_results[script])
+            if results[-1] and first_match:
+                break
+        return results
+
+    def execute_script(self, js_script, *args):
+        self.script_calls += 1
+        return self.script_results[js_script]
+
+
+class TraceBlock(Block):
+    def __init__(self, name, context, trace):
+        super().__init__({"name": name, "context": context})
+        self.trace = trace
+
+    def execute(self, params):
+        self.trace.append(self.name)
+
+
+class TestIfBlock(unittest.TestCase):
+
+    def setUp(self):
+        self.browser = ConditionBrowser({"a": False, "b": True, "c": True})
+        self.context = BlockContext().set_browser(self.browser)
+        self.trace = []
+
+    def build(self, **params):
+        if_block = IfBlock({"name": "判断", "context": self.context, **params})
+        for name in ["a", "b", "c"]:
+            condition = ExecJavaScriptConditionBlock({"name": name, "js_script": name, "context": self.context})
+            if_block.add_condition(condition)
+            condition.add_inner(TraceBlock(name, self.context, self.trace))
+        fallback = PassConditionBlock({"name": "pass", "context": self.context})
+        if_block.add_condition(fallback)
+        fallback.add_inner(TraceBlock("pass", self.context, self.trace))
+        return if_block
+
+    def loop_params(self):
+        params = BlockExecuteParams()
+        params.in_loop = True
+        params.set_loop_item(0, "//li[1]")
+        params.set_loop_item_element(0, "element")
+        return params
+
+    def test_all_matching_in_one_call(self):
+        if_block = self.build(batch_conditions=True)
+        if_block.depth = 1
+        if_block.run(self.loop_params())
+        self.assertEqual(["b", "c", "pass"], self.trace)
+        self.assertEqual([(["a", "b", "c", None], "element", False)], self.browser.batch_calls)
+        self.assertEqual(0, self.browser.script_calls)
+
+    def test_first_match(self):
+        if_block = self.build(mode=IfBlock.MATCH_FIRST, batch_conditions=True)
+        if_block.depth = 1
+        if_block.run(self.loop_params())
+        self.assertEqual(["b"], self.trace)
+        self.assertEqual(1, len(self.browser.batch_calls))
+
+    def test_without_batch(self):
+        # 默认在执行每个分支之前单独求值条件
+        if_block = self.build(mode=IfBlock.MATCH_FIRST)
+        if_block.depth = 1
+        if_block.run(self.loop_params())
+        self.assertEqual(["b"], self.trace)
+        self.assertEqual(0, len(self.browser.batch_calls))
+        self.assertEqual(2, self.browser.script_calls)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,276 @@
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+import asyncio
+import tempfile
+import unittest
+from autoweb.modules_adapter.adapter_factory import AdapterFactory
+from autoweb.modules_adapter.base_adapter import BlockModuleAdapter
+from autoweb.modules_adapter.loop_hooks import CrawlStateLoopHook
+from browser.browser_automation import BrowserAutomation
+from browser.page_prefetcher import PagePrefetcher
+from browser.page_tracker import PageTracker
+from taskflow.crawl_state import get_crawl_state_store
+from taskflow.data_exporter import CsvExporter, ExcelExporter
+from taskflow.field_saver import FieldSaver
+from taskflow.block_context import BlockContext
+from taskflow.task_blocks.block import Block, BlockExecuteParams
+from taskflow.task_blocks.detail_page_block import DetailPageBlock
+from taskflow.task_blocks.extract_data_block import Field
+from taskflow.task_blocks.loop_block import LoopBlock
+from taskflow.task_blocks.loop_type import FixedLoopType
+from workflow.module import CompositeModule, LoopModule, SlotModule, ModuleMeta, ModuleType
+from workflow.module_context import ModuleContext, ModuleExecutionResult
+from workflow.module_port import InputHelper, InputParameter, ValueType, ModuleInputs, ModuleOutputs
+
+
+class FakePerformanceLog:
+    def poll(self):
+        pass
+
+
+class PrefetchBrowser(BrowserAutomation):
+    """不启动浏览器，记录标签页中的导航、等待与停止加载"""
+
+    def __init__(self, hrefs=None):
+        self._current_handle = "list"
+        self.page_tracker = PageTracker()
+        self.page_versions = {}
+        self.performance_log = FakePerformanceLog()
+        self.tab_concurrency = 1
+        self._tab_pool = None
+        self.prefetcher = None
+        self.detail_handle = None
+        self.hrefs = hrefs or {}
+        self.events = []
+        self.tab_count = 0
+
+    def new_tab(self):
+        self.tab_count += 1
+        self._current_handle = f"tab{self.tab_count}"
+        return self._current_handle
+
+    def switch_to_window(self, window_handle):
+        self._current_handle = window_handle
+
+    def start_page_load(self, url):
+        self.events.append(("start", self.current_handle, url))
+        return "origin"
+
+    def wait_for_page_load(self, previous_origin=None, load_strategy=None, ready_when=None):
+        self.events.append(("wait", self.current_handle))
+        return True
+
+    def stop_page_load(self):
+        self.events.append(("stop", self.current_handle))
+
+    def get_elements_by_xpaths(self, xpaths):
+        return ["element" + xpath for xpath in xpaths]
+
+    def get_item_keys(self, xpaths, key_xpath=""):
+        return [self.hrefs.get(xpath) for xpath in xpaths]
+
+    def starts(self):
+        return [event[2] for event in self.events if event[0] == "start"]
+
+
+class TraceBlock(Block):
+    def __init__(self, context, trace, break_at=None):
+        super().__init__({"name": "提取", "context": context})
+        self.trace = trace
+        self.break_at = break_at
+
+    def execute(self, params):
+        url = params.get_loop_item(self.depth - 1)
+        self.trace.append((self.browser.current_handle, url))
+        if url == self.break_at:
+            params.current_loop.break_loop()
+
+
+class TestPagePrefetcher(unittest.TestCase):
+
+    def test_window_hits_and_misses(self):
+        browser = PrefetchBrowser()
+        prefetcher = PagePrefetcher(browser.tab_pool, 2)
+        self.assertEqual(3, browser.tab_pool.size)
+
+        prefetcher.prefetch(["b", "c", "d"])
+        self.assertEqual(["b", "c"], browser.starts())
+        self.assertEqual("list", browser.current_handle)
+
+        self.assertTrue(prefetcher.open("a"))  # 没有预取
+        prefetcher.release()
+        self.assertTrue(prefetcher.open("b"))
+        self.assertEqual(["b", "c", "a"], browser.starts())  # b直接使用预取的页面
+        # 窗口移动后c之外的预取被取消
+        prefetcher.prefetch(["d"])
+        self.assertIn(("stop", "tab2"), browser.events)
+        prefetcher.cancel()
+
+        summary = prefetcher.summary()
+        self.assertEqual(1, summary["hits"])
+        self.assertEqual(1, summary["misses"])
+        self.assertEqual(3, summary["prefetched"])
+        self.assertEqual(2, summary["cancelled"])
+        self.assertEqual("list", browser.current_handle)
+
+    def test_loop_block_prefetch(self):
+        browser = PrefetchBrowser({f"//li[{i}]": f"http://example.com/{i}" for i in range(1, 5)})
+        context = BlockContext().set_browser(browser)
+        trace = []
+        loop = LoopBlock({"name": "循环", "context": context})
+        loop.set_loop_type(FixedLoopType("固定循环", [f"//li[{i}]" for i in range(1, 5)]))
+        loop.set_prefetch({"count": 1})
+        detail = DetailPageBlock({"name": "详情页", "context": context})
+        loop.add_inner(detail)
+        detail.add_inner(TraceBlock(context, trace, break_at="http://example.com/3"))
+        loop.run(BlockExecuteParams())
+
+        self.assertEqual(["http://example.com/1", "http://example.com/2", "http://example.com/3"],
+                         [url for _, url in trace])
+        # 第4项在循环中断前已经开始预取，中断后被取消
+        self.assertEqual("http://example.com/4", browser.starts()[-1])
+        self.assertEqual("stop", browser.events[-1][0])
+        self.assertIsNone(browser.prefetcher)
+        self.assertEqual("list", browser.current_handle)
+        self.assertIs(browser.tab_pool.home_tracker, browser.page_tracker)
+
+    def test_loop_block_skips_crawled_items(self):
+        browser = PrefetchBrowser({f"//li[{i}]": f"http://example.com/{i}" for i in range(1, 4)})
+        context = BlockContext().set_browser(browser)
+        trace = []
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "crawl_state.db")
+            store = get_crawl_state_store(path)
+            store.mark_done("循环", "http://example.com/2")
+            try:
+                loop = LoopBlock({"name": "循环", "context": context})
+                loop.set_loop_type(FixedLoopType("固定循环", [f"//li[{i}]" for i in range(1, 4)]))
+                loop.set_crawl_state({"file": path})
+                loop.set_prefetch({"count": 1})
+                detail = DetailPageBlock({"name": "详情页", "context": context})
+                loop.add_inner(detail)
+                detail.add_inner(TraceBlock(context, trace))
+                loop.run(BlockExecuteParams())
+            finally:
+                store.close()
+
+        self.assertEqual(["http://example.com/1", "http://example.com/3"], [url for _, url in trace])
+        # 已经采集过的第2项不会被预取，处理第1项时预取的是第3项
+        self.assertEqual(["http://example.com/3", "http://example.com/1"], browser.starts())
+
+    def _run_loop_module(self, browser, urls, extra_inputs=()):
+        BlockModuleAdapter._browser_instance = browser
+        try:
+            loop = LoopModule("loop-1")
+            loop.inputs.inputParameters.extend([
+                InputParameter(name="array", input=InputHelper.create_literal_value(ValueType.ARRAY, urls)),
+                InputParameter(name="prefetch_count", input=InputHelper.create_literal_value(ValueType.INTEGER, 1)),
+                *extra_inputs
+            ])
+            body = SlotModule("slot-loop_body-loop-1")
+            body.set_meta(ModuleMeta(title="loop_body", description="循环体"))
+            loop.set_loop_body(body)
+            open_page = AdapterFactory.create_adapter("OpenPageBlock", "open-1", "打开详情页")
+            open_page.inputs.inputParameters.extend([
+                InputParameter(name="page_url",
+                               input=InputHelper.create_reference_value(ValueType.STRING, body.module_id, "item")),
+                InputParameter(name="detail_tab", input=InputHelper.create_literal_value(ValueType.BOOLEAN, True)),
+            ])
+            body.add_module(open_page)
+            workflow = CompositeModule("workflow", ModuleType.WORKFLOW)
+            workflow.set_meta(ModuleMeta(title="workflow", description="预取测试"))
+            workflow.set_inputs(ModuleInputs(inputDefs=[], inputParameters=[]))
+            workflow.set_outputs(ModuleOutputs(outputDefs=[]))
+            workflow.add_module(loop)
+            workflow.set_context(ModuleContext())
+            result = asyncio.run(workflow.execute())
+        finally:
+            BlockModuleAdapter._browser_instance = None
+        self.assertTrue(result.success)
+        return result.child_results["modules"][0].outputs
+
+    def test_loop_module_prefetch(self):
+        browser = PrefetchBrowser()
+        urls = ["http://example.com/1", "http://example.com/2", "http://example.com/3"]
+        stats = self._run_loop_module(browser, urls)["prefetch_stats"]
+
+        # 第2项在打开第1项之前已经开始预取
+        self.assertEqual([urls[1], urls[0], urls[2]], browser.starts())
+        self.assertEqual(2, stats["hits"])
+        self.assertEqual(1, stats["misses"])
+        self.assertIsNone(browser.prefetcher)
+
+    def test_loop_module_skips_crawled_items(self):
+        browser = PrefetchBrowser()
+        urls = ["http://example.com/1", "http://example.com/2", "http://example.com/3"]
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "crawl_state.db")
+            store = get_crawl_state_store(path)
+            store.mark_done("loop-1", urls[1])
+            try:
+                outputs = self._run_loop_module(browser, urls, [
+                    InputParameter(name="crawl_state_file",
+                                   input=InputHelper.create_literal_value(ValueType.STRING, path)),
+                ])
+            finally:
+                store.close()
+
+        # 已经处理过的第2项既不打开也不预取
+        self.assertEqual([urls[2], urls[0]], browser.starts())
+        self.assertEqual(1, outputs["skipped"])
+        self.assertEqual(1, outputs["prefetch_stats"]["hits"])
+
+    def test_crawl_hook_waits_for_body_savers_only(self):
+        class Extract:
+            depth = 1
+
+        def extract(field_saver, value):
+            field = Field("项", "")
+            field.value = value
+            field_saver.on_fields_extracted(Extract(), [field])
+            field_saver.end_row()
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            # 循环体之外还有尚未保存的整体导出数据，不能阻塞循环的记录
+            unrelated = FieldSaver()
+            unrelated.set_data_exporter(ExcelExporter(name=os.path.join(temp_dir, "other.xlsx")))
+            extract(unrelated, "x")
+
+            loop = LoopModule("loop-1")
+            body = SlotModule("slot-loop_body-loop-1")
+            loop.set_loop_body(body)
+            streaming = AdapterFactory.create_adapter("ExtractDataBlock", "extract-1", "流式提取")
+            streaming.field_saver = FieldSaver()
+            streaming.field_saver.set_data_exporter(CsvExporter(os.path.join(temp_dir, "data.csv"),
+                                                                flush_rows=100, flush_interval=3600))
+            whole = AdapterFactory.create_adapter("ExtractDataBlock", "extract-2", "整体提取")
+            whole.field_saver = FieldSaver()
+            whole.field_saver.set_data_exporter(ExcelExporter(name=os.path.join(temp_dir, "data.xlsx")))
+            body.add_module(streaming)
+            body.add_module(whole)
+
+            store = get_crawl_state_store(os.path.join(temp_dir, "crawl_state.db"))
+            try:
+                hook = CrawlStateLoopHook(store, "loop-1")
+                extract(whole.field_saver, "a")
+                hook.after_item(loop, "a", ModuleExecutionResult(success=True, outputs={}))
+                # 循环体只有整体导出的数据，立即记录
+                self.assertTrue(store.is_crawled("loop-1", "a"))
+
+                extract(streaming.field_saver, "b")
+                hook.after_item(loop, "b", ModuleExecutionResult(success=True, outputs={}))
+                # 流式导出的数据刷新到磁盘后才记录
+                self.assertFalse(store.is_crawled("loop-1", "b"))
+                streaming.field_saver.flush()
+                self.assertTrue(store.is_crawled("loop-1", "b"))
+                streaming.field_saver.close()
+            finally:
+                store.close()
+                unrelated.close()
+                whole.field_saver.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+import unittest
+from array import array
+from taskflow.field_saver import FieldSaver
+from taskflow.record_store import Column, RecordStore
+from taskflow.task_blocks.extract_data_block import Field
+
+
+class ListExporter:
+    def export(self, fields_order, rows):
+        self.fields_order = fields_order
+        self.rows = list(rows)
+
+
+class StubBlock:
+    def __init__(self, depth: int):
+        self.depth = depth
+
+
+class TestRecordStore(unittest.TestCase):
+
+    def test_missing_fields_stay_aligned(self):
+        store = RecordStore()
+        store.append({"a": 1, "b": "x"})
+        store.append({"b": "y"})
+        store.append({"a": 3, "c": 2.5})
+        # 缺失字段为空值，不会沿用上一行的值
+        self.assertEqual(list(store.iter_rows()), [[1, "x", None], [None, "y", None], [3, None, 2.5]])
+        self.assertEqual(list(store.iter_rows(["c", "a"])), [[None, 1], [None, None], [2.5, 3]])
+
+    def test_typed_columns(self):
+        column = Column()
+        column.append(None)
+        column.append(1)
+        column.append(2)
+        self.assertIsInstance(column.values, array)
+        self.assertEqual(column.to_list(), [None, 1, 2])
+        column.append("三")
+        self.assertEqual(column.to_list(), [None, 1, 2, "三"])
+
+        column = Column()
+        column.append(True)
+        column.append(None)
+        self.assertEqual(column.to_list(), [True, None])
+
+    def test_spill_to_disk(self):
+        store = RecordStore(memory_rows=2)
+        for i in range(5):
+            store.append({"i": i})
+        store.append({"i": 5, "late": "x"})
+        self.assertIsNotNone(store.spill_path)
+        self.assertEqual(len(store), 6)
+        self.assertEqual(list(store.iter_rows()),
+                         [[0, None], [1, None], [2, None], [3, None], [4, None], [5, "x"]])
+        spill_path = store.spill_path
+        store.close()
+        self.assertFalse(os.path.exists(spill_path))
+
+    def test_field_saver_exports_rows(self):
+        field_saver = FieldSaver()
+        exporter = ListExporter()
+        field_saver.set_data_exporter(exporter)
+
+        def extract(depth, **values):
+            fields = []
+            for name, value in values.items():
+                field = Field(name, "")
+                field.value = value
+                field_saver.on_field_extracted(field)
+                fields.append(field)
+            field_saver.on_fields_extracted(StubBlock(depth), fields)
+
+        extract(0, site="runoob")
+        extract(1, title="Python", content="教程")
+        extract(1, title="Java")
+        field_saver.save()
+        self.assertEqual(exporter.fields_order, ["site", "title", "content"])
+        self.assertEqual(exporter.rows, [["runoob", "Python", "教程"], ["runoob", "Java", None]])
+
+
+if __name__ == '__main__':
+    unittest.main()
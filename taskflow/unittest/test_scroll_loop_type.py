@@ -0,0 +1,108 @@
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+import unittest
+from taskflow.task_blocks.loop_type import ScrollLoopType, get_loop_type
+
+
+class FeedBrowser:
+    """每次滚动后返回下一批循环项的浏览器替身，批次中的项为 (键, 位置)"""
+
+    def __init__(self, batches):
+        self.batches = list(batches)
+        self.default_timeout = 1
+        self.current_handle = "main"
+        self.page_load_timeout = 1
+        self.scroll_count = 0
+        self.navigations = 0
+        self.loop_ids = []
+        self.next_pages = 0  # 还可以点击的下一页数量
+        self.clicks = []
+
+    def execute_async_script(self, script, *args, timeout=None):
+        self.loop_ids.append(args[0])
+        batch = self.batches.pop(0) if self.batches else []
+        return [["element-{}".format(key), key, position] for key, position in batch]
+
+    def execute_script(self, script, *args):
+        self.scroll_count += 1
+
+    def mark_navigation(self, window_handle):
+        self.navigations += 1
+
+    def click_element_and_track(self, xpath, element=None, wait_navigation=False):
+        self.clicks.append((xpath, wait_navigation))
+        if self.next_pages <= 0:
+            return False
+        self.next_pages -= 1
+        return True
+
+    def wait_until(self, condition, timeout=None):
+        return True
+
+
+class TestScrollLoopType(unittest.TestCase):
+    """测试无限滚动循环类型"""
+
+    def _run(self, loop_type, browser):
+        loop_type.begin(browser)
+        items = []
+        while loop_type.has_next():
+            items.append(loop_type.get_next())
+        return items
+
+    def test_incremental_items(self):
+        # 第二批中的a已经处理过(例如页面跳转后页面内的记录丢失)，不应重复产生
+        browser = FeedBrowser([[("a", 1), ("b", 2)], [("a", 1), ("c", 3)], [], []])
+        loop_type = get_loop_type("ScrollLoopType")(name="滚动循环", item_xpath="//li", max_no_growth=2)
+        self.assertIsInstance(loop_type, ScrollLoopType)
+        self.assertEqual(self._run(loop_type, browser), ["(//li)[1]", "(//li)[2]", "(//li)[3]"])
+        # 两次没有新增后结束
+        self.assertEqual(browser.scroll_count, 3)
+        self.assertEqual(browser.navigations, 3)
+
+    def test_max_items_and_elements(self):
+        browser = FeedBrowser([[("a", 1), ("b", 2), ("c", 3)]])
+        loop_type = ScrollLoopType("滚动循环", "//li", max_items=2)
+        loop_type.begin(browser)
+        self.assertEqual(loop_type.get_next(), "(//li)[1]")
+        # 收集时拿到的元素句柄直接用于批量解析
+        self.assertEqual(loop_type.resolve_elements(browser)["(//li)[2]"], "element-b")
+        self.assertTrue(loop_type.has_next())
+        loop_type.get_next()
+        self.assertFalse(loop_type.has_next())
+        self.assertEqual(browser.scroll_count, 0)
+
+    def test_string_options(self):
+        # 流程配置中的选项是字符串，未填写时为空字符串
+        loop_type = ScrollLoopType("滚动循环", "//li", max_items="", max_no_growth="", wait_timeout="",
+                                   wait_navigation="false")
+        self.assertIsNone(loop_type.max_items)
+        self.assertEqual(loop_type.max_no_growth, 2)
+        self.assertEqual(loop_type.wait_timeout, 5)
+        self.assertFalse(loop_type.wait_navigation)
+        loop_type = ScrollLoopType("滚动循环", "//li", max_items="2", max_no_growth="3", wait_timeout="1.5")
+        self.assertEqual((loop_type.max_items, loop_type.max_no_growth, loop_type.wait_timeout), (2, 3, 1.5))
+
+    def test_next_page_tracked(self):
+        browser = FeedBrowser([[("a", 1)], [("b", 1)], [("c", 1)]])
+        browser.next_pages = 1
+        loop_type = ScrollLoopType("翻页循环", "//li", mode="next", next_xpath="//a[@class='next']",
+                                   ready_when={"type": "element_present", "xpath": "//li"})
+        self.assertEqual(self._run(loop_type, browser), ["(//li)[1]", "(//li)[1]"])
+        # 翻页使用跟踪的点击并等待跳转，没有下一页时结束
+        self.assertEqual(browser.clicks, [("//a[@class='next']", True)] * 2)
+        self.assertEqual(browser.scroll_count, 0)
+
+    def test_begin_resets_page_state(self):
+        browser = FeedBrowser([[("a", 1)], [], [("a", 1)], []])
+        loop_type = ScrollLoopType("滚动循环", "//li", max_no_growth=1)
+        self.assertEqual(self._run(loop_type, browser), ["(//li)[1]"])
+        # 再次开始循环时使用新的页面内记录，已经处理过的循环项可以再次收集
+        self.assertEqual(self._run(loop_type, browser), ["(//li)[1]"])
+        self.assertEqual(len(set(browser.loop_ids)), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+import unittest
+from lxml import html
+from browser.dom_snapshot import DomSnapshot, DomSnapshotCache
+from taskflow.block_context import BlockContext
+from taskflow.task_blocks.block import BlockExecuteParams
+from taskflow.task_blocks.extract_data_block import ExtractDataBlock, Field, TextFieldExtractor
+
+
+PAGE_SOURCE = """
+<html><body>
+  <h2>菜鸟教程</h2>
+  <div id="list">
+    <a href="/html"><h4>HTML 教程</h4><strong>超文本标记语言</strong></a>
+    <a href="/css"><h4>CSS 教程</h4><strong>
+        层叠样式表
+    </strong></a>
+  </div>
+</body></html>
+"""
+
+
+class SnapshotBrowser:
+    """只提供快照接口的浏览器替身，除快照容器之外的标题外，逐字段查询会直接报错"""
+
+    def __init__(self, source: str):
+        self.source = source
+        self.snapshot_calls = 0
+        self.static_page = None
+        self.live_lookups = []
+
+    def get_dom_snapshot(self, root_xpath: str = ""):
+        self.snapshot_calls += 1
+        if root_xpath:
+            container = DomSnapshot(self.source).find(root_xpath)
+            return DomSnapshot(html.tostring(container, encoding="unicode"), "http://example.com", root_xpath)
+        return DomSnapshot(self.source, "http://example.com")
+
+    def get_element_text(self, xpath: str):
+        if not xpath.startswith("/html/body/h2"):
+            raise AssertionError("快照模式下不应逐字段查询浏览器")
+        self.live_lookups.append(xpath)
+        return "菜鸟教程"
+
+
+class TestSnapshotExtraction(unittest.TestCase):
+    """测试基于DOM快照的数据提取"""
+
+    def setUp(self):
+        self.browser = SnapshotBrowser(PAGE_SOURCE)
+        self.context = BlockContext().set_browser(self.browser)
+
+    def _create_block(self, fields, **params):
+        block = ExtractDataBlock({"name": "提取数据", "context": self.context, "use_snapshot": True, **params})
+        extractor = TextFieldExtractor("文本数据提取")
+        block.add_field_list([Field(name, xpath).set_extractor(extractor) for name, xpath in fields])
+        return block
+
+    def test_page_snapshot(self):
+        block = self._create_block([("网站", "/html/body/h2")])
+        results = block.execute(BlockExecuteParams())
+        self.assertEqual(results, [{"name": "网站", "value": "菜鸟教程"}])
+        self.assertEqual(self.browser.snapshot_calls, 1)
+
+    def test_relative_loop_item_xpath(self):
+        block = self._create_block([("标题", "/h4"), ("内容", "/strong")])
+        block.set_use_relative_xpath(True)
+        block.depth = 1
+        params = BlockExecuteParams()
+        params.set_loop_item(0, "/html/body/div/a[2]")
+        results = block.execute(params)
+        self.assertEqual(results[0]["value"], "CSS 教程")
+        self.assertEqual(results[1]["value"], "层叠样式表")
+
+    def test_container_snapshot(self):
+        block = self._create_block([("标题", "/html/body/div/a[1]/h4")], snapshot_root_xpath="/html/body/div")
+        results = block.execute(BlockExecuteParams())
+        self.assertEqual(results[0]["value"], "HTML 教程")
+
+    def test_xpath_outside_container(self):
+        # div[2]与容器div只有前缀相同，h2在容器之外，都需要在浏览器中查询
+        snapshot = self.browser.get_dom_snapshot("/html/body/div")
+        self.assertFalse(snapshot.covers("/html/body/div[2]/a"))
+        self.assertEqual([], snapshot.find_all("/html/body/div[2]/a"))
+        self.assertTrue(snapshot.covers("/html/body/div"))
+        block = self._create_block([("网站", "/html/body/h2"), ("标题", "/html/body/div/a[2]/h4")],
+                                   snapshot_root_xpath="/html/body/div")
+        results = block.execute(BlockExecuteParams())
+        self.assertEqual(["菜鸟教程", "CSS 教程"], [result["value"] for result in results])
+        self.assertEqual(["/html/body/h2"], self.browser.live_lookups)
+
+    def test_non_node_result(self):
+        snapshot = DomSnapshot(PAGE_SOURCE)
+        self.assertEqual("2", snapshot.get_text("count(//a)"))
+        self.assertEqual("true", snapshot.get_text("boolean(//h2)"))
+        self.assertEqual("菜鸟教程", snapshot.get_text("string(//h2)"))
+
+    def test_missing_element(self):
+        block = self._create_block([("不存在", "/html/body/p")])
+        results = block.execute(BlockExecuteParams())
+        self.assertIsNone(results[0]["value"])
+
+
+class TestDomSnapshotCache(unittest.TestCase):
+    """测试快照缓存"""
+
+    def test_lru_eviction(self):
+        cache = DomSnapshotCache(max_size=2)
+        snapshots = [DomSnapshot(PAGE_SOURCE) for _ in range(3)]
+        for i, snapshot in enumerate(snapshots):
+            cache.put(("http://example.com", "1", i, ""), snapshot)
+        self.assertIsNone(cache.get(("http://example.com", "1", 0, "")))
+        self.assertIs(cache.get(("http://example.com", "1", 2, "")), snapshots[2])
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from browser.dom_snapshot import DomSnapshot
+from browser.static_fetcher import StaticPageFetcher
+from taskflow.block_context import BlockContext
+from taskflow.task_blocks.block import BlockExecuteParams
+from taskflow.task_blocks.extract_data_block import ExtractDataBlock, Field, TextFieldExtractor
+
+
+PAGES = {
+    "/static": ("text/html; charset=utf-8", "<html><body><h1>服务端渲染</h1><p>内容</p></body></html>".encode("utf-8")),
+    # 没有声明编码，需要从meta标签识别
+    "/gbk": ("text/html", '<html><head><meta charset="gbk"></head><body><h1>中文标题</h1></body></html>'.encode("gbk")),
+    # 数据由JS渲染，静态下载拿不到
+    "/spa": ("text/html; charset=utf-8", b"<html><body><h1></h1><script>render()</script></body></html>"),
+    "/data.json": ("application/json", b"{}"),
+}
+
+RENDERED_PAGE = "<html><body><h1>浏览器渲染</h1></body></html>"
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == "/moved":
+            self.send_response(302)
+            self.send_header("Location", "/static")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if self.path not in PAGES:
+            self.send_error(404)
+            return
+        content_type, body = PAGES[self.path]
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class StaticBrowser:
+    """只实现静态模式相关接口的浏览器替身，浏览器中打开页面时返回JS渲染后的结果"""
+
+    def __init__(self, fetcher: StaticPageFetcher):
+        self.static_fetcher = fetcher
+        self.static_page = None
+        self.live_opened = []
+
+    def open_static_page(self, url: str) -> bool:
+        self.static_page = self.static_fetcher.fetch(url)
+        return self.static_page is not None
+
+    def ensure_live_page(self):
+        if self.static_page is not None:
+            self.live_opened.append(self.static_page.url)
+            self.static_page = None
+
+    def get_dom_snapshot(self, root_xpath: str = ""):
+        if self.static_page is not None:
+            return self.static_page
+        return DomSnapshot(RENDERED_PAGE)
+
+    def get_element_text(self, xpath: str):
+        return DomSnapshot(RENDERED_PAGE).get_text(xpath)
+
+
+class TestStaticFetch(unittest.TestCase):
+    """测试不经过浏览器的静态页面下载"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+        cls.base_url = "http://127.0.0.1:{}".format(cls.server.server_address[1])
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.fetcher = StaticPageFetcher(retries=0)
+        self.browser = StaticBrowser(self.fetcher)
+
+    def tearDown(self):
+        self.fetcher.close()
+
+    def _extract(self, path: str):
+        self.assertTrue(self.browser.open_static_page(self.base_url + path))
+        block = ExtractDataBlock({"name": "提取数据", "context": BlockContext().set_browser(self.browser)})
+        field = Field("标题", "/html/body/h1").set_extractor(TextFieldExtractor("文本数据提取"))
+        field.required = True
+        block.add_field(field)
+        return block.execute(BlockExecuteParams())
+
+    def test_fetch(self):
+        self.assertEqual(self.fetcher.fetch(self.base_url + "/static").get_text("/html/body/p"), "内容")
+        self.assertEqual(self.fetcher.fetch(self.base_url + "/gbk").get_text("/html/body/h1"), "中文标题")
+        self.assertIsNone(self.fetcher.fetch(self.base_url + "/missing"))
+        self.assertIsNone(self.fetcher.fetch(self.base_url + "/data.json"))
+        self.assertEqual(self.fetcher.stats["requests"], 4)
+        self.assertEqual(self.fetcher.stats["failures"], 2)
+
+    def test_final_url(self):
+        # 重定向后页面的网址为最终网址
+        self.assertEqual(self.fetcher.fetch(self.base_url + "/moved").url, self.base_url + "/static")
+
+    def test_extract_static_page(self):
+        results = self._extract("/static")
+        self.assertEqual(results[0]["value"], "服务端渲染")
+        self.assertEqual(self.browser.live_opened, [])
+
+    def test_fallback_to_browser(self):
+        results = self._extract("/spa")
+        self.assertEqual(results[0]["value"], "浏览器渲染")
+        self.assertEqual(self.browser.live_opened, [self.base_url + "/spa"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+import csv
+import json
+import tempfile
+import unittest
+from taskflow.data_exporter import CsvExporter, XlsxStreamExporter, create_exporter
+from taskflow.field_saver import FieldSaver
+from taskflow.task_blocks.extract_data_block import Field
+
+
+class StubBlock:
+    def __init__(self, depth: int):
+        self.depth = depth
+
+
+def make_field(name: str, value: str) -> Field:
+    field = Field(name, "")
+    field.value = value
+    return field
+
+
+class TestStreamingExporter(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.temp_dir.name, name)
+
+    def read_csv(self, name: str):
+        with open(self.path(name), newline="", encoding="utf-8-sig") as f:
+            return list(csv.reader(f))
+
+    def test_csv_flushes_incrementally(self):
+        exporter = CsvExporter(self.path("data.csv"), flush_rows=2)
+        exporter.write_row(["a", "b"], {"a": 1, "b": 2})
+        exporter.write_row(["a", "b"], {"a": 3, "b": 4})
+        # 达到flush_rows后数据已经在磁盘上，不需要等到关闭
+        self.assertEqual(self.read_csv("data.csv"), [["a", "b"], ["1", "2"], ["3", "4"]])
+        exporter.close()
+
+    def test_csv_rotates_on_new_field_and_size(self):
+        exporter = CsvExporter(self.path("data.csv"), flush_rows=1, max_file_size=20)
+        exporter.write_row(["a"], {"a": "x" * 30})
+        exporter.write_row(["a"], {"a": "y"})
+        exporter.write_row(["a", "b"], {"a": "z", "b": "w"})
+        exporter.close()
+        self.assertEqual(self.read_csv("data.csv"), [["a"], ["x" * 30]])
+        self.assertEqual(self.read_csv("data_1.csv"), [["a"], ["y"]])
+        self.assertEqual(self.read_csv("data_2.csv"), [["a", "b"], ["z", "w"]])
+
+    def test_jsonl_keeps_new_fields_in_same_file(self):
+        exporter = create_exporter({"type": "jsonl", "name": self.path("data.jsonl")})
+        exporter.write_row(["a"], {"a": 1})
+        exporter.write_row(["a", "b"], {"a": 2, "b": "中文"})
+        exporter.close()
+        with open(self.path("data.jsonl"), encoding="utf-8") as f:
+            rows = [json.loads(line) for line in f]
+        self.assertEqual(rows, [{"a": 1}, {"a": 2, "b": "中文"}])
+
+    def test_xlsx_rotates_by_rows(self):
+        exporter = XlsxStreamExporter(self.path("data.xlsx"), max_rows=2, flush_rows=1)
+        for i in range(3):
+            exporter.write_row(["a"], {"a": i})
+        exporter.close()
+        self.assertTrue(os.path.exists(self.path("data.xlsx")))
+        self.assertTrue(os.path.exists(self.path("data_1.xlsx")))
+
+    def test_field_saver_assembles_nested_rows(self):
+        field_saver = FieldSaver()
+        field_saver.set_data_exporter(CsvExporter(self.path("data.csv")))
+        outer, inner = StubBlock(1), StubBlock(2)
+
+        def extract(block, **values):
+            fields = [make_field(name, value) for name, value in values.items()]
+            for field in fields:
+                field_saver.on_field_extracted(field)
+            field_saver.on_fields_extracted(block, fields)
+
+        # 外层循环提取分类，内层循环提取商品，每个商品一行并带上所属分类
+        extract(outer, category="书籍")
+        extract(inner, title="A")
+        extract(inner, title="B")
+        extract(outer, category="音乐")
+        extract(inner, title="C")
+        field_saver.save()
+        self.assertEqual(self.read_csv("data.csv"),
+                         [["category", "title"], ["书籍", "A"], ["书籍", "B"], ["音乐", "C"]])
+        self.assertEqual(len(field_saver.record_store), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
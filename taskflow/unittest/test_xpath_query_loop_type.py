@@ -0,0 +1,76 @@
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+import unittest
+from taskflow.task_blocks.loop_type import XPathQueryLoopType, get_loop_type
+
+
+class ListBrowser:
+    """列表项用字符串表示，counts依次为每次查询到的匹配数量，用完后保持最后一个"""
+
+    def __init__(self, counts):
+        self.counts = list(counts)
+        self.count_calls = 0
+
+    @property
+    def count(self):
+        return self.counts[0]
+
+    def count_xpath_matches(self, query):
+        self.count_calls += 1
+        if len(self.counts) > 1 and self.count_calls > 1:
+            self.counts.pop(0)
+        return self.count
+
+    def get_elements_by_xpath_query(self, query):
+        return ["li{}".format(position) for position in range(1, self.count + 1)]
+
+
+class TestXPathQueryLoopType(unittest.TestCase):
+    """测试按XPath查询枚举循环项的循环类型"""
+
+    def _run(self, loop_type, browser, pending=None):
+        loop_type.begin(browser)
+        items = []
+        while loop_type.has_next():
+            items.append(loop_type.get_next())
+            if pending is not None:
+                pending.append(loop_type.pending_xpaths())
+        return items
+
+    def test_list_growth(self):
+        browser = ListBrowser([2, 3, 3])
+        loop_type = get_loop_type("XPathQueryLoopType")(name="查询循环", container_xpath="//ul/", item_xpath="/li")
+        self.assertIsInstance(loop_type, XPathQueryLoopType)
+        self.assertEqual(["(//ul/li)[1]", "(//ul/li)[2]", "(//ul/li)[3]"], self._run(loop_type, browser))
+
+    def test_no_requery(self):
+        browser = ListBrowser([2, 3])
+        loop_type = XPathQueryLoopType("查询循环", "//ul", "li", requery="False")
+        self.assertFalse(loop_type.requery)
+        self.assertEqual(["(//ul/li)[1]", "(//ul/li)[2]"], self._run(loop_type, browser))
+        self.assertEqual(1, browser.count_calls)
+
+    def test_start_offset_and_max_items(self):
+        browser = ListBrowser([6])
+        loop_type = XPathQueryLoopType("查询循环", "//ul", "li", max_items="2", start_offset="3")
+        pending = []
+        self.assertEqual(["(//ul/li)[4]", "(//ul/li)[5]"], self._run(loop_type, browser, pending))
+        # 待处理的循环项包括当前项，不超过max_items的范围
+        self.assertEqual([["(//ul/li)[4]", "(//ul/li)[5]"], ["(//ul/li)[5]"]], pending)
+
+    def test_pending_before_first_item(self):
+        browser = ListBrowser([4])
+        loop_type = XPathQueryLoopType("查询循环", "//ul", "li", start_offset=1)
+        loop_type.begin(browser)
+        self.assertEqual(["(//ul/li)[2]", "(//ul/li)[3]", "(//ul/li)[4]"], loop_type.pending_xpaths())
+        self.assertEqual({"(//ul/li)[2]": "li2", "(//ul/li)[3]": "li3", "(//ul/li)[4]": "li4"},
+                         loop_type.resolve_elements(browser))
+        loop_type.get_next()
+        loop_type.get_next()
+        self.assertEqual({"(//ul/li)[3]": "li3", "(//ul/li)[4]": "li4"}, loop_type.resolve_elements(browser))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -10,7 +10,7 @@ from .composite_module import CompositeModule
 from .slot_module import SlotModule
 from .event_trigger_module import EventTriggerModule
 from .python_code_module import PythonCodeModule
-from .loop_module import LoopModule
+from .loop_module import LoopModule, LoopHook, register_loop_hook
 from .custom_module import CustomModule
 from .input_module import InputModule
 from .output_module import OutputModule
@@ -23,7 +23,7 @@ __all__ = [
     'SlotModule',
     'EventTriggerModule',
     'PythonCodeModule',
-    'LoopModule',
+    'LoopModule', 'LoopHook', 'register_loop_hook',
     'CustomModule',
     'InputModule',
     'OutputModule',
@@ -3,7 +3,9 @@
 包含LoopModule类，用于在工作流中执行循环操作。
 """
 
-from typing import Optional, List, Dict, Any
+import logging
+from functools import partial
+from typing import Callable, Optional, List, Dict, Any
 from ..module_context import ModuleExecutionResult
 from ..module_port import (
     ValueType, InputDefinition, OutputDefinition, 
@@ -13,6 +15,50 @@ from .module_base import Module, ModuleMeta, ModuleType
 from .composite_module import CompositeModule
 
 
+class LoopHook:
+    """
+    循环模块的扩展，如增量采集与页面预取。
+    工作流本身不依赖浏览器和存储，这些功能由上层实现后通过register_loop_hook注册
+    """
+
+    @classmethod
+    def create(cls, module: "LoopModule") -> Optional["LoopHook"]:
+        """每次执行循环时按模块的输入创建，没有相关设置时返回None"""
+        return None
+
+    def on_loop_start(self, module: "LoopModule"):
+        ...
+
+    def will_skip(self, module: "LoopModule", item: Any) -> bool:
+        """元素是否会被跳过，不产生副作用，用于决定预取哪些元素"""
+        return False
+
+    def should_skip(self, module: "LoopModule", item: Any) -> bool:
+        """是否跳过元素，在处理元素之前调用"""
+        return self.will_skip(module, item)
+
+    def before_item(self, module: "LoopModule", index: int, item: Any, upcoming: Callable[[int], List[Any]]):
+        """
+        :param upcoming: upcoming(count)返回当前元素之后count个不会被跳过的元素
+        """
+        ...
+
+    def after_item(self, module: "LoopModule", item: Any, result: ModuleExecutionResult):
+        ...
+
+    def on_loop_end(self, module: "LoopModule", outputs: Dict[str, Any]):
+        """循环正常结束或中断时调用，可以向outputs中添加输出"""
+        ...
+
+
+LOOP_HOOK_CLASSES: List[type] = []
+
+
+def register_loop_hook(hook_class: type):
+    if hook_class not in LOOP_HOOK_CLASSES:
+        LOOP_HOOK_CLASSES.append(hook_class)
+
+
 class LoopModule(CompositeModule):
     """循环模块
     
@@ -43,6 +89,44 @@ class LoopModule(CompositeModule):
                 description="循环体执行失败时是否继续",
                 required=False,
                 defaultValue=True
+            ),
+            InputDefinition(
+                name="crawl_state_file",
+                type=ValueType.STRING,
+                description="增量采集状态数据库文件，设置后跳过之前已经成功处理过的元素",
+                required=False
+            ),
+            InputDefinition(
+                name="item_key",
+                type=ValueType.STRING,
+                description="元素标识的字段路径，如 url 或 data.id，为空时使用整个元素",
+                required=False
+            ),
+            InputDefinition(
+                name="crawl_state_hash",
+                type=ValueType.BOOLEAN,
+                description="是否保存标识的哈希值",
+                required=False,
+                defaultValue=False
+            ),
+            InputDefinition(
+                name="crawl_state_ttl",
+                type=ValueType.FLOAT,
+                description="超过该秒数的元素重新处理，为空时永不重新处理",
+                required=False
+            ),
+            InputDefinition(
+                name="prefetch_count",
+                type=ValueType.INTEGER,
+                description="预取之后几个元素的网址，循环体中以详情页标签页打开网页时直接使用预取的页面，为0时不预取",
+                required=False,
+                defaultValue=0
+            ),
+            InputDefinition(
+                name="prefetch_url_key",
+                type=ValueType.STRING,
+                description="元素中网址的字段路径，如 url 或 data.link，为空时元素本身就是网址",
+                required=False
             )
         ]
         
@@ -57,6 +141,21 @@ class LoopModule(CompositeModule):
                 name="results",
                 type=ValueType.ARRAY,
                 description="所有成功迭代的结果数组"
+            ),
+            OutputDefinition(
+                name="skipped",
+                type=ValueType.INTEGER,
+                description="增量采集时跳过的元素数量"
+            ),
+            OutputDefinition(
+                name="new_items",
+                type=ValueType.INTEGER,
+                description="增量采集时新处理的元素数量"
+            ),
+            OutputDefinition(
+                name="prefetch_stats",
+                type=ValueType.OBJECT,
+                description="预取统计：预取、命中、未命中、取消的页面数量"
             )
         ]
         
@@ -121,6 +220,42 @@ class LoopModule(CompositeModule):
         """
         self.add_module_to_slot(self.loop_body_slot_name, body_module)
         
+    def get_optional_variable(self, name: str, default: Any = None) -> Any:
+        try:
+            value = self.context.get_variable(self.module_id, name)
+        except Exception:
+            return default
+        return default if value is None else value
+
+    @staticmethod
+    def get_item_field(item: Any, key_path: str) -> Any:
+        value = item
+        for key in key_path.split(".") if key_path else []:
+            if isinstance(value, dict):
+                value = value.get(key)
+            elif isinstance(value, list) and key.isdigit() and int(key) < len(value):
+                value = value[int(key)]
+            else:
+                value = None
+        return value
+
+    def _create_hooks(self) -> List["LoopHook"]:
+        hooks = [hook for hook in (hook_class.create(self) for hook_class in LOOP_HOOK_CLASSES) if hook]
+        if not LOOP_HOOK_CLASSES and (self.get_optional_variable("crawl_state_file")
+                                      or int(self.get_optional_variable("prefetch_count", 0)) > 0):
+            logging.warning(f"循环模块{self.module_id}设置了增量采集或预取，但没有注册对应的循环扩展，设置不会生效")
+        return hooks
+
+    def _upcoming_items(self, hooks: List["LoopHook"], index: int, count: int) -> List[Any]:
+        """当前元素之后的count个不会被跳过的元素"""
+        upcoming = []
+        for item in self.loop_array[index + 1:]:
+            if len(upcoming) >= count:
+                break
+            if not any(hook.will_skip(self, item) for hook in hooks):
+                upcoming.append(item)
+        return upcoming
+
     async def _execute_internal(self) -> ModuleExecutionResult:
         """执行循环模块
         
@@ -159,36 +294,55 @@ class LoopModule(CompositeModule):
                 error="循环体插槽未定义"
             )
             
+        # 增量采集、页面预取等扩展
+        hooks = self._create_hooks()
+        for hook in hooks:
+            hook.on_loop_start(self)
+
         # 存储循环结果
         loop_results = []
         all_success = True
+        extra_outputs: Dict[str, Any] = {}
         
         # 遍历数组执行循环
-        for index, item in enumerate(self.loop_array):
-            # 创建新的循环上下文
-            loop_context = self._create_child_context(loop_body, self.context)
-            
-            # 设置循环索引和元素到上下文
-            self.context.set_variable(loop_body.module_id, "index", index)
-            self.context.set_variable(loop_body.module_id, "item", item)
-            
-            # 为循环体设置上下文
-            loop_body.set_context(loop_context)
-            
-            # 执行循环体
-            result = await loop_body.execute()
-            loop_results.append(result)
-            
-            # 如果循环体执行失败，根据设置决定是否继续
-            if not result.success:
-                all_success = False
-                if not continue_on_error:
-                    break
-        
+        try:
+            for index, item in enumerate(self.loop_array):
+                if any(hook.should_skip(self, item) for hook in hooks):
+                    continue
+                for hook in hooks:
+                    hook.before_item(self, index, item, partial(self._upcoming_items, hooks, index))
+
+                # 创建新的循环上下文
+                loop_context = self._create_child_context(loop_body, self.context)
+
+                # 设置循环索引和元素到上下文
+                self.context.set_variable(loop_body.module_id, "index", index)
+                self.context.set_variable(loop_body.module_id, "item", item)
+
+                # 为循环体设置上下文
+                loop_body.set_context(loop_context)
+
+                # 执行循环体
+                result = await loop_body.execute()
+                loop_results.append(result)
+                for hook in hooks:
+                    hook.after_item(self, item, result)
+
+                # 如果循环体执行失败，根据设置决定是否继续
+                if not result.success:
+                    all_success = False
+                    if not continue_on_error:
+                        break
+        finally:
+            # 循环结束或中断时扩展清理自己的状态，并补充统计输出
+            for hook in hooks:
+                hook.on_loop_end(self, extra_outputs)
+
         # 收集所有循环体的输出
         combined_outputs = {
             "iterations": len(self.loop_array),
-            "results": [result.outputs for result in loop_results if result.success]
+            "results": [result.outputs for result in loop_results if result.success],
+            **extra_outputs
         }
         
         return ModuleExecutionResult(